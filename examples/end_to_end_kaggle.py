@@ -8,15 +8,18 @@ It demonstrates the advantages of explicitly declaring the types in the Pipe (us
 """
 import pandas as pd
 import numpy as np
+import scipy.sparse
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LassoCV
-from sklearn.preprocessing import OneHotEncoder, LabelEncoder
+from sklearn.preprocessing import OneHotEncoder
 import sklearn.metrics
 import matplotlib.pyplot as plt
 
 from schemaflow import types as sf_types
 from schemaflow import ops as sf_ops
 from schemaflow.pipe import Pipe
+from schemaflow.lookup import LookupTable
+from schemaflow.parallel import ColumnPipe
 from schemaflow.pipeline import Pipeline
 
 
@@ -36,7 +39,7 @@ class SplitNumericCategorical(Pipe):
         return data
 
 
-class FillNaN(Pipe):
+class FillNaN(ColumnPipe):
     fit_requires = transform_modifies = transform_requires = {
         'x': sf_types.PandasDataFrame(schema={}),
         'x_categorical': sf_types.PandasDataFrame(schema={})}
@@ -45,15 +48,17 @@ class FillNaN(Pipe):
         'means': sf_types.List(float),
         'most_frequent': sf_types.List(str)}
 
+    # columns are filled independently, so they are sharded across threads
+    transform_columns = {'x', 'x_categorical'}
+
     def fit(self, data: dict, parameters: dict=None):
         self['means'] = data['x'].mean(axis=0)
         self['most_frequent'] = data['x_categorical'].mode(axis=0)
 
-    def transform(self, data: dict):
-        data['x'] = data['x'].fillna(self['means'])
-        for column in data['x_categorical'].columns:
-            data['x_categorical'].loc[data['x_categorical'][column].isnull(), column] = self['most_frequent'][column][0]
-        return data
+    def transform_column(self, key: str, column):
+        if key == 'x':
+            return column.fillna(self['means'][column.name])
+        return column.fillna(self['most_frequent'][column.name][0])
 
 
 class JoinCategoricalAsOneHot(Pipe):
@@ -62,8 +67,9 @@ class JoinCategoricalAsOneHot(Pipe):
         'x': sf_types.PandasDataFrame(schema={}),
         'x_categorical': sf_types.PandasDataFrame(schema={})
     }
+    # the one-hot features are kept sparse: densifying them does not scale with the number of categories
     transform_modifies = {
-        'x': sf_types.PandasDataFrame(schema={}),
+        'x': sf_types.SparseMatrix(np.float64, shape=(None, None), format='csr'),
         'x_categorical': sf_ops.Drop(),
     }
 
@@ -71,37 +77,29 @@ class JoinCategoricalAsOneHot(Pipe):
 
     def fit(self, data: dict, parameters: dict=None):
         df = data['x_categorical'].copy()
-        self['label'] = dict((column, LabelEncoder()) for column in df.columns)
+        self['label'] = dict((column, LookupTable(df[column].unique())) for column in df.columns)
         self['transformer'] = OneHotEncoder()
 
         for column in self['label']:
-            df.loc[:, column] = self['label'][column].fit_transform(df.loc[:, column])
+            df[column] = self['label'][column].map(df[column])
         self['transformer'].fit(df.values)
 
     def transform(self, data: dict):
-        index = data['x_categorical'].index
-        for column in self['label']:
-            mode = data['x_categorical'].loc[:, column].mode()[0]
-
-            def f(x):
-                if x not in self['label'][column].classes_:
-                    return mode
-                else:
-                    return x
-
-            data['x_categorical'].loc[:, column] = data['x_categorical'].loc[:, column].apply(f)
-            data['x_categorical'].loc[:, column] = self['label'][column].transform(data['x_categorical'].loc[:, column])
+        for column, table in self['label'].items():
+            values = data['x_categorical'][column]
+            # unknown categories are mapped to the most frequent category
+            mode = table.map(values.mode()[:1], default=0)[0]
+            data['x_categorical'][column] = table.map(values, default=mode)
 
-        data['x_categorical'] = self['transformer'].transform(data['x_categorical'])
+        one_hot = self['transformer'].transform(data['x_categorical'])
 
-        df = pd.DataFrame(data['x_categorical'].toarray(), index=index)
-        data['x'] = data['x'].join(df)
+        data['x'] = scipy.sparse.hstack([data['x'].values.astype(np.float64), one_hot], format='csr')
         del data['x_categorical']
         return data
 
 
 class BaselineModel(Pipe):
-    fit_requires = transform_requires = {'x': sf_types.PandasDataFrame({})}
+    fit_requires = transform_requires = {'x': sf_types.SparseMatrix(np.float64, shape=(None, None))}
 
     transform_modifies = {'y_pred_baseline': sf_types.Array(np.float64)}
 
@@ -111,13 +109,14 @@ class BaselineModel(Pipe):
         self['mean'] = np.mean(data['y'])
 
     def transform(self, data: dict):
-        data['y_pred_baseline'] = np.full(data['x'].shape[0], self['mean'])
+        data['y_pred_baseline'] = self.output_buffer('y_pred_baseline', (data['x'].shape[0],))
+        data['y_pred_baseline'].fill(self['mean'])
         return data
 
 
 class LogLassoModel(Pipe):
-    transform_requires = {'x': sf_types.PandasDataFrame(schema={})}
-    fit_requires = {'x': sf_types.PandasDataFrame(schema={}), 'y': sf_types.Array(float)}
+    transform_requires = {'x': sf_types.SparseMatrix(np.float64, shape=(None, None))}
+    fit_requires = {'x': sf_types.SparseMatrix(np.float64, shape=(None, None)), 'y': sf_types.Array(float)}
     transform_modifies = {
         'y_pred': sf_types.Array(np.float64),
         'x': sf_ops.Drop()
@@ -0,0 +1,62 @@
+class Constraint:
+    """
+    Declares an expectation on the values of a column of a :class:`~schemaflow.types.PySparkDataFrame`, checked by
+    :meth:`~schemaflow.types.PySparkDataFrame.check_values`. Null values only violate :class:`NotNull`.
+    """
+    def spark_violation(self, column):
+        """
+        Returns a boolean ``pyspark.sql.Column`` that is true for the values of ``column`` that violate the constraint.
+
+        :param column: a ``pyspark.sql.Column``.
+        """
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join('%s=%s' % (key, repr(value)) for key, value in sorted(self.__dict__.items())))
+
+
+class NotNull(Constraint):
+    """
+    Declares that a column has no null values.
+    """
+    def spark_violation(self, column):
+        return column.isNull()
+
+
+class Range(Constraint):
+    """
+    Declares that the values of a column are within ``[minimum, maximum]``.
+
+    :param minimum: the minimum value, or ``None`` for no minimum.
+    :param maximum: the maximum value, or ``None`` for no maximum.
+    """
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def spark_violation(self, column):
+        import pyspark.sql.functions
+
+        violation = pyspark.sql.functions.lit(False)
+        if self.minimum is not None:
+            violation = violation | (column < self.minimum)
+        if self.maximum is not None:
+            violation = violation | (column > self.maximum)
+        return violation
+
+
+class IsIn(Constraint):
+    """
+    Declares that the values of a column are one of ``values``.
+
+    :param values: the allowed values.
+    """
+    def __init__(self, values):
+        self.values = set(values)
+
+    def spark_violation(self, column):
+        return ~column.isin(sorted(self.values, key=repr))
@@ -31,6 +31,10 @@ class MissingRequirement(SchemaFlowError):
         self.object_type = object_type
         self.requirement = requirement
 
+    def __str__(self):
+        name = '' if self.object_type is None else ' of \'%s\'' % self.object_type.__name__
+        return 'Missing requirement \'%s\'%s %s' % (self.requirement, name, ' '.join(self.locations))
+
 
 class WrongSchema(SchemaFlowError):
     """
@@ -85,3 +89,34 @@ class WrongShape(SchemaFlowError):
         return 'Wrong shape %s:'\
                 '\nRequired shape: %s\nPassed shape:   %s' % \
                (' '.join(self.locations), self.expected_shape, self.shape)
+
+
+class WrongValue(SchemaFlowError):
+    """
+    :class:`~schemaflow.exceptions.SchemaFlowError` raised when values of the datum violate a constraint
+    (see :mod:`schemaflow.constraints`)
+    """
+    def __init__(self, constraint, n_invalid: int, n_rows: int, locations: list=None):
+        super().__init__(locations)
+        self.constraint = constraint
+        self.n_invalid = n_invalid
+        self.n_rows = n_rows
+
+    def __str__(self):
+        return 'Wrong values %s:'\
+                '\nConstraint:   %s\nInvalid rows: %d of %d' % \
+               (' '.join(self.locations), self.constraint, self.n_invalid, self.n_rows)
+
+
+class FrozenError(SchemaFlowError):
+    """
+    :class:`~schemaflow.exceptions.SchemaFlowError` raised when someone tries to fit or modify the state of a
+    frozen pipe (see :meth:`~schemaflow.pipe.Pipe.freeze`).
+    """
+    def __init__(self, pipe=None, locations: list=None):
+        super().__init__(locations)
+        self.pipe = pipe
+
+    def __str__(self):
+        name = '' if self.pipe is None else ' \'%s\'' % self.pipe.__class__.__name__
+        return 'The pipe%s %s is frozen and its state cannot be modified' % (name, ' '.join(self.locations))
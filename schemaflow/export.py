@@ -0,0 +1,173 @@
+import collections
+import copy
+import importlib
+import json
+import logging
+import os
+import pickle
+import pickletools
+import platform
+import sys
+
+import schemaflow.types
+import schemaflow.store
+import schemaflow.exceptions as _exceptions
+
+
+logger = logging.getLogger(__name__)
+
+
+_FORMAT = 'schemaflow-artifact'
+_VERSION = 1
+
+
+def _requirements(pipeline) -> set:
+    """
+    Returns the packages required to transform with ``pipeline``: the requirements of its pipes and of the types
+    in their :attr:`~schemaflow.pipe.Pipe.transform_requires`.
+    """
+    requirements = set()
+    for _, pipe in schemaflow.store._walk(pipeline):
+        requirements.update(pipe.requirements)
+        for value_type in pipe.transform_requires.values():
+            if isinstance(value_type, schemaflow.types.Type):
+                requirements.update(value_type.requirements)
+    return requirements
+
+
+def _version(requirement: str):
+    try:
+        return getattr(importlib.import_module(requirement), '__version__', None)
+    except ImportError:
+        return None
+
+
+_STRINGS = {'STRING', 'BINSTRING', 'SHORT_BINSTRING', 'UNICODE', 'BINUNICODE', 'SHORT_BINUNICODE', 'BINUNICODE8'}
+
+
+def _modules(content: bytes) -> set:
+    """
+    Returns the top-level modules of the classes and functions referenced by the pickle ``content``, i.e. the
+    modules imported when it is unpickled.
+    """
+    modules = set()
+    memo = {}
+    pushed = []  # the values pushed by each opcode: strings, or None for other values
+    for opcode, arg, _ in pickletools.genops(content):
+        if opcode.name in ('GLOBAL', 'INST'):
+            modules.add(arg.split(' ')[0])
+        elif opcode.name == 'STACK_GLOBAL' and len(pushed) >= 2 and isinstance(pushed[-2], str):
+            modules.add(pushed[-2])
+
+        if opcode.name == 'MEMOIZE':
+            memo[len(memo)] = pushed[-1] if pushed else None
+        elif opcode.name in ('PUT', 'BINPUT', 'LONG_BINPUT'):
+            memo[arg] = pushed[-1] if pushed else None
+        elif opcode.name in ('GET', 'BINGET', 'LONG_BINGET'):
+            pushed.append(memo.get(arg))
+        else:
+            pushed.append(arg if opcode.name in _STRINGS else None)
+    return set(module.split('.')[0] for module in modules)
+
+
+def _module_version(module: str):
+    return getattr(sys.modules.get(module), '__version__', None)
+
+
+def _inference_copy(pipe):
+    """
+    Returns a shallow copy of ``pipe`` (and of its nested pipes) with the entries of the state declared in its
+    :attr:`~schemaflow.pipe.Pipe.transform_state` and without the bookkeeping of
+    :meth:`~schemaflow.pipeline.Pipeline.fit`.
+    """
+    result = copy.copy(pipe)
+    keys = pipe.state if pipe.transform_state is None else pipe.transform_state
+    result.state = dict((key, pipe.state[key]) for key in keys if key in pipe.state)
+    result.__dict__.pop('_fit_fingerprints', None)
+    if hasattr(pipe, 'pipes'):
+        result.pipes = collections.OrderedDict((name, _inference_copy(child)) for name, child in pipe.pipes.items())
+    return result
+
+
+def export(pipeline, path: str) -> dict:
+    """
+    Writes a minimal artifact of a fitted ``pipeline`` to be loaded with :func:`load` for inference.
+
+    The artifact only keeps the entries of the :attr:`~schemaflow.pipe.Pipe.state` of each pipe that are declared
+    in its :attr:`~schemaflow.pipe.Pipe.transform_state` (all entries when it is ``None``), and drops the
+    bookkeeping of :meth:`~schemaflow.pipeline.Pipeline.fit`. Its header records the packages required by
+    :meth:`~schemaflow.pipe.Pipe.transform` (see :attr:`~schemaflow.pipe.Pipe.requirements`), the top-level
+    modules imported to unpickle the pipeline and their versions, and is checked by :func:`load` before the
+    pipeline is unpickled. The artifact is written atomically.
+
+    Keep fit-only imports (e.g. ``sklearn`` models used to compute the transform state) inside
+    :meth:`~schemaflow.pipe.Pipe.fit`, so that loading the artifact only imports what transform needs.
+
+    :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline` (or :class:`~schemaflow.pipe.Pipe`);
+        it is not modified.
+    :param path: the path of the artifact.
+    :return: the header of the artifact.
+    """
+    content = pickle.dumps(_inference_copy(pipeline), protocol=4)
+    requirements = _requirements(pipeline)
+    modules = _modules(content)
+
+    versions = dict((module, _module_version(module)) for module in modules)
+    versions = dict((module, version) for module, version in versions.items() if version is not None)
+    versions.update((requirement, _version(requirement)) for requirement in requirements)
+    header = {
+        'format': _FORMAT,
+        'version': _VERSION,
+        'python': platform.python_version(),
+        'requirements': sorted(requirements),
+        'modules': sorted(modules),
+        'versions': versions,
+    }
+
+    schemaflow.store._write(os.path.abspath(path), json.dumps(header, sort_keys=True).encode() + b'\n' + content)
+    return header
+
+
+def read_header(path: str) -> dict:
+    """
+    Returns the header of the artifact in ``path``, without loading the pipeline.
+    """
+    with open(path, 'rb') as f:
+        header = json.loads(f.readline().decode())
+    if header.get('format') != _FORMAT:
+        raise ValueError('\'%s\' is not a schemaflow artifact' % path)
+    return header
+
+
+def load(path: str, check_versions: bool=False):
+    """
+    Loads the frozen pipeline (see :meth:`~schemaflow.pipe.Pipe.freeze`) of an artifact written by :func:`export`.
+
+    The requirements and the modules of the artifact are checked before unpickling the pipeline, without
+    importing them.
+
+    :param path: the path of the artifact.
+    :param check_versions: whether to also import the requirements and log a warning for each one whose
+        version differs from the version recorded in the artifact.
+    :return: the frozen :class:`~schemaflow.pipeline.Pipeline`.
+    """
+    header = read_header(path)
+    if header['version'] > _VERSION:
+        raise ValueError('The artifact \'%s\' has version %d, but only versions up to %d are supported' %
+                         (path, header['version'], _VERSION))
+    for requirement in header['requirements'] + header.get('modules', []):
+        if not schemaflow.types._requirement_fulfilled(requirement):
+            raise _exceptions.MissingRequirement(None, requirement, ['in artifact \'%s\'' % path])
+
+    if check_versions:
+        for requirement, version in header['versions'].items():
+            installed = _version(requirement)
+            if version != installed:
+                logger.warning('The artifact \'%s\' was exported with %s %s, but %s is installed',
+                               path, requirement, version, installed)
+
+    with open(path, 'rb') as f:
+        f.readline()
+        pipeline = pickle.load(f)
+    pipeline._freeze()
+    return pipeline
@@ -0,0 +1,79 @@
+import hashlib
+import pickle
+
+
+def _update(hash_object, value):
+    # subclasses of dict (e.g. the state of a frozen pipe) have the fingerprint of their content
+    hash_object.update(('dict' if isinstance(value, dict) else type(value).__name__).encode())
+    module = type(value).__module__
+
+    if module.startswith('pandas') and hasattr(value, 'index'):
+        import pandas.util
+        # every column and dtype, since the ``repr`` of many columns is truncated
+        if hasattr(value, 'columns'):
+            _update(hash_object, list(value.columns))
+            _update(hash_object, [str(dtype) for dtype in value.dtypes])
+        else:
+            _update(hash_object, [value.name, str(value.dtype)])
+        hash_object.update(pandas.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif module == 'numpy' and hasattr(value, 'dtype') and hasattr(value, 'shape'):
+        hash_object.update(str(value.dtype).encode())
+        hash_object.update(str(value.shape).encode())
+        if value.dtype.hasobject:
+            hash_object.update(pickle.dumps(value, protocol=4))
+        else:
+            import numpy
+            hash_object.update(numpy.ascontiguousarray(value).tobytes())
+    elif isinstance(getattr(type(value), 'fingerprint', None), property):
+        # e.g. the pipes of a pipeline
+        hash_object.update(value.fingerprint.encode())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            _update(hash_object, key)
+            _update(hash_object, value[key])
+    elif isinstance(value, (list, tuple)):
+        hash_object.update(str(len(value)).encode())
+        for item in value:
+            _update(hash_object, item)
+    else:
+        hash_object.update(pickle.dumps(value, protocol=4))
+
+
+def fingerprint(value) -> str:
+    """
+    Returns a fingerprint (a hash) of the content of ``value``, such that two values with the same content
+    have the same fingerprint.
+
+    ``pandas`` objects and ``numpy`` arrays are hashed from their data; dictionaries, lists and tuples
+    are hashed item by item; everything else is hashed from its pickle.
+
+    :param value: a picklable object.
+    :return: a hexadecimal ``str``.
+    """
+    hash_object = hashlib.sha256()
+    _update(hash_object, value)
+    return hash_object.hexdigest()
+
+
+def row_fingerprints(value, index: bool=True):
+    """
+    Returns a fingerprint of each row of ``value``, a ``pandas`` object, a ``numpy`` array or a list.
+
+    Requires ``pandas`` and ``numpy``.
+
+    :param value: a ``pandas.DataFrame``, ``pandas.Series``, ``numpy.ndarray`` or ``list``.
+    :param index: whether the index of a ``pandas`` object is part of the fingerprint of its rows.
+    :return: a ``numpy.ndarray`` of ``uint64`` with one fingerprint per row.
+    """
+    import numpy
+    import pandas.util
+
+    if type(value).__module__.startswith('pandas'):
+        return pandas.util.hash_pandas_object(value, index=index).values
+
+    value = numpy.asarray(value)
+    if value.ndim == 1:
+        return pandas.util.hash_array(value)
+    # the rows of a n-dimensional array are hashed as the rows of a DataFrame of its flattened rows
+    rows = value.reshape(value.shape[0], -1)
+    return pandas.util.hash_pandas_object(pandas.DataFrame(rows), index=False).values
@@ -0,0 +1,117 @@
+_missing = object()
+
+
+class LookupTable:
+    """
+    A mapping from keys to values whose lookups are vectorized, to be used as a fitted parameter of pipes
+    that map values in :meth:`~schemaflow.pipe.Pipe.transform` (e.g. category encodings or target encodings),
+    instead of applying a Python function per value. Requires ``numpy`` (and ``pandas`` for ``index='hash'``).
+
+    The table is pickled as its keys and values only; the index is rebuilt on the first lookup after unpickling.
+
+    :param keys: an array-like of unique keys.
+    :param values: an array-like of values, one per key (default: the position of each key, i.e. an encoding).
+    :param index: the index used for lookups: ``'hash'`` (a ``pandas.Index``) or ``'sorted'``
+        (a binary search over the sorted keys, for keys with a total order, e.g. numbers). Keys or values
+        that cannot be compared (e.g. of mixed types) are looked up with the ``'hash'`` index.
+    """
+    def __init__(self, keys, values=None, index: str='hash'):
+        import numpy
+
+        if index not in ('hash', 'sorted'):
+            raise ValueError('index must be one of \'hash\' or \'sorted\'')
+        self.keys = numpy.asarray(keys)
+        if values is None:
+            values = numpy.arange(len(self.keys))
+        self.values = numpy.asarray(values)
+        if len(self.values) != len(self.keys):
+            raise ValueError('keys and values must have the same length')
+        self.index = index
+        self._index = None
+        try:
+            unique = len(numpy.unique(self.keys)) == len(self.keys)
+        except TypeError:  # keys without a total order, e.g. ``[1, 'a']``
+            import pandas
+            unique = pandas.Index(self.keys).is_unique
+        if not unique:
+            raise ValueError('keys must be unique')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    def _build_index(self):
+        import numpy
+
+        if self.index == 'sorted':
+            try:
+                order = numpy.argsort(self.keys, kind='stable')
+            except TypeError:
+                pass
+            else:
+                self._index = (order, self.keys[order])
+                return
+        import pandas
+        self._index = pandas.Index(self.keys)
+
+    def positions(self, values):
+        """
+        Returns the position of each of ``values`` in the keys.
+
+        :param values: an array-like of values.
+        :return: a ``numpy.ndarray`` of integers, ``-1`` for values that are not keys.
+        """
+        import numpy
+
+        if self._index is None:
+            self._build_index()
+        values = numpy.asarray(values)
+        if not isinstance(self._index, tuple):
+            return self._index.get_indexer(values)
+
+        order, sorted_keys = self._index
+        if not len(sorted_keys):
+            return numpy.full(len(values), -1)
+        try:
+            positions = numpy.searchsorted(sorted_keys, values).clip(0, len(sorted_keys) - 1)
+        except TypeError:  # values that cannot be compared with the keys
+            import pandas
+            return pandas.Index(self.keys).get_indexer(values)
+        return numpy.where(sorted_keys[positions] == values, order[positions], -1)
+
+    def contains(self, values):
+        """
+        Returns whether each of ``values`` is a key.
+
+        :param values: an array-like of values.
+        :return: a ``numpy.ndarray`` of booleans.
+        """
+        return self.positions(values) >= 0
+
+    def map(self, values, default=_missing):
+        """
+        Maps each of ``values`` to its value in the table.
+
+        :param values: an array-like of values (e.g. a ``pandas.Series``).
+        :param default: the value of values that are not keys (e.g. ``None``). When not given, a ``KeyError`` is
+            raised instead.
+        :return: a ``numpy.ndarray`` with the mapped values.
+        """
+        import numpy
+
+        positions = self.positions(values)
+        missing = positions < 0
+        if not missing.any():
+            return self.values[positions]
+        if default is _missing:
+            raise KeyError('Values %s are not in the table' % numpy.asarray(values)[missing][:10].tolist())
+        if not len(self.values):
+            return numpy.full(len(positions), default)
+        return numpy.where(missing, default, self.values[positions.clip(0)])
+
+    def __repr__(self):
+        return '%s(%d keys, index=%s)' % (self.__class__.__name__, len(self), self.index)
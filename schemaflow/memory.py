@@ -0,0 +1,200 @@
+import collections
+import threading
+
+import schemaflow.pipe
+import schemaflow.types
+import schemaflow.ops
+
+
+_SIGNED = ('int8', 'int16', 'int32')
+_UNSIGNED = ('uint8', 'uint16', 'uint32')
+
+
+def _smallest_integer(dtype, minimum, maximum):
+    """
+    Returns the smallest integer dtype of the same signedness as ``dtype`` that holds ``[minimum, maximum]``,
+    or ``None`` when it is not smaller than ``dtype``.
+    """
+    import numpy
+
+    for candidate in map(numpy.dtype, _UNSIGNED if dtype.kind == 'u' else _SIGNED):
+        if candidate.itemsize >= dtype.itemsize:
+            return None
+        info = numpy.iinfo(candidate)
+        if info.min <= minimum and maximum <= info.max:
+            return candidate
+    return None
+
+
+class Downcast(schemaflow.pipe.Pipe):
+    """
+    A :class:`~schemaflow.pipe.Pipe` that reduces the memory of ``pandas.DataFrame`` s by converting their columns
+    to the smallest dtype that holds the values observed in :meth:`fit`:
+
+    - ``float64`` columns become ``float32`` (when ``floats=True``)
+    - integer columns become the smallest integer of the same signedness (e.g. ``int64`` to ``int8``)
+    - ``object`` (and string) columns with few distinct values become ``category``
+
+    After :meth:`fit`, :attr:`transform_modifies` declares the new dtype of each converted column, so that
+    the schema propagated by :meth:`~schemaflow.pipeline.Pipeline.transform_schema` matches the transformed data.
+    :meth:`transform` raises a ``ValueError`` when a value does not fit its new dtype (e.g. an integer outside
+    the fitted range or an unknown category), instead of silently overflowing or losing it.
+
+    Requires ``pandas``.
+
+    :param keys: the keys of ``data`` with the DataFrames to downcast.
+    :param floats: whether to convert ``float64`` to ``float32``.
+    :param max_categories: the maximum number of distinct values of an ``object`` column converted to ``category``,
+        as a number (``int``) or as a fraction of the number of rows (``float``).
+    """
+    requirements = {'pandas'}
+
+    fitted_parameters = {'dtypes': dict}
+
+    def __init__(self, keys=('x',), floats: bool=True, max_categories=0.5):
+        super().__init__()
+        self.keys = list(keys)
+        self.floats = floats
+        self.max_categories = max_categories
+
+    @property
+    def fit_requires(self):
+        return dict((key, schemaflow.types.PandasDataFrame({})) for key in self.keys)
+
+    @property
+    def transform_requires(self):
+        return self.fit_requires
+
+    @property
+    def transform_modifies(self):
+        dtypes = self.state.get('dtypes', {})
+        return dict((key, schemaflow.ops.ModifyDataFrame(dict(
+            (column, schemaflow.ops.Set(dtype)) for column, dtype in dtypes.get(key, {}).items())))
+            for key in self.keys)
+
+    def _dtype(self, column):
+        import numpy
+        import pandas
+
+        dtype = column.dtype
+        if dtype == numpy.float64 and self.floats:
+            values = column.values[numpy.isfinite(column.values)]
+            if not len(values) or numpy.abs(values).max() <= numpy.finfo(numpy.float32).max:
+                return numpy.dtype(numpy.float32)
+        elif dtype.kind in 'iu' and len(column):
+            return _smallest_integer(dtype, column.min(), column.max())
+        elif dtype == object or pandas.api.types.is_string_dtype(dtype):
+            categories = column.dropna().unique()
+            max_categories = self.max_categories
+            if isinstance(max_categories, float):
+                max_categories = max_categories * len(column)
+            if 0 < len(categories) <= max_categories:
+                return pandas.CategoricalDtype(categories)
+        return None
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['dtypes'] = {}
+        for key in self.keys:
+            df = data[key]
+            self['dtypes'][key] = {}
+            for column in df.columns:
+                dtype = self._dtype(df[column])
+                if dtype is not None:
+                    self['dtypes'][key][column] = dtype
+
+    @staticmethod
+    def _check_values(key, column, dtype):
+        import numpy
+
+        values = column.values
+        if dtype.kind in 'iu':
+            info = numpy.iinfo(dtype)
+            invalid = len(values) and (values.min() < info.min or values.max() > info.max)
+        elif dtype.kind == 'f':
+            finite = values[numpy.isfinite(values)]
+            invalid = len(finite) and numpy.abs(finite).max() > numpy.finfo(dtype).max
+        else:
+            invalid = (~(column.isin(dtype.categories) | column.isnull())).any()
+        if invalid:
+            raise ValueError('Column \'%s\' of \'%s\' has values that do not fit in its fitted dtype %s' %
+                             (column.name, key, dtype))
+
+    def transform(self, data: dict):
+        for key in self.keys:
+            dtypes = self['dtypes'][key]
+            for column, dtype in dtypes.items():
+                self._check_values(key, data[key][column], dtype)
+            data[key] = data[key].astype(dtypes)
+        return data
+
+
+class BufferPool:
+    """
+    A pool of ``numpy`` arrays that are re-used across calls of :meth:`~schemaflow.pipe.Pipe.transform`,
+    so that pipes transforming inputs of the same shape (e.g. when serving) do not allocate new arrays per call.
+    Pipes request arrays from the pool with :meth:`~schemaflow.pipe.Pipe.output_buffer`;
+    use :meth:`~schemaflow.pipe.Pipe.use_buffer_pool` to assign a pool to a pipe or to all pipes of a pipeline.
+
+    Buffers are per thread: a buffer is re-used by the next call in the same thread, and its content is
+    therefore only valid until then. Copy results that must outlive the next call, and do not use a pool with
+    :meth:`~schemaflow.pipeline.Pipeline.transform_stream`, where consecutive batches overlap in the same thread.
+
+    The pool keeps the ``max_shapes`` most recently used shapes of each buffer, so that inputs of varying
+    shapes (e.g. batches of different sizes) do not grow it without bound.
+
+    A pool is pickled (and copied) empty. Requires ``numpy``.
+
+    :param max_shapes: the maximum number of shapes (and dtypes) kept per buffer; the least recently used
+        are released first.
+    """
+    def __init__(self, max_shapes: int=4):
+        self.max_shapes = max_shapes
+        self._local = threading.local()
+
+    def __getstate__(self):
+        return {'max_shapes': self.max_shapes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def _buffers(self):
+        if not hasattr(self._local, 'buffers'):
+            self._local.buffers = {}  # (owner, key) -> OrderedDict of (shape, dtype) -> buffer
+        return self._local.buffers
+
+    def get(self, owner, key: str, shape: tuple, dtype):
+        """
+        Returns the buffer of ``owner`` for ``key`` with the given shape and dtype, allocating it on first use.
+        Its content is undefined.
+
+        :param owner: the object (e.g. a pipe) that uses the buffer.
+        :param key: the name of the buffer, e.g. the key of the data it is assigned to.
+        :param shape: the shape of the buffer.
+        :param dtype: the dtype of the buffer.
+        :return: a ``numpy.ndarray``.
+        """
+        import numpy
+
+        dtype = numpy.dtype(dtype)
+        buffers = self._buffers.setdefault((id(owner), key), collections.OrderedDict())
+        buffer_key = (tuple(shape), dtype.str)
+        if buffer_key in buffers:
+            buffers.move_to_end(buffer_key)
+        else:
+            buffers[buffer_key] = numpy.empty(shape, dtype)
+            while len(buffers) > self.max_shapes:
+                buffers.popitem(last=False)
+        return buffers[buffer_key]
+
+    def clear(self):
+        """
+        Releases the buffers of the current thread.
+        """
+        self._buffers.clear()
+
+    def __len__(self):
+        return sum(len(buffers) for buffers in self._buffers.values())
+
+    def __repr__(self):
+        return '%s(%d buffers)' % (self.__class__.__name__, len(self))
@@ -0,0 +1,218 @@
+import collections
+import copy
+import itertools
+import multiprocessing
+import random
+import sys
+import threading
+import time
+
+import schemaflow.parallel
+import schemaflow.pipe
+import schemaflow.pipeline
+import schemaflow.types
+
+# the data of :func:`cross_validate` in its worker processes
+_worker_data = None
+
+
+def _pipe_choices(pipes: collections.OrderedDict, grid: dict):
+    """
+    Returns, for each pipe, the list of its parameters' combinations (``None`` when it is not in ``grid``).
+    """
+    choices = []
+    for name in pipes:
+        if name in grid:
+            parameters = sorted(grid[name].items())
+            names = [parameter for parameter, _ in parameters]
+            choices.append([dict(zip(names, values)) for values in
+                            itertools.product(*[values for _, values in parameters])])
+        else:
+            choices.append([None])
+    return choices
+
+
+def _combinations(choices: list, n_iter: int=None, random_state=None):
+    """
+    Returns the combinations of choices (as tuples of indexes), or ``n_iter`` random combinations of them.
+    """
+    sizes = [len(pipe_choices) for pipe_choices in choices]
+    if n_iter is None:
+        return list(itertools.product(*[range(size) for size in sizes]))
+
+    total = 1
+    for size in sizes:
+        total *= size
+    combinations = []
+    for number in sorted(random.Random(random_state).sample(range(total), min(n_iter, total))):
+        combination = []
+        for size in reversed(sizes):
+            number, index = divmod(number, size)
+            combination.append(index)
+        combinations.append(tuple(reversed(combination)))
+    return combinations
+
+
+def _fit(pipe: schemaflow.pipe.Pipe, data: dict, parameters: dict):
+    data = schemaflow.pipeline._fit_data(pipe, data)
+    if parameters is None:
+        pipe.fit(data)
+    else:
+        pipe.fit(data, parameters)
+
+
+def _fit_leaf(arguments):
+    pipe, parameters, train, test, score = arguments
+    _fit(pipe, train, parameters)
+    return pipe, score(schemaflow.pipe._transform(pipe, test))
+
+
+class _Search:
+    def __init__(self, pipes, choices, score, executor, n_jobs):
+        self.names = list(pipes.keys())
+        self.pipes = list(pipes.values())
+        self.choices = choices
+        self.score = score
+        self.executor = executor
+        self.n_jobs = n_jobs
+        self.results = {}
+
+    def run(self, level: int, fitted: list, combinations: list, train: dict, test: dict):
+        groups = collections.OrderedDict()
+        for combination in combinations:
+            groups.setdefault(combination[level], []).append(combination)
+        # data is only copied when it is shared by more than one child of the prefix tree
+        copy_data = copy.deepcopy if len(groups) > 1 else lambda data: data
+
+        if level == len(self.pipes) - 1:
+            arguments = [(copy.deepcopy(self.pipes[level]), self.choices[level][index], copy_data(train),
+                          copy_data(test), self.score) for index in groups]
+            leaves = schemaflow.parallel._map(_fit_leaf, arguments, self.executor, self.n_jobs)
+            for (pipe, score), combination in zip(leaves, groups.values()):
+                self.results[combination[0]] = (score, fitted + [pipe])
+            return
+
+        for index, group in groups.items():
+            pipe = copy.deepcopy(self.pipes[level])
+            group_train = copy_data(train)
+            _fit(pipe, group_train, self.choices[level][index])
+            group_train = schemaflow.pipe._transform(pipe, group_train)
+            group_test = schemaflow.pipe._transform(pipe, copy_data(test))
+            self.run(level + 1, fitted + [pipe], group, group_train, group_test)
+
+
+def grid_search(pipeline: schemaflow.pipeline.Pipeline, train: dict, test: dict, grid: dict, score,
+                n_iter: int=None, random_state=None, executor: str='thread', n_jobs: int=None):
+    """
+    Fits ``pipeline`` on ``train`` for each combination of parameters in ``grid`` and scores its transformation
+    of ``test``.
+
+    The combinations are arranged as a prefix tree over the pipes of the pipeline: each pipe is fitted once per
+    distinct combination of its parameters and the parameters of the pipes before it, and its transformed
+    ``train`` and ``test`` are re-used by every combination sharing that prefix. E.g. when only the last
+    pipe has parameters, the previous pipes are fitted once. Pipes of the last level (the leaves) are fitted
+    concurrently.
+
+    :param pipeline: a :class:`~schemaflow.pipeline.Pipeline`; it is not modified.
+    :param train: the data passed to :meth:`~schemaflow.pipeline.Pipeline.fit`.
+    :param test: the data passed to :meth:`~schemaflow.pipeline.Pipeline.transform`.
+    :param grid: a dictionary ``{pipe_name: {parameter: list of values}}``.
+    :param score: a callable that receives the transformed ``test`` and returns a score.
+        Must be picklable when ``executor='process'``.
+    :param n_iter: when passed, the number of combinations sampled at random from the grid (a random search).
+    :param random_state: the seed of the random search.
+    :param executor: the executor used to fit the leaves: ``None`` (sequential), ``'thread'`` or ``'process'``.
+    :param n_jobs: the maximum number of workers of the executor (default: the executor's default).
+    :return: a list, one item per combination, of tuples ``(parameters, score, fitted_pipeline)``, where
+        ``parameters`` is in the format of :meth:`~schemaflow.pipeline.Pipeline.fit`. The fitted pipelines share
+        the pipes of their common prefix.
+    """
+    choices = _pipe_choices(pipeline.pipes, grid)
+    combinations = _combinations(choices, n_iter, random_state)
+
+    search = _Search(pipeline.pipes, choices, score, executor, n_jobs)
+    search.run(0, [], combinations, train.copy(), test.copy())
+
+    results = []
+    for combination in combinations:
+        parameters = dict((name, pipe_choices[index]) for name, pipe_choices, index in
+                          zip(search.names, choices, combination) if pipe_choices[index] is not None)
+        score_value, fitted = search.results[combination]
+        results.append((parameters, score_value,
+                        schemaflow.pipeline.Pipeline(collections.OrderedDict(zip(search.names, fitted)))))
+    return results
+
+
+def _set_worker_data(data: dict):
+    # the initializer of the worker processes of a single call of `cross_validate`
+    global _worker_data
+    _worker_data = data
+
+
+def _folds(n_rows: int, splitter):
+    if n_rows is None:
+        raise ValueError('cross_validate requires data with rows (pandas objects, numpy arrays or lists)')
+    if isinstance(splitter, int):
+        import numpy
+        folds = numpy.array_split(numpy.arange(n_rows), splitter)
+        return [(numpy.concatenate(folds[:i] + folds[i + 1:]), fold) for i, fold in enumerate(folds)]
+    elif hasattr(splitter, 'split'):
+        return list(splitter.split(list(range(n_rows))))
+    return list(splitter)
+
+
+def _evaluate_fold(arguments, data: dict=None):
+    pipeline, parameters, train_indices, test_indices, score = arguments
+    pipeline = copy.deepcopy(pipeline)
+    if data is None:
+        data = _worker_data
+
+    start = time.time()
+    pipeline.fit(schemaflow.types._take_rows(data, train_indices), parameters)
+    fit_time = time.time() - start
+
+    start = time.time()
+    result = schemaflow.pipe._transform(pipeline, schemaflow.types._take_rows(data, test_indices))
+    score_value = score(result)
+    score_time = time.time() - start
+
+    return {'fit_time': fit_time, 'score_time': score_time, 'score': score_value}
+
+
+def cross_validate(pipeline: schemaflow.pipeline.Pipeline, data: dict, splitter, score, parameters: dict=None,
+                   n_jobs: int=None):
+    """
+    Evaluates ``pipeline`` on the folds of ``data`` defined by ``splitter``: for each fold, it fits the pipeline
+    on the training rows, transforms the test rows, and scores the result.
+
+    Folds are evaluated in parallel by worker processes that receive only the fold's row indices.
+    On Linux, when no other thread is running, processes are forked and share ``data`` with the parent process
+    (copy-on-write); otherwise, ``data`` is sent once to each worker. Values of ``data`` that are ``pandas`` objects,
+    ``numpy`` arrays or lists with the same number of rows are split by rows; other values are passed as is.
+
+    :param pipeline: a :class:`~schemaflow.pipeline.Pipeline`; it is not modified.
+    :param data: the data, e.g. ``{'x': pandas.DataFrame, 'y': numpy.array}``.
+    :param splitter: either the number of (contiguous) folds, an object with a method ``split(X)`` that yields
+        pairs ``(train_indices, test_indices)`` (e.g. ``sklearn.model_selection.KFold``), or a list of such pairs.
+    :param score: a callable that receives the transformed test data and returns a score.
+        Must be picklable when ``n_jobs > 1``.
+    :param parameters: the parameters passed to :meth:`~schemaflow.pipeline.Pipeline.fit`.
+    :param n_jobs: the number of worker processes (default: sequential, in this process).
+    :return: a list, one item per fold, of dictionaries with the fold's ``score``, ``fit_time`` and ``score_time``
+        (in seconds).
+    """
+    folds = _folds(schemaflow.types._n_rows(data), splitter)
+    arguments = [(pipeline, parameters, train, test, score) for train, test in folds]
+
+    if n_jobs is None or n_jobs == 1:
+        return [_evaluate_fold(argument, data) for argument in arguments]
+
+    # forking is only safe on Linux and without other threads (e.g. of executors) holding locks
+    if sys.platform.startswith('linux') and threading.active_count() == 1:
+        # forked workers receive `data` from the memory of this process (copy-on-write), without pickling it
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context('spawn')
+
+    with context.Pool(n_jobs, _set_worker_data, (data,)) as pool:
+        return pool.map(_evaluate_fold, arguments)
@@ -0,0 +1,161 @@
+import collections
+
+import schemaflow.pipe
+import schemaflow.pipeline
+
+
+def _signature(pipe: schemaflow.pipe.Pipe):
+    """
+    Two pipes with the same signature compute the same result from the same input. Pipes that declare neither
+    requires nor modifies may use any key, and are only identical to themselves.
+    """
+    if _undeclared(pipe):
+        return id(pipe), None
+    try:
+        fingerprint = pipe.fingerprint
+    except Exception:
+        # e.g. not picklable: the pipe is only identical to itself
+        fingerprint = id(pipe)
+    return fingerprint, frozenset(pipe.transform_requires.keys())
+
+
+def _reads(pipe: schemaflow.pipe.Pipe):
+    return set(pipe.transform_requires.keys())
+
+
+def _writes(pipe: schemaflow.pipe.Pipe):
+    return set(pipe.transform_modifies.keys())
+
+
+def _undeclared(pipe: schemaflow.pipe.Pipe):
+    return not pipe.transform_requires and not pipe.transform_modifies
+
+
+def _as_items(pipe: schemaflow.pipe.Pipe):
+    """
+    Returns the branch ``pipe`` as a list of pairs ``(name, Pipe)`` applied sequentially.
+    """
+    if isinstance(pipe, schemaflow.pipeline.Pipeline):
+        return list(pipe.pipes.items())
+    return [('0', pipe)]
+
+
+def _from_items(items: list):
+    if len(items) == 1:
+        return items[0][1]
+    pipes = collections.OrderedDict()
+    for i, (name, pipe) in enumerate(items):
+        if name in pipes:
+            name = '%s_%d' % (name, i)
+        pipes[name] = pipe
+    return schemaflow.pipeline.Pipeline(pipes)
+
+
+def _eliminate_repeated(pipeline: schemaflow.pipeline.Pipeline):
+    """
+    Removes pipes of a :class:`~schemaflow.pipeline.Pipeline` that re-compute the result of an identical previous
+    pipe from the same, unchanged, input.
+    """
+    items = list(pipeline.pipes.items())
+    signatures = [_signature(pipe) for _, pipe in items]
+
+    kept = []
+    for j, (name, pipe) in enumerate(items):
+        redundant = False
+        for i in kept:
+            previous = items[i][1]
+            if signatures[i] != signatures[j] or _reads(previous) & _writes(previous):
+                continue
+            # the input and the output of `previous` must be untouched since it was applied
+            touched = set()
+            for _, between in items[i + 1:j]:
+                touched |= _writes(between)
+            if any(_undeclared(between) for _, between in items[i + 1:j]):
+                continue
+            if not touched & (_reads(previous) | _writes(previous)):
+                redundant = True
+                break
+        if not redundant:
+            kept.append(j)
+
+    if len(kept) == len(items):
+        return pipeline
+    return schemaflow.pipeline.Pipeline(collections.OrderedDict(items[j] for j in kept))
+
+
+def _hoist_common_prefixes(union: schemaflow.pipeline.Union):
+    """
+    Groups the branches of a :class:`~schemaflow.pipeline.Union` that start with identical pipes, so that these
+    pipes are applied once and their result is shared by the (remaining) branches.
+    """
+    branches = [(name, _as_items(pipe)) for name, pipe in union.pipes.items()]
+
+    groups = collections.OrderedDict()
+    for name, items in branches:
+        groups.setdefault(_signature(items[0][1]), []).append((name, items))
+
+    if all(len(group) == 1 for group in groups.values()):
+        return union
+
+    new_branches = collections.OrderedDict()
+    for group in groups.values():
+        if len(group) == 1:
+            name, items = group[0]
+            new_branches[name] = _from_items(items)
+            continue
+
+        prefix_length = 1
+        while all(len(items) > prefix_length for _, items in group) and \
+                len(set(_signature(items[prefix_length][1]) for _, items in group)) == 1:
+            prefix_length += 1
+
+        prefix = group[0][1][:prefix_length]
+        suffixes = collections.OrderedDict((name, _from_items(items[prefix_length:]))
+                                           for name, items in group if len(items) > prefix_length)
+
+        if len(suffixes) > 1:
+            suffix = [('union', _hoist_common_prefixes(
+                schemaflow.pipeline.Union(suffixes, union.executor, union.n_jobs)))]
+        elif len(suffixes) == 1:
+            suffix = _as_items(list(suffixes.values())[0])
+        else:
+            suffix = []
+
+        new_branches['+'.join(name for name, _ in group)] = _from_items(prefix + suffix)
+
+    if len(new_branches) == 1:
+        return list(new_branches.values())[0]
+    return schemaflow.pipeline.Union(new_branches, union.executor, union.n_jobs)
+
+
+def eliminate_common_pipes(pipe: schemaflow.pipe.Pipe):
+    """
+    Returns a pipe equivalent to ``pipe`` where identical pipes applied to the same input are computed once
+    and their result is shared. Two pipes are identical when they have the same class, the same fitted state
+    (see :attr:`~schemaflow.pipe.Pipe.fingerprint`) and the same input keys; pipes that declare neither
+    :attr:`~schemaflow.pipe.Pipe.transform_requires` nor :attr:`~schemaflow.pipe.Pipe.transform_modifies` are never
+    merged. Specifically,
+
+    - branches of a :class:`~schemaflow.pipeline.Union` that start with identical pipes are
+      regrouped so that these pipes are applied once, before a :class:`~schemaflow.pipeline.Union` of the
+      remaining branches;
+    - pipes of a :class:`~schemaflow.pipeline.Pipeline` that re-apply an identical previous pipe on unchanged
+      data are removed.
+
+    This pass is run after fitting and assumes that pipes do not modify their inputs in place and that
+    keys modified by several branches of a :class:`~schemaflow.pipeline.Union` hold the same value in all of them.
+    The pipes of the result are the (fitted) pipes of ``pipe``, not copies.
+
+    :param pipe: a :class:`~schemaflow.pipe.Pipe`, typically a :class:`~schemaflow.pipeline.Pipeline`
+        or a :class:`~schemaflow.pipeline.Union`.
+    :return: the optimized :class:`~schemaflow.pipe.Pipe`.
+    """
+    if isinstance(pipe, schemaflow.pipeline.Pipeline):
+        pipes = collections.OrderedDict((name, eliminate_common_pipes(sub_pipe))
+                                        for name, sub_pipe in pipe.pipes.items())
+        return _eliminate_repeated(schemaflow.pipeline.Pipeline(pipes))
+    elif isinstance(pipe, schemaflow.pipeline.Union):
+        pipes = collections.OrderedDict((name, eliminate_common_pipes(sub_pipe))
+                                        for name, sub_pipe in pipe.pipes.items())
+        return _hoist_common_prefixes(schemaflow.pipeline.Union(pipes, pipe.executor, pipe.n_jobs))
+    return pipe
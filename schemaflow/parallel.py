@@ -0,0 +1,189 @@
+import concurrent.futures
+import queue
+import threading
+
+import schemaflow.pipe
+
+
+class _End:
+    """
+    Marks the end of a stream in :func:`staged`.
+    """
+
+
+class _Failure:
+    """
+    Carries an exception raised in a stage of :func:`staged` to the consumer.
+    """
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def _map(function, items: list, executor: str=None, n_jobs: int=None):
+    """
+    Applies ``function`` to each of ``items`` using an executor, returning the results in the order of ``items``.
+
+    :param function: a callable of a single argument. Must be picklable when ``executor='process'``.
+    :param items: a list of arguments.
+    :param executor: one of ``None`` (sequential), ``'thread'`` or ``'process'``.
+    :param n_jobs: the maximum number of workers of the executor (default: the executor's default).
+    :return: a list with the results.
+    """
+    if executor is None or len(items) <= 1:
+        return [function(item) for item in items]
+    elif executor == 'thread':
+        executor_class = concurrent.futures.ThreadPoolExecutor
+    elif executor == 'process':
+        executor_class = concurrent.futures.ProcessPoolExecutor
+    else:
+        raise ValueError('executor must be one of None, \'thread\' or \'process\'')
+
+    with executor_class(max_workers=n_jobs) as pool:
+        return list(pool.map(function, items))
+
+
+def _put(items_queue: queue.Queue, item, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            items_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(items_queue: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return items_queue.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _End
+
+
+def _feed(items, output: queue.Queue, stop: threading.Event):
+    try:
+        for item in items:
+            if not _put(output, item, stop):
+                return
+    except BaseException as e:  # e.g. KeyboardInterrupt: the consumer must not wait for the end forever
+        _put(output, _Failure(e), stop)
+    _put(output, _End, stop)
+
+
+def _stage(function, source: queue.Queue, output: queue.Queue, stop: threading.Event):
+    while True:
+        item = _get(source, stop)
+        if item is not _End and not isinstance(item, _Failure):
+            try:
+                item = function(item)
+            except BaseException as e:
+                item = _Failure(e)
+        if not _put(output, item, stop) or item is _End:
+            return
+
+
+def staged(functions: list, items, maxsize: int=1):
+    """
+    Applies the composition of ``functions`` to each of ``items``, running each function in its own thread.
+
+    Stages are connected by queues of at most ``maxsize`` items, so that function ``k`` processes item ``i + 1``
+    while function ``k + 1`` processes item ``i``, and a slow stage blocks (backpressure) the stages before it.
+    Iterating over ``items`` also runs in its own thread.
+
+    :param functions: a list of callables of a single argument.
+    :param items: an iterable of arguments to the first function.
+    :param maxsize: the maximum number of items waiting between two stages.
+    :return: a generator with the results, in the order of ``items``. An exception raised by any stage is
+        re-raised by the generator.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize) for _ in range(len(functions) + 1)]
+
+    threads = [threading.Thread(target=_feed, args=(items, queues[0], stop), daemon=True)]
+    for i, function in enumerate(functions):
+        threads.append(threading.Thread(target=_stage, args=(function, queues[i], queues[i + 1], stop),
+                                        daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is _End:
+                break
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+    finally:
+        stop.set()
+
+
+class ColumnPipe(schemaflow.pipe.Pipe):
+    """
+    A :class:`~schemaflow.pipe.Pipe` whose :meth:`transform` applies :meth:`transform_column` to each column
+    of a ``pandas.DataFrame`` independently.
+
+    Because columns are independent, :meth:`transform` shards the columns of each key in
+    :attr:`transform_columns` across an executor and reassembles the DataFrame with the original column order.
+    Use ``executor='thread'`` when :meth:`transform_column` is dominated by numpy/pandas operations
+    that release the GIL, and ``executor='process'`` for pure-Python column transformations
+    (the pipe and each shard of columns are pickled to the workers).
+
+    Subclasses declare:
+
+    - :attr:`transform_columns`, the keys of ``data`` whose DataFrame is transformed column-wise
+    - :meth:`transform_column`, the transformation of a single column
+    """
+    #: set of keys of ``data`` whose ``pandas.DataFrame`` is transformed column by column.
+    transform_columns = set()
+
+    #: the executor used to shard columns: ``None`` (sequential), ``'thread'`` or ``'process'``.
+    executor = 'thread'
+
+    #: the maximum number of workers of the executor (default: the executor's default).
+    n_jobs = None
+
+    def _transform_shard(self, shard):
+        import pandas
+
+        key, df = shard
+        return pandas.DataFrame(dict((column, self.transform_column(key, df[column])) for column in df.columns),
+                                index=df.index, columns=df.columns)
+
+    def _shards(self, key, df):
+        import os
+        import numpy
+
+        if not len(df.columns):
+            return []
+        n_workers = self.n_jobs or os.cpu_count() or 1
+        n_shards = min(len(df.columns), 4 * n_workers)
+        return [(key, df.iloc[:, indices]) for indices in numpy.array_split(numpy.arange(len(df.columns)), n_shards)]
+
+    def transform_column(self, key: str, column):
+        """
+        Transforms a single column of the DataFrame in ``data[key]``.
+
+        :param key: the key of ``data`` the column belongs to.
+        :param column: a ``pandas.Series``.
+        :return: the transformed ``pandas.Series``.
+        """
+        return column
+
+    def transform(self, data: dict):
+        """
+        Applies :meth:`transform_column` to every column of every key in :attr:`transform_columns`.
+
+        :param data: a dictionary of pairs ``(str, object)``.
+        :return: the modified data
+        """
+        import pandas
+
+        for key in self.transform_columns:
+            shards = self._shards(key, data[key])
+            if not shards:
+                continue
+            results = _map(self._transform_shard, shards, self.executor, self.n_jobs)
+            data[key] = pandas.concat(results, axis=1)
+        return data
@@ -1,5 +1,11 @@
+import asyncio
+import collections
+import concurrent.futures
+import copy
+
 import schemaflow.types
 import schemaflow.ops
+import schemaflow.fingerprint
 import schemaflow.exceptions as _exceptions
 
 
@@ -31,6 +37,159 @@ def _check_schema_types(schema: dict, expected: dict, error_location: str, raise
     return exceptions
 
 
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def _transform(pipe, data: dict):
+    """
+    Calls ``pipe.transform(data)``, running it to completion when it is an ``async def transform``.
+
+    When an event loop is already running in this thread (e.g. in Jupyter or in an async web handler),
+    the coroutine runs in a new loop of a worker thread, blocking the running loop until it completes;
+    use :meth:`Pipe.atransform` to await it instead.
+    """
+    result = pipe.transform(data)
+    if asyncio.iscoroutine(result):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return _run(result)
+        # a loop cannot run while another loop runs in the same thread
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            return executor.submit(_run, result).result()
+    return result
+
+
+def _to_batch(records: list, requires: dict):
+    """
+    Returns the data (a batch) with the rows ``records`` (dictionaries with the same keys). The values of keys
+    declared in ``requires`` as a :class:`~schemaflow.types.PandasDataFrame`, an :class:`~schemaflow.types.Array`,
+    a :class:`~schemaflow.types.List` or a :class:`~schemaflow.types.Tuple` are stacked (numeric columns and
+    arrays are converted to their declared dtype); other values are taken from the first record.
+    """
+    data = {}
+    for key in records[0]:
+        values = [record[key] for record in records]
+        value_type = requires.get(key)
+        if isinstance(value_type, schemaflow.types.PandasDataFrame):
+            import numpy
+            import pandas
+            data[key] = pandas.DataFrame(values)
+            # e.g. integers of a record parsed from JSON in a column declared as float
+            dtypes = dict((column, column_type.base_type) for column, column_type in value_type.schema.items()
+                          if column in data[key] and isinstance(column_type.base_type, (numpy.dtype, type)) and
+                          issubclass(numpy.dtype(column_type.base_type).type, numpy.number))
+            data[key] = data[key].astype(dtypes)
+        elif isinstance(value_type, schemaflow.types.Array):
+            import numpy
+            data[key] = numpy.asarray(values, dtype=value_type._items_type.base_type)
+        elif isinstance(value_type, schemaflow.types._Container):
+            data[key] = value_type.base_type()(values)
+        else:
+            data[key] = values[0]
+    return data
+
+
+def _rows(value, n_rows: int):
+    """
+    Returns the ``n_rows`` rows of a batch ``value``: dictionaries of columns for a ``pandas.DataFrame`` and
+    items for other sequences; values without rows are repeated.
+    """
+    module = type(value).__module__.split('.')[0]
+    if module == 'pandas' and hasattr(value, 'columns'):
+        return value.to_dict('records')
+    elif module == 'pandas' and hasattr(value, 'iloc'):
+        return list(value)
+    elif module == 'numpy' and getattr(value, 'ndim', 0) > 0:
+        return list(value)
+    elif module == 'scipy' and hasattr(value, 'shape'):
+        return [value[i] for i in range(value.shape[0])]
+    elif isinstance(value, (list, tuple)):
+        return list(value)
+    return [value] * n_rows
+
+
+def _to_records(data: dict, records: list, modifies):
+    """
+    Returns ``records`` updated with the rows of the keys ``modifies`` of the batch ``data``
+    (and without the keys of ``modifies`` that are not in ``data``).
+    """
+    results = [dict(record) for record in records]
+    for key in modifies:
+        if key in data:
+            for result, row in zip(results, _rows(data[key], len(records))):
+                result[key] = row
+        else:
+            for result in results:
+                result.pop(key, None)
+    return results
+
+
+def _transform_row_batch(pipe, record: dict, requires: dict=None, modifies=None):
+    """
+    Transforms ``record`` with ``pipe.transform`` on a batch of one row: the keys of ``record`` required by
+    the pipe are converted to batches according to their declared types and the keys modified by the pipe are
+    converted back to records.
+    """
+    if requires is None:
+        requires = pipe.transform_requires
+    if modifies is None:
+        modifies = pipe.transform_modifies
+
+    data = _transform(pipe, _to_batch([record], requires))
+    return _to_records(data, [record], modifies)[0]
+
+
+class _FrozenDict(dict):
+    """
+    A ``dict`` that cannot be modified, used for the state of frozen pipes.
+    """
+    def _frozen(self, *args, **kwargs):
+        raise _exceptions.FrozenError()
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _frozen
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+class _FrozenOrderedDict(collections.OrderedDict):
+    """
+    An ``OrderedDict`` that cannot be modified, used for the pipes of frozen pipelines.
+    """
+    def __init__(self, items=()):
+        super().__init__()
+        for key, value in (items.items() if isinstance(items, dict) else items):
+            collections.OrderedDict.__setitem__(self, key, value)
+
+    _frozen = _FrozenDict._frozen
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = move_to_end = _frozen
+
+    def __reduce__(self):
+        return self.__class__, (list(self.items()),)
+
+
+def _freeze_value(value):
+    """
+    Returns ``value`` made read-only: dictionaries are frozen recursively and ``numpy`` arrays are made non-writeable.
+    """
+    if isinstance(value, dict):
+        return _FrozenDict((key, _freeze_value(item)) for key, item in value.items())
+    if type(value).__module__ == 'numpy' and getattr(value, 'ndim', 0) > 0:
+        value.flags.writeable = False
+    return value
+
+
+def _has_transform_row(pipe):
+    return type(pipe).transform_row is not Pipe.transform_row
+
+
 class Pipe:
     """
     A Pipe represents a stateful data transformation.
@@ -87,10 +246,30 @@ class Pipe:
     #: type and key of :meth:`~transform`
     transform_modifies = {}
 
+    #: the keys of :attr:`state` read by :meth:`~transform` (default: ``None``, all keys); the other keys are only
+    #: kept for fitting and are dropped by :func:`~schemaflow.export.export`.
+    transform_state = None
+
+    #: when set, :meth:`~schemaflow.pipeline.Pipeline.fit` fits the pipe on a random sample of the rows of the data
+    #: (while the following pipes receive all rows): the number of rows (``int``) or the fraction of rows (``float``).
+    fit_sample = None
+
+    #: the key of the data, or column of a DataFrame, whose values stratify the sample of :attr:`fit_sample`.
+    fit_sample_by = None
+
+    #: whether :meth:`~transform` transforms each row of the data independently of the other rows
+    #: (e.g. a scaler with fitted means); used by :meth:`~schemaflow.pipeline.Pipeline.incremental_transform`.
+    row_independent = False
+
+    #: the :class:`~schemaflow.memory.BufferPool` used by :meth:`output_buffer` (default: none, allocate per call).
+    buffer_pool = None
+
     def __init__(self):
         self.state = {}  #: A dictionary with the states of the Pipe. Use [] operator to access and modify it.
 
     def __setitem__(self, key, value):
+        if self.frozen:
+            raise _exceptions.FrozenError(self)
         self.state.__setitem__(key, value)
 
     def __getitem__(self, key):
@@ -98,6 +277,92 @@ class Pipe:
             raise _exceptions.NotFittedError(self, key)
         return self.state.__getitem__(key)
 
+    @property
+    def frozen(self):
+        """
+        Whether the pipe is frozen (see :meth:`freeze`).
+        """
+        return isinstance(self.state, _FrozenDict)
+
+    def _freeze(self):
+        self.state = _freeze_value(self.state)
+
+    def freeze(self):
+        """
+        Returns a frozen copy of the (fitted) pipe: its :attr:`state` cannot be modified (``numpy`` arrays in it are
+        read-only) and assigning state raises :class:`~schemaflow.exceptions.FrozenError`.
+
+        Only dictionaries and ``numpy`` arrays of the state are frozen: objects of other libraries in it
+        (e.g. a fitted ``sklearn`` estimator) can still be modified through their own attributes. A frozen pipe
+        whose transform does not modify such objects can be transformed concurrently by many threads without
+        locks. To update a served pipe, fit a new (or the original) pipe, freeze it and replace the reference to
+        the old frozen pipe, which is atomic.
+
+        :return: the frozen :class:`Pipe`.
+        """
+        frozen = copy.deepcopy(self)
+        frozen._freeze()
+        return frozen
+
+    def use_buffer_pool(self, pool=None):
+        """
+        Assigns a :class:`~schemaflow.memory.BufferPool` to the pipe, so that :meth:`output_buffer`
+        re-uses arrays across calls of :meth:`transform`.
+
+        :param pool: a :class:`~schemaflow.memory.BufferPool` (default: a new pool).
+        :return: the pool.
+        """
+        if pool is None:
+            import schemaflow.memory
+            pool = schemaflow.memory.BufferPool()
+        self.buffer_pool = pool
+        return pool
+
+    def output_buffer(self, key: str, shape: tuple=None):
+        """
+        Returns an array to be filled by :meth:`transform` and assigned to ``data[key]``, whose dtype and shape
+        are those declared by the :class:`~schemaflow.types.Array` of ``key`` in :attr:`transform_modifies`.
+        When the pipe has a :attr:`buffer_pool`, the same array is returned on every call with the same shape
+        (see :class:`~schemaflow.memory.BufferPool`); otherwise a new array is allocated.
+
+        :param key: a key of :attr:`transform_modifies` declared as an :class:`~schemaflow.types.Array`.
+        :param shape: the shape of the array; required when the declared shape has unknown (``None``) dimensions.
+        :return: a ``numpy.ndarray`` with undefined content.
+        """
+        import numpy
+
+        array_type = self.transform_modifies[key]
+        if not isinstance(array_type, schemaflow.types.Array):
+            raise TypeError('The key \'%s\' must be declared as an Array in transform_modifies' % key)
+        if shape is None:
+            shape = array_type.shape
+            if shape is None or None in shape:
+                raise ValueError('The shape of \'%s\' must be passed when its declared shape is %s' %
+                                 (key, array_type.shape))
+        dtype = array_type._items_type.base_type
+        if self.buffer_pool is None:
+            return numpy.empty(shape, dtype)
+        return self.buffer_pool.get(self, key, shape, dtype)
+
+    @property
+    def fingerprint(self):
+        """
+        A fingerprint of the pipe: two pipes of the same class with the same :attr:`state` and
+        attributes (e.g. its configuration) have the same fingerprint. Private attributes (starting with ``_``)
+        and the :attr:`buffer_pool` are bookkeeping, not configuration, and are ignored.
+
+        :return: a hexadecimal ``str``.
+        """
+        return schemaflow.fingerprint.fingerprint((self.__class__.__module__, self.__class__.__qualname__,
+                                                   self._attributes()))
+
+    def _attributes(self):
+        """
+        Returns the attributes of the pipe without bookkeeping (private attributes and the :attr:`buffer_pool`).
+        """
+        return dict((key, value) for key, value in self.__dict__.items()
+                    if not key.startswith('_') and key != 'buffer_pool')
+
     @property
     def check_requirements(self):
         """
@@ -208,11 +473,60 @@ class Pipe:
         :return: ``None``
         """
 
+    def warm_fit(self, data: dict, parameters: dict=None, previous=None):
+        """
+        Modifies the instance's :attr:`state` when a previously fitted pipe of the same class is available, e.g.
+        to initialize an iterative model from the previous coefficients.
+        By default, it ignores ``previous`` and calls :meth:`fit`.
+
+        :param data: a dictionary of pairs ``(str, object)``.
+        :param parameters: a dictionary of pairs ``(str, object)``.
+        :param previous: the previously fitted :class:`Pipe`.
+        :return: ``None``
+        """
+        if parameters is None:
+            self.fit(data)
+        else:
+            self.fit(data, parameters)
+
     def transform(self, data: dict):
         """
         Modifies the data keys identified in :attr:`transform_modifies`.
 
+        Subclasses may define it as ``async def transform`` (e.g. when it waits on a database or a feature store),
+        in which case :meth:`atransform` awaits it.
+
         :param data: a dictionary of pairs ``(str, object)``.
         :return: the modified data
         """
         return data
+
+    def transform_row(self, record: dict):
+        """
+        Transforms a single record, a dictionary whose values are a single row of each key of ``data``
+        (e.g. a dictionary of columns for a ``pandas.DataFrame`` or a scalar for an
+        :class:`~schemaflow.types.Array`), and returns the transformed record.
+
+        Pipes used for low-latency scoring of one record at a time can implement it on scalars, bypassing the
+        overhead of building batches. By default, it calls :meth:`transform` on a batch of one row, built from the
+        types declared in :attr:`transform_requires`. See :meth:`~schemaflow.pipeline.Pipeline.compile_row`.
+
+        :param record: a dictionary of pairs ``(str, object)``.
+        :return: the transformed record
+        """
+        return _transform_row_batch(self, record)
+
+    async def atransform(self, data: dict):
+        """
+        Asynchronous version of :meth:`transform`.
+
+        Awaits :meth:`transform` when it is a coroutine function and otherwise runs it in the event loop's
+        default executor, so that it does not block the loop.
+
+        :param data: a dictionary of pairs ``(str, object)``.
+        :return: the modified data
+        """
+        if asyncio.iscoroutinefunction(self.transform):
+            return await self.transform(data)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.transform, data)
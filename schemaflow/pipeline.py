@@ -1,7 +1,13 @@
+import asyncio
 import collections
+import functools
 import logging
 
 import schemaflow.pipe
+import schemaflow.ops
+import schemaflow.parallel
+import schemaflow.fingerprint
+import schemaflow.spark
 import schemaflow.types
 import schemaflow.exceptions as _exceptions
 
@@ -9,6 +15,92 @@ logger = logging.getLogger('schemaflow')
 logger.setLevel(logging.DEBUG)
 
 
+def _fit_data(pipe: schemaflow.pipe.Pipe, data: dict):
+    """
+    Returns the data used to fit ``pipe``: a sample of ``data`` when the pipe declares a
+    :attr:`~schemaflow.pipe.Pipe.fit_sample`, and a (shallow) copy of ``data`` when it is a nested pipeline.
+    """
+    if pipe.fit_sample is None:
+        # a nested pipeline transforms the data it is fitted on, which is then transformed again by it
+        return data.copy() if isinstance(pipe, Pipeline) else data
+    return schemaflow.types._sample(data, pipe.fit_sample, pipe.fit_sample_by)
+
+
+def _reuse_state(pipe: schemaflow.pipe.Pipe, previous: schemaflow.pipe.Pipe):
+    """
+    Assigns the state of the fitted pipe ``previous`` to ``pipe``, and of each of its nested pipes (e.g. the
+    branches of a :class:`Union`) to the nested pipe of ``pipe`` with the same name.
+    """
+    pipe.state = previous.state.copy()
+    for name, nested in getattr(pipe, 'pipes', {}).items():
+        _reuse_state(nested, previous.pipes[name])
+
+
+def _to_ordered_dict(pipes):
+    """
+    Converts a ``list`` of pipes or tuples ``(name, Pipe)`` into an ``OrderedDict`` of pipes.
+    """
+    if isinstance(pipes, collections.OrderedDict):
+        return pipes
+    elif not isinstance(pipes, list):
+        raise TypeError('Pipes must a list or OrderedDict')
+
+    assert len(pipes) > 0
+    result = collections.OrderedDict()
+    for i, item in enumerate(pipes):
+        if isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], schemaflow.pipe.Pipe) and \
+                   isinstance(item[0], str):
+            result[item[0]] = item[1]
+        elif isinstance(item, schemaflow.pipe.Pipe):
+            result[str(i)] = item
+        else:
+            raise TypeError('Items must be pipes or 2-element tuples of the form `(str, Pipe)`')
+    return result
+
+
+def _independent_stages(pipes: collections.OrderedDict):
+    """
+    Groups consecutive pipes into stages of pipes that can be transformed concurrently, i.e. no pipe
+    of a stage modifies a key that another pipe of the same stage requires or modifies.
+    Pipes that declare neither :attr:`~schemaflow.pipe.Pipe.transform_requires` nor
+    :attr:`~schemaflow.pipe.Pipe.transform_modifies` may use any key, and are therefore a stage of their own.
+
+    :param pipes: an ``OrderedDict`` of :attr:`~schemaflow.pipe.Pipe`.
+    :return: a list of lists of pairs ``(name, Pipe)``.
+    """
+    stages = []
+    reads = set()
+    writes = set()
+    barrier = False
+    for name, pipe in pipes.items():
+        pipe_reads = set(pipe.transform_requires.keys())
+        pipe_writes = set(pipe.transform_modifies.keys())
+        undeclared = not pipe_reads and not pipe_writes
+        if not stages or barrier or undeclared or pipe_writes & (reads | writes) or pipe_reads & writes:
+            stages.append([])
+            reads = set()
+            writes = set()
+        stages[-1].append((name, pipe))
+        reads |= pipe_reads
+        writes |= pipe_writes
+        barrier = undeclared
+    return stages
+
+
+def _merge(data: dict, results: list):
+    """
+    Merges the results of pipes transformed concurrently from (shallow copies of) ``data``.
+    """
+    merged = data.copy()
+    for result in results:
+        for key in set(data.keys()) - set(result.keys()):
+            merged.pop(key, None)
+        for key, value in result.items():
+            if key not in data or value is not data[key]:
+                merged[key] = value
+    return merged
+
+
 class Pipeline(schemaflow.pipe.Pipe):
     """
     A list of :class:`~schemaflow.pipe.Pipe`'s that are applied sequentially.
@@ -19,26 +111,19 @@ class Pipeline(schemaflow.pipe.Pipe):
     :param pipes: a ``list`` or ``OrderedDict`` of :attr:`~schemaflow.pipe.Pipe`.
         If passed as a list, you can either pass pipes or tuples ``(name, Pipe)``.
     """
+    #: the name of the ``pyspark.StorageLevel`` used to persist ``pyspark.sql.DataFrame`` s read by more than one
+    #: pipe (see :meth:`fit` and :meth:`transform`), or ``None`` to never persist them.
+    persist_level = 'MEMORY_AND_DISK'
+    #: whether :meth:`transform` also persists them (``False`` by default, since they are kept persisted until
+    #: :meth:`unpersist` is called).
+    persist_transform = False
+
     def __init__(self, pipes):
         super().__init__()
-        if isinstance(pipes, collections.OrderedDict):
-            self.pipes = pipes
-            return
-        elif not isinstance(pipes, list):
-            raise TypeError('Pipes must a list or OrderedDict')
-
-        assert len(pipes) > 0
         #: An ``OrderedDict`` whose keys are the pipe's names or ``str(index)`` where ``index`` is the pipe's
         #: position in the sequence and the values are :attr:`~schemaflow.pipe.Pipe`'s.
-        self.pipes = collections.OrderedDict()
-        for i, item in enumerate(pipes):
-            if isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], schemaflow.pipe.Pipe) and \
-                       isinstance(item[0], str):
-                self.pipes[item[0]] = item[1]
-            elif isinstance(item, schemaflow.pipe.Pipe):
-                self.pipes[str(i)] = item
-            else:
-                raise TypeError('Items must be pipes or 2-element tuples of the form `(str, Pipe)`')
+        self.pipes = _to_ordered_dict(pipes)
+        self._persister = schemaflow.spark.Persister()
 
     @property
     def fit_requires(self):
@@ -122,6 +207,32 @@ class Pipeline(schemaflow.pipe.Pipe):
             requirements = requirements.union(pipe.requirements)
         return requirements
 
+    @property
+    def row_independent(self):
+        """
+        Whether all pipes of the Pipeline are :attr:`~schemaflow.pipe.Pipe.row_independent`.
+        """
+        return all(pipe.row_independent for pipe in self.pipes.values())
+
+    def _freeze(self):
+        super()._freeze()
+        for pipe in self.pipes.values():
+            pipe._freeze()
+        self.pipes = schemaflow.pipe._FrozenOrderedDict(self.pipes)
+
+    def use_buffer_pool(self, pool=None):
+        """
+        Assigns a :class:`~schemaflow.memory.BufferPool` to every pipe of the Pipeline
+        (see :meth:`~schemaflow.pipe.Pipe.use_buffer_pool`).
+
+        :param pool: a :class:`~schemaflow.memory.BufferPool` (default: a new pool).
+        :return: the pool.
+        """
+        pool = super().use_buffer_pool(pool)
+        for pipe in self.pipes.values():
+            pipe.use_buffer_pool(pool)
+        return pool
+
     def check_transform(self, data: dict=None, raise_: bool=False):
         errors = []
         for key, pipe in self.pipes.items():
@@ -158,17 +269,207 @@ class Pipeline(schemaflow.pipe.Pipe):
             data = pipe._transform_schema(data)
         return errors
 
+    def _reads_writes(self, fit: bool):
+        """
+        Returns the keys read and modified by each pipe in :meth:`fit` (when ``fit=True``) or in :meth:`transform`.
+        """
+        reads = []
+        for pipe in self.pipes.values():
+            keys = set(pipe.transform_requires)
+            if fit:
+                keys |= set(pipe.fit_requires)
+            reads.append(keys)
+        return reads, [set(pipe.transform_modifies) for pipe in self.pipes.values()]
+
     def transform(self, data: dict):
         """
         Applies each of :meth:`~schemaflow.pipe.Pipe.transform` sequentially into ``data``.
 
+        When :attr:`persist_transform` is set, ``pyspark.sql.DataFrame`` s read by more than one pipe are persisted,
+        so that Spark computes them once when the (lazy) result is evaluated. Since that happens after this method
+        returns, they are kept persisted until :meth:`unpersist` is called.
+
         :param data: a dictionary of pairs ``str, object``.
         :return: the transformed data.
         """
-        for key, pipe in self.pipes.items():
-            data = pipe.transform(data)
+        reads_writes = None
+        for index, pipe in enumerate(self.pipes.values()):
+            if self.persist_transform and self.persist_level is not None and \
+                    schemaflow.spark._has_dataframes(data):
+                if reads_writes is None:
+                    reads_writes = self._reads_writes(fit=False)
+                self._persister.storage_level = self.persist_level
+                self._persister.persist(data, *reads_writes, start=index)
+            data = schemaflow.pipe._transform(pipe, data)
         return data
 
+    def unpersist(self):
+        """
+        Unpersists the ``pyspark.sql.DataFrame`` s persisted by :meth:`transform` of this and of nested Pipelines.
+        Call it once the results of :meth:`transform` have been evaluated.
+        """
+        self._persister.unpersist()
+        for pipe in self.pipes.values():
+            if isinstance(pipe, Pipeline):
+                pipe.unpersist()
+
+    def compile_row(self):
+        """
+        Compiles the Pipeline into a single function that transforms one record
+        (see :meth:`~schemaflow.pipe.Pipe.transform_row`), for low-latency scoring.
+
+        Pipes that implement :meth:`~schemaflow.pipe.Pipe.transform_row` transform the record directly.
+        Consecutive pipes that do not implement it are grouped and transform a batch of one row built once
+        for the whole group, from their declared :attr:`~schemaflow.pipe.Pipe.transform_requires`.
+        Nested Pipelines are compiled once, with the Pipeline.
+
+        Compile the Pipeline once (e.g. after :meth:`fit`) and call the returned function per record.
+
+        :return: a function that receives a record (a dictionary) and returns the transformed record.
+        """
+        steps = []
+        batch_pipes = []
+        for name, pipe in list(self.pipes.items()) + [(None, None)]:
+            if pipe is not None and not schemaflow.pipe._has_transform_row(pipe):
+                batch_pipes.append((name, pipe))
+                continue
+            if batch_pipes:
+                batch = Pipeline(batch_pipes)
+                steps.append(functools.partial(schemaflow.pipe._transform_row_batch, batch,
+                                               requires=batch.transform_requires,
+                                               modifies=set(batch.transform_modifies)))
+                batch_pipes = []
+            if isinstance(pipe, Pipeline):
+                steps.append(pipe.compile_row())
+            elif pipe is not None:
+                steps.append(pipe.transform_row)
+
+        def transform_row(record: dict):
+            for step in steps:
+                record = step(record)
+            return record
+        return transform_row
+
+    def transform_row(self, record: dict):
+        """
+        Transforms a single record with the function returned by :meth:`compile_row`.
+
+        :param record: a dictionary of pairs ``(str, object)``.
+        :return: the transformed record
+        """
+        return self.compile_row()(record)
+
+    def incremental_transform(self, data: dict, store, key: str):
+        """
+        Performs the same operation as :meth:`transform`, re-using the rows computed by a previous call.
+
+        The rows of ``data[key]`` are fingerprinted (see :func:`~schemaflow.fingerprint.row_fingerprints`) and
+        stored in ``store`` together with the outputs. On the next call, only new or changed rows are transformed,
+        and the outputs of the remaining rows are taken from ``store``. This is only valid when all pipes are
+        :attr:`~schemaflow.pipe.Pipe.row_independent`; otherwise, this is equivalent to :meth:`transform`.
+        The stored outputs are discarded when the pipeline's :attr:`~schemaflow.pipe.Pipe.fingerprint`
+        or the remaining keys of ``data`` change.
+
+        :param data: a dictionary of pairs ``str, object``.
+        :param store: a mutable mapping (e.g. a ``dict`` or a ``shelve.Shelf`` to persist it between runs).
+        :param key: the key of ``data`` whose rows are transformed, e.g. a ``pandas.DataFrame``.
+            Other values with the same number of rows are split alongside it.
+        :return: the transformed data.
+        """
+        import numpy
+
+        if not self.row_independent:
+            logger.warning('Pipeline is not row independent: transforming all rows')
+            return self.transform(data)
+
+        n_rows = schemaflow.types._n_rows({key: data[key]})
+        hashes = schemaflow.fingerprint.row_fingerprints(data[key])
+        fingerprint = schemaflow.fingerprint.fingerprint(
+            (self.fingerprint, dict((k, v) for k, v in data.items() if not schemaflow.types._has_rows(v, n_rows))))
+
+        if store.get('fingerprint') == fingerprint:
+            previous_hashes = store['hashes']
+            previous_outputs = store['outputs']
+        else:
+            previous_hashes = numpy.array([], dtype=numpy.uint64)
+            previous_outputs = {}
+
+        # position of each row in the previous rows (-1 when it is new)
+        unique_hashes, first_positions = numpy.unique(previous_hashes, return_index=True)
+        positions = numpy.searchsorted(unique_hashes, hashes)
+        positions[positions == len(unique_hashes)] = 0
+        found = (unique_hashes[positions] == hashes) if len(unique_hashes) else numpy.zeros(n_rows, dtype=bool)
+        old_rows = numpy.where(found)[0]
+        new_rows = numpy.where(~found)[0]
+
+        if len(new_rows):
+            result = self.transform(schemaflow.types._take_rows(data, new_rows, key))
+        else:
+            # the keys of ``data`` as transform would return them
+            result = dict((k, v) for k, v in data.items() if not isinstance(self.transform_modifies.get(k),
+                                                                           schemaflow.ops.Drop))
+            result.update((k, v) for k, v in previous_outputs.items()
+                          if not schemaflow.types._has_rows(v, len(previous_hashes)))
+
+        order = numpy.argsort(numpy.concatenate([old_rows, new_rows]), kind='stable')
+        for output_key, value in previous_outputs.items():
+            if not schemaflow.types._has_rows(value, len(previous_hashes)):
+                continue
+            parts = [schemaflow.types._take(value, first_positions[positions[old_rows]])]
+            if len(new_rows):
+                parts.append(result[output_key])
+            value = schemaflow.types._take(schemaflow.types._concat(parts), order)
+            if hasattr(value, 'index') and hasattr(data[key], 'index'):
+                value.index = data[key].index
+            result[output_key] = value
+
+        transform_modifies = self.transform_modifies
+        for input_key, value in data.items():
+            if input_key in result and input_key not in transform_modifies:
+                result[input_key] = value
+
+        store['fingerprint'] = fingerprint
+        store['hashes'] = hashes
+        store['outputs'] = dict((k, v) for k, v in result.items() if k in transform_modifies)
+        return result
+
+    async def atransform(self, data: dict):
+        """
+        Asynchronous version of :meth:`transform`.
+
+        Consecutive pipes that are independent according to their :attr:`~schemaflow.pipe.Pipe.transform_requires`
+        and :attr:`~schemaflow.pipe.Pipe.transform_modifies` are transformed concurrently, each on a shallow copy of
+        ``data``, and their results are merged. Pipes with ``async def transform`` are awaited;
+        the remaining pipes run in the event loop's default executor.
+
+        :param data: a dictionary of pairs ``str, object``.
+        :return: the transformed data.
+        """
+        for stage in _independent_stages(self.pipes):
+            if len(stage) == 1:
+                data = await stage[0][1].atransform(data)
+            else:
+                results = await asyncio.gather(*[pipe.atransform(data.copy()) for _, pipe in stage])
+                data = _merge(data, results)
+        return data
+
+    def transform_stream(self, batches, maxsize: int=1):
+        """
+        Applies :meth:`transform` to each of ``batches``, running each pipe as its own stage (thread).
+
+        Pipe ``k`` transforms batch ``i + 1`` while pipe ``k + 1`` transforms batch ``i``, so that I/O-bound
+        pipes (e.g. reading from disk) overlap with CPU-bound pipes (e.g. models) that release the GIL.
+        Stages are connected by bounded queues, so a slow pipe applies backpressure to the pipes before it.
+
+        Pipes must not share mutable objects between batches, as different batches are transformed concurrently.
+
+        :param batches: an iterable of dictionaries of pairs ``str, object``.
+        :param maxsize: the maximum number of batches waiting between two pipes.
+        :return: a generator with the transformed batches, in order.
+        """
+        functions = [functools.partial(schemaflow.pipe._transform, pipe) for pipe in self.pipes.values()]
+        return schemaflow.parallel.staged(functions, batches, maxsize)
+
     def transform_schema(self, schema: dict):
         for key, pipe in self.pipes.items():
             try:
@@ -179,24 +480,92 @@ class Pipeline(schemaflow.pipe.Pipe):
             schema = pipe.transform_schema(schema)
         return schema
 
-    def fit(self, data: dict, parameters: dict=None):
+    def _fit_fingerprint(self, pipe: schemaflow.pipe.Pipe, data: dict, parameters: dict):
+        required_data = pipe.fit_requires if pipe.fit_requires else pipe.transform_requires
+        values = dict((key, data[key]) for key in required_data if key in data)
+        configuration = pipe._attributes()
+        del configuration['state']
+        try:
+            return schemaflow.fingerprint.fingerprint(
+                (pipe.__class__.__module__, pipe.__class__.__qualname__, configuration, values, parameters))
+        except Exception:
+            # e.g. values that cannot be pickled: the pipe is always re-fitted
+            return None
+
+    def fit(self, data: dict, parameters: dict=None, previous=None, warm_start: bool=False):
         """
         Fits the :attr:`pipes` in sequence: ``p1.fit``, ``p1.transform``, ``p2.fit``, ``p2.transform``,
         ..., ``pN.transform``.
 
+        Pipes with a :attr:`~schemaflow.pipe.Pipe.fit_sample` are fitted on a sample of the rows, but transform
+        (and pass to the following pipes) all rows.
+
+        ``pyspark.sql.DataFrame`` s read by more than one pipe (in fit or transform) are persisted with
+        :attr:`persist_level` (unless it is ``None``) and unpersisted after their last reader, so that Spark does not
+        recompute their lineage for each pipe.
+
+        When ``previous`` is passed, each pipe is compared with the pipe of ``previous`` with the same name and class:
+
+        - if the fingerprints of the values of its :attr:`~schemaflow.pipe.Pipe.fit_requires` (or
+          :attr:`~schemaflow.pipe.Pipe.transform_requires` when it has none), of its parameters and of its
+          configuration (its attributes other than the :attr:`~schemaflow.pipe.Pipe.state`) are unchanged,
+          the pipe keeps the previous state without being fitted;
+        - otherwise, it is fitted with :meth:`~schemaflow.pipe.Pipe.warm_fit`, which pipes can override
+          to start from the previous state.
+
+        The fingerprints are only computed (and recorded for a later fit) when ``previous`` is passed or
+        ``warm_start=True``, since hashing the data is costly.
+
         :param data: a dictionary of pairs ``(str, object)``.
         :param parameters: a dictionary ``{pipe_name: {str: object}}``, where each of its value is the parameters
             to be passed to the respective's pipe named ``pipe_name``.
+        :param previous: a fitted :class:`~schemaflow.pipeline.Pipeline` with the same pipes (e.g. fitted on a previous
+            version of the data).
+        :param warm_start: whether to record the fingerprints of the inputs of each pipe, so that this pipeline can be
+            the ``previous`` of a later fit (implied when ``previous`` is passed).
         :return: ``None``
         """
+        if self.frozen:
+            raise _exceptions.FrozenError(self)
         if parameters is None:
             parameters = {}
-        for key, pipe in self.pipes.items():
-            if key in parameters:
-                pipe.fit(data, parameters[key])
-            else:
-                pipe.fit(data)
-            data = pipe.transform(data)
+        warm_start = warm_start or previous is not None
+        previous_fingerprints = getattr(previous, '_fit_fingerprints', {})
+        self._fit_fingerprints = {}
+        persister = schemaflow.spark.Persister(self.persist_level)
+        reads_writes = None
+        try:
+            for index, (key, pipe) in enumerate(self.pipes.items()):
+                if self.persist_level is not None and schemaflow.spark._has_dataframes(data):
+                    if reads_writes is None:
+                        reads_writes = self._reads_writes(fit=True)
+                    persister.persist(data, *reads_writes, start=index)
+
+                previous_pipe = previous.pipes.get(key) if previous is not None else None
+                if previous_pipe is not None and type(previous_pipe) != type(pipe):
+                    previous_pipe = None
+
+                fingerprint = None
+                if warm_start and not isinstance(pipe, Pipeline):
+                    fingerprint = self._fit_fingerprint(pipe, data, parameters.get(key))
+                    self._fit_fingerprints[key] = fingerprint
+
+                if isinstance(pipe, Pipeline) and warm_start:
+                    pipe.fit(_fit_data(pipe, data), parameters.get(key), previous_pipe, warm_start=True)
+                elif previous_pipe is None:
+                    if key in parameters:
+                        pipe.fit(_fit_data(pipe, data), parameters[key])
+                    else:
+                        pipe.fit(_fit_data(pipe, data))
+                elif fingerprint is not None and previous_fingerprints.get(key) == fingerprint:
+                    logger.debug('Fit \'%s\' (%s) skipped: inputs unchanged' % (key, pipe.__class__.__name__))
+                    _reuse_state(pipe, previous_pipe)
+                else:
+                    pipe.warm_fit(_fit_data(pipe, data), parameters.get(key), previous_pipe)
+                data = schemaflow.pipe._transform(pipe, data)
+                persister.unpersist(index + 1)
+        finally:
+            persister.unpersist()
 
     def _logged_transform(self, key, data):
         input_schema = schemaflow.types.infer_schema(data)
@@ -206,7 +575,7 @@ class Pipeline(schemaflow.pipe.Pipe):
             error.locations.append('in %s' % key)
             logger.error(str(error))
 
-        data = self.pipes[key].transform(data)
+        data = schemaflow.pipe._transform(self.pipes[key], data)
         output_schema = schemaflow.types.infer_schema(data)
 
         for error in self.pipes[key].check_transform_modifies(input_schema.copy(), output_schema):
@@ -254,9 +623,196 @@ class Pipeline(schemaflow.pipe.Pipe):
             logger.info('Started fit \'%s\' (%s): %s' % (key, self.pipes[key].__class__.__name__, schema))
 
             if key in parameters:
-                pipe.fit(data, parameters[key])
+                pipe.fit(_fit_data(pipe, data), parameters[key])
             else:
-                pipe.fit(data)
+                pipe.fit(_fit_data(pipe, data))
             state_schema = dict((key, type(value)) for key, value in pipe.state.items())
             logger.info('Ended   fit \'%s\' (%s): state=%s' % (key, self.pipes[key].__class__.__name__, state_schema))
             data = self._logged_transform(key, data)
+
+
+def _fit_branch(arguments):
+    pipe, data, parameters = arguments
+    data = _fit_data(pipe, data)
+    if parameters is None:
+        pipe.fit(data)
+    else:
+        pipe.fit(data, parameters)
+    return pipe
+
+
+def _transform_branch(arguments):
+    pipe, data = arguments
+    return schemaflow.pipe._transform(pipe, data)
+
+
+class Union(schemaflow.pipe.Pipe):
+    """
+    A set of :class:`~schemaflow.pipe.Pipe`'s (branches) that are applied to the same data and whose
+    results are merged, e.g. a text, a numeric and a categorical featurization of the same data.
+
+    Branches are fitted and transformed concurrently, each on a shallow copy of the data, and therefore
+    must not mutate the values they receive in place. Two branches cannot modify the same key,
+    unless they declare the same modification of it in :attr:`~schemaflow.pipe.Pipe.transform_modifies`
+    (e.g. they share an identical preprocessing pipe), in which case the value of the last branch is kept.
+
+    :class:`~schemaflow.pipeline.Union` is a :class:`~schemaflow.pipe.Pipe` and can be part of
+    a :class:`~schemaflow.pipeline.Pipeline`.
+
+    :param pipes: a ``list`` or ``OrderedDict`` of :attr:`~schemaflow.pipe.Pipe`.
+        If passed as a list, you can either pass pipes or tuples ``(name, Pipe)``.
+    :param executor: the executor used to run the branches: ``None`` (sequential), ``'thread'`` or ``'process'``.
+    :param n_jobs: the maximum number of workers of the executor (default: the executor's default).
+    """
+    def __init__(self, pipes, executor: str='thread', n_jobs: int=None):
+        super().__init__()
+        #: An ``OrderedDict`` whose keys are the branch's names or ``str(index)`` where ``index`` is the branch's
+        #: position in the list and the values are :attr:`~schemaflow.pipe.Pipe`'s.
+        self.pipes = _to_ordered_dict(pipes)
+        self.executor = executor
+        self.n_jobs = n_jobs
+
+        modified_by = {}
+        for name, pipe in self.pipes.items():
+            for key, op in pipe.transform_modifies.items():
+                if key in modified_by and self.pipes[modified_by[key]].transform_modifies[key] != op:
+                    raise ValueError('The key \'%s\' is modified by both branches \'%s\' and \'%s\' of %s' %
+                                     (key, modified_by[key], name, self.__class__.__name__))
+                modified_by[key] = name
+
+    @property
+    def fit_requires(self):
+        """
+        The data schema required in :meth:`~fit`.
+        """
+        fit_schema = {}
+        for pipe in self.pipes.values():
+            required_data = pipe.fit_requires if pipe.fit_requires else pipe.transform_requires
+            for key, datum_type in required_data.items():
+                fit_schema.setdefault(key, datum_type)
+        return fit_schema
+
+    @property
+    def transform_requires(self):
+        """
+        The data schema required in :meth:`~transform`.
+        """
+        transform_data = {}
+        for pipe in self.pipes.values():
+            for key, datum_type in pipe.transform_requires.items():
+                transform_data.setdefault(key, datum_type)
+        return transform_data
+
+    @property
+    def transform_modifies(self):
+        """
+        The schema modifications that this Union apply in ``transform``: the modifications of all branches.
+        """
+        transform_modifies = {}
+        for pipe in self.pipes.values():
+            transform_modifies.update(pipe.transform_modifies)
+        return transform_modifies
+
+    @property
+    def fitted_parameters(self):
+        """
+        Parameters assigned to fit of each branch.
+
+        :return: a dictionary with the branch's name and their respective
+            :attr:`~schemaflow.pipe.Pipe.fitted_parameters`.
+        """
+        return dict((name, pipe.fitted_parameters) for name, pipe in self.pipes.items())
+
+    @property
+    def requirements(self):
+        """
+        Set of packages required by the Union. The union of all
+        :attr:`~schemaflow.pipe.Pipe.requirements` of all branches.
+        """
+        requirements = set()
+        for pipe in self.pipes.values():
+            requirements = requirements.union(pipe.requirements)
+        return requirements
+
+    def _freeze(self):
+        super()._freeze()
+        for pipe in self.pipes.values():
+            pipe._freeze()
+        self.pipes = schemaflow.pipe._FrozenOrderedDict(self.pipes)
+
+    def use_buffer_pool(self, pool=None):
+        pool = super().use_buffer_pool(pool)
+        for pipe in self.pipes.values():
+            pipe.use_buffer_pool(pool)
+        return pool
+
+    def check_transform(self, data: dict=None, raise_: bool=False):
+        errors = []
+        for key, pipe in self.pipes.items():
+            try:
+                errors += pipe.check_transform(data, raise_)
+            except _exceptions.SchemaFlowError as e:
+                e.locations.append('of branch \'%s\' of %s' % (key, self.__class__.__name__))
+                raise e
+        return errors
+
+    def check_fit(self, data: dict, parameters: dict=None, raise_: bool=False):
+        if parameters is None:
+            parameters = {}
+
+        errors = []
+        for key, pipe in self.pipes.items():
+            try:
+                errors += pipe.check_fit(data, parameters.get(key, {}), raise_)
+            except _exceptions.SchemaFlowError as e:
+                e.locations.append('of branch \'%s\' of %s' % (key, self.__class__.__name__))
+                raise e
+        return errors
+
+    def _transform_schema(self, schema: dict):
+        import copy
+
+        results = [(pipe, pipe._transform_schema(copy.deepcopy(schema))) for pipe in self.pipes.values()]
+        for pipe, result in results:
+            for key in pipe.transform_modifies:
+                if key in result:
+                    schema[key] = result[key]
+                else:
+                    schema.pop(key, None)
+        return schema
+
+    def transform_schema(self, schema: dict):
+        self.check_transform(schema, True)
+        return self._transform_schema(schema)
+
+    def fit(self, data: dict, parameters: dict=None):
+        """
+        Fits the branches concurrently on the same ``data``.
+
+        :param data: a dictionary of pairs ``(str, object)``.
+        :param parameters: a dictionary ``{branch_name: {str: object}}``, where each of its value is the parameters
+            to be passed to the respective's branch named ``branch_name``.
+        :return: ``None``
+        """
+        if self.frozen:
+            raise _exceptions.FrozenError(self)
+        if parameters is None:
+            parameters = {}
+        arguments = [(pipe, data.copy(), parameters.get(key)) for key, pipe in self.pipes.items()]
+        pipes = schemaflow.parallel._map(_fit_branch, arguments, self.executor, self.n_jobs)
+        # with a process executor, the fitted branches are copies
+        self.pipes = collections.OrderedDict(zip(self.pipes.keys(), pipes))
+
+    def transform(self, data: dict):
+        """
+        Transforms the branches concurrently on the same ``data`` and merges their results.
+
+        :param data: a dictionary of pairs ``str, object``.
+        :return: the transformed data.
+        """
+        arguments = [(pipe, data.copy()) for pipe in self.pipes.values()]
+        return _merge(data, schemaflow.parallel._map(_transform_branch, arguments, self.executor, self.n_jobs))
+
+    async def atransform(self, data: dict):
+        results = await asyncio.gather(*[pipe.atransform(data.copy()) for pipe in self.pipes.values()])
+        return _merge(data, results)
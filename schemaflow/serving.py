@@ -0,0 +1,563 @@
+import collections
+import concurrent.futures
+import copy
+import http.server
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+import time
+
+import schemaflow.pipe
+import schemaflow.pipeline
+import schemaflow.types
+import schemaflow.fingerprint
+import schemaflow.exceptions as _exceptions
+
+
+logger = logging.getLogger(__name__)
+
+
+_STOP = object()
+
+
+def _schema(data: dict):
+    """
+    Returns the schema of ``data`` to be checked (and propagated) by a pipeline: values with a
+    :class:`~schemaflow.types.Type` are replaced by it, other values (e.g. ``float``) are kept.
+    """
+    schema = schemaflow.types.infer_schema(data)
+    return dict((key, value if isinstance(value, schemaflow.types.Type) else data[key])
+                for key, value in schema.items())
+
+
+class MicroBatcher:
+    """
+    Transforms individual records (see :meth:`~schemaflow.pipe.Pipe.transform_row`) with a fitted
+    :class:`~schemaflow.pipeline.Pipeline` by coalescing the records submitted within a small time window
+    into a single batched :meth:`~schemaflow.pipeline.Pipeline.transform`, so that concurrent requests benefit
+    from vectorized transforms.
+
+    Records are stacked into a batch according to the types declared in the pipeline's
+    :attr:`~schemaflow.pipe.Pipe.transform_requires` (e.g. a list of dictionaries of columns becomes a
+    ``pandas.DataFrame``), and each batch is checked once with :meth:`~schemaflow.pipe.Pipe.check_transform`.
+    When a batch fails, each of its records is transformed on its own, so that the exception is only set on the
+    futures of the records that fail.
+
+    :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline` (or :class:`~schemaflow.pipe.Pipe`).
+    :param max_batch_size: the maximum number of records per batch.
+    :param max_latency: the maximum time (in seconds) a record waits for other records to join its batch.
+    :param check: whether to check each batch with :meth:`~schemaflow.pipe.Pipe.check_transform`.
+    :param cache: a :class:`TransformCache` of ``pipeline`` used to transform the batches.
+    """
+    def __init__(self, pipeline, max_batch_size: int=64, max_latency: float=0.005, check: bool=True,
+                 cache=None):
+        self.pipeline = pipeline
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.check = check
+        self._requires = pipeline.transform_requires
+        self._modifies = set(pipeline.transform_modifies)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def submit(self, record: dict):
+        """
+        Submits a record to be transformed in the next batch.
+
+        :param record: a dictionary of pairs ``(str, object)``.
+        :return: a ``concurrent.futures.Future`` with the transformed record.
+        """
+        self._start()
+        future = concurrent.futures.Future()
+        self._queue.put((record, future))
+        return future
+
+    def transform(self, record: dict):
+        """
+        Transforms a record, waiting for its batch.
+
+        :param record: a dictionary of pairs ``(str, object)``.
+        :return: the transformed record.
+        """
+        return self.submit(record).result()
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is _STOP:
+            return None, True
+        batch = [item]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                # records with different keys cannot be stacked together
+                groups = {}
+                for record, future in batch:
+                    groups.setdefault(tuple(sorted(record)), []).append((record, future))
+                for group in groups.values():
+                    self._transform(group)
+
+    def _transform_records(self, records: list):
+        data = schemaflow.pipe._to_batch(records, self._requires)
+        if self.check:
+            self.pipeline.check_transform(_schema(data), True)
+        if self.cache is not None:
+            data = self.cache.transform(data)
+        else:
+            data = schemaflow.pipe._transform(self.pipeline, data)
+        return schemaflow.pipe._to_records(data, records, self._modifies)
+
+    def _transform(self, batch: list):
+        batch = [(record, future) for record, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            results = self._transform_records([record for record, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # find the records that fail
+            for record, future in batch:
+                try:
+                    result = self._transform_records([record])[0]
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self):
+        """
+        Transforms the pending records and stops the batching thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _from_rows(rows: list, template, index=None):
+    """
+    Returns a batch with ``rows`` (see :func:`schemaflow.pipe._rows`) of the same type as the batch ``template``.
+    """
+    module = type(template).__module__.split('.')[0]
+    if module == 'pandas' and hasattr(template, 'columns'):
+        import pandas
+        df = pandas.DataFrame.from_records(rows, columns=template.columns, index=index)
+        return df.astype(template.dtypes.to_dict())
+    elif module == 'pandas' and hasattr(template, 'iloc'):
+        import pandas
+        return pandas.Series(rows, index=index, dtype=template.dtype, name=template.name)
+    elif module == 'numpy' and getattr(template, 'ndim', 0) > 0:
+        import numpy
+        if not rows:
+            return numpy.empty((0,) + template.shape[1:], template.dtype)
+        return numpy.asarray(rows, dtype=template.dtype)
+    elif isinstance(template, (list, tuple)):
+        return type(template)(rows)
+    return template
+
+
+class TransformCache:
+    """
+    A cache of the rows transformed by a fitted :class:`~schemaflow.pipeline.Pipeline`, for serving requests
+    that repeat the same inputs. Use its :meth:`transform` in place of the pipeline's, or pass it to
+    :class:`MicroBatcher`.
+
+    The rows of the values of :attr:`~schemaflow.pipe.Pipe.transform_requires` are fingerprinted in a vectorized
+    way (see :func:`~schemaflow.fingerprint.row_fingerprints`, ignoring the index). Rows already in the cache are
+    served from it, and only the remaining rows are transformed by the pipeline; the results are merged back
+    in the original order. The cache is only used when the pipeline is
+    :attr:`~schemaflow.pipe.Pipe.row_independent`; otherwise, :meth:`transform` transforms all rows.
+
+    Entries are keyed by the row fingerprints and by the values of the data without rows (e.g. parameters).
+    The outputs without rows are cached per values of the data without rows (up to ``maxsize`` of them).
+    Transformed rows are copied before they are cached, since they may be views of buffers that the pipeline
+    re-uses (see :class:`~schemaflow.memory.BufferPool`).
+    Refitting the pipeline does not invalidate the cache: use a new cache (or :meth:`clear`) after a refit.
+
+    :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline`.
+    :param maxsize: the maximum number of rows in the cache; the least recently used rows are evicted first.
+    :param ttl: the time (in seconds) a row stays in the cache (default: no expiration).
+    """
+    def __init__(self, pipeline, maxsize: int=100000, ttl: float=None):
+        self.pipeline = pipeline
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0  #: the number of rows served from the cache.
+        self.misses = 0  #: the number of rows transformed by the pipeline.
+        self._requires = sorted(pipeline.transform_requires)
+        self._modifies = set(pipeline.transform_modifies)
+        self._entries = collections.OrderedDict()
+        # per fingerprint of the values without rows: the outputs of the last transform with them
+        self._templates = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Removes all rows from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._templates.clear()
+
+    def _keys(self, data: dict, n_rows: int):
+        """
+        Returns the fingerprint of the values of ``data`` without rows and the key of each row.
+        """
+        import numpy
+
+        hashes = numpy.zeros(n_rows, dtype=numpy.uint64)
+        context = []
+        for key in self._requires:
+            if key not in data:
+                continue
+            value = data[key]
+            if schemaflow.types._has_rows(value, n_rows):
+                # FNV-style combination of the fingerprints of each key
+                with numpy.errstate(over='ignore'):
+                    hashes = (hashes * numpy.uint64(1099511628211)) ^ \
+                        schemaflow.fingerprint.row_fingerprints(value, index=False)
+            else:
+                context.append((key, value))
+        context = schemaflow.fingerprint.fingerprint(context)
+        return context, [(context, row_hash) for row_hash in hashes.tolist()]
+
+    def _get(self, key, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, row = entry
+        if expires is not None and expires < now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return row
+
+    def _put(self, key, row: dict, now: float):
+        self._entries[key] = (None if self.ttl is None else now + self.ttl, row)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def transform(self, data: dict):
+        """
+        Performs the same operation as the pipeline's :meth:`~schemaflow.pipe.Pipe.transform`, transforming only
+        the rows that are not in the cache.
+
+        :param data: a dictionary of pairs ``str, object``.
+        :return: the transformed data.
+        """
+        n_rows = schemaflow.types._n_rows(data)
+        if n_rows is None or not self.pipeline.row_independent:
+            return schemaflow.pipe._transform(self.pipeline, data)
+
+        context, keys = self._keys(data, n_rows)
+        now = time.monotonic()
+        with self._lock:
+            rows = [self._get(key, now) for key in keys]
+            misses = [i for i, row in enumerate(rows) if row is None]
+            self.hits += n_rows - len(misses)
+            self.misses += len(misses)
+            templates = self._templates.get(context)
+            if templates is not None:
+                self._templates.move_to_end(context)
+
+        if misses or templates is None:
+            result = schemaflow.pipe._transform(self.pipeline, schemaflow.types._take_rows(data, misses))
+            result = copy.deepcopy(dict((key, value) for key, value in result.items() if key in self._modifies))
+            missed_rows = schemaflow.pipe._to_records(result, [{}] * len(misses), self._modifies)
+            # the outputs of the last transform with the same values without rows define the outputs without rows
+            # and the type (an empty batch) of the outputs built from cached rows
+            templates = {}
+            for key, value in result.items():
+                has_rows = schemaflow.types._has_rows(value, len(misses))
+                templates[key] = has_rows, schemaflow.types._take(value, []) if has_rows else value
+            with self._lock:
+                self._templates[context] = templates
+                self._templates.move_to_end(context)
+                while len(self._templates) > self.maxsize:
+                    self._templates.popitem(last=False)
+                for i, row in zip(misses, missed_rows):
+                    rows[i] = row
+                    self._put(keys[i], row, now)
+
+        index = next((value.index for value in data.values()
+                      if hasattr(value, 'index') and schemaflow.types._has_rows(value, n_rows)), None)
+        result = dict(data)
+        for key in self._modifies:
+            if key not in templates:
+                result.pop(key, None)
+                continue
+            has_rows, template = templates[key]
+            if has_rows:
+                result[key] = _from_rows([row[key] for row in rows], template, index)
+            else:
+                result[key] = template
+        return result
+
+
+class Registry:
+    """
+    A set of named fitted :class:`~schemaflow.pipeline.Pipeline` s (models) served together, whose identical pipes
+    are stored and executed once.
+
+    Pipes are identified by their :attr:`~schemaflow.pipe.Pipe.fingerprint`: when a model is registered, each of its
+    pipes is replaced by a frozen copy (see :meth:`~schemaflow.pipe.Pipe.freeze`) that is shared by every
+    registered model with an identical pipe, e.g. the same fitted preprocessing. :meth:`transform` arranges the
+    models as a prefix tree of their pipes: a prefix shared by many models is executed once, and its output
+    is copied for each of the different pipes that follow it.
+    """
+    def __init__(self):
+        #: An ``OrderedDict`` with the registered models by name.
+        self.models = collections.OrderedDict()
+        self._pipes = {}
+        self._fingerprints = {}
+
+    def __len__(self):
+        return len(self.models)
+
+    @property
+    def n_pipes(self):
+        """
+        The number of distinct pipes stored by the registry.
+        """
+        return len(self._pipes)
+
+    def register(self, name: str, pipeline):
+        """
+        Registers a fitted pipeline.
+
+        :param name: the name of the model.
+        :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline`; it is not modified.
+        :return: the registered :class:`~schemaflow.pipeline.Pipeline`, whose pipes are frozen and shared with
+            other models.
+        """
+        if name in self.models:
+            self.unregister(name)
+        pipes = collections.OrderedDict()
+        fingerprints = []
+        for key, pipe in pipeline.pipes.items():
+            fingerprint = pipe.fingerprint
+            if fingerprint not in self._pipes:
+                self._pipes[fingerprint] = pipe.freeze()
+            pipes[key] = self._pipes[fingerprint]
+            fingerprints.append(fingerprint)
+        self.models[name] = schemaflow.pipeline.Pipeline(pipes)
+        self._fingerprints[name] = fingerprints
+        return self.models[name]
+
+    def unregister(self, name: str):
+        """
+        Removes a model, and the pipes that no other model uses.
+
+        :param name: the name of the model.
+        """
+        del self.models[name]
+        del self._fingerprints[name]
+        used = set(fingerprint for fingerprints in self._fingerprints.values() for fingerprint in fingerprints)
+        self._pipes = dict((fingerprint, pipe) for fingerprint, pipe in self._pipes.items() if fingerprint in used)
+
+    def _transform(self, level: int, names: list, data: dict, results: dict):
+        finished = [name for name in names if len(self._fingerprints[name]) == level]
+        groups = collections.OrderedDict()
+        for name in names:
+            if len(self._fingerprints[name]) > level:
+                groups.setdefault(self._fingerprints[name][level], []).append(name)
+
+        # data is only copied when it is shared by more than one child of the prefix tree
+        consumers = [(name, None) for name in finished] + list(groups.items())
+        for i, (name, group) in enumerate(consumers):
+            consumer_data = data if i == len(consumers) - 1 else copy.deepcopy(data)
+            if group is None:
+                results[name] = consumer_data
+            else:
+                consumer_data = schemaflow.pipe._transform(self._pipes[name], consumer_data)
+                self._transform(level + 1, group, consumer_data, results)
+
+    def transform(self, data: dict, names: list=None):
+        """
+        Transforms ``data`` with each of the models ``names``, executing their shared pipes once.
+
+        :param data: a dictionary of pairs ``str, object``; it is not modified (like in
+            :meth:`~schemaflow.pipeline.Union.transform`, its values are not copied).
+        :param names: the names of the models (default: all models).
+        :return: an ``OrderedDict`` with the transformed data of each model.
+        """
+        names = list(self.models) if names is None else list(names)
+        for name in names:
+            if name not in self.models:
+                raise KeyError('The model \'%s\' is not registered' % name)
+        results = {}
+        if names:
+            # _transform does not copy the data of the last model
+            self._transform(0, names, dict(data), results)
+        return collections.OrderedDict((name, results[name]) for name in names)
+
+
+def _to_json(value):
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError('Object of type %s is not JSON serializable' % type(value).__name__)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """
+    Transforms the JSON record of each ``POST`` request with the server's :class:`MicroBatcher`.
+    """
+    def _respond(self, status: int, body: dict):
+        content = json.dumps(body, default=_to_json).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        try:
+            record = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode())
+            if not isinstance(record, dict):
+                raise ValueError('The request must be a JSON object')
+            result = self.server.batcher.transform(record)
+        except (ValueError, _exceptions.SchemaFlowError) as e:
+            self._respond(400, {'error': str(e)})
+        except Exception as e:
+            logger.exception('Failed to transform a request')
+            self._respond(500, {'error': str(e)})
+        else:
+            self._respond(200, result)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # http.server expects a (host, port) client address
+        return request, ('', 0)
+
+
+def make_server(pipeline, address=('127.0.0.1', 8000), **batcher_parameters):
+    """
+    Returns an HTTP server that transforms the JSON record of each ``POST`` request with ``pipeline``,
+    using a :class:`MicroBatcher`, and responds the transformed record as JSON.
+    Use ``serve_forever()`` to serve requests and ``shutdown()`` to stop it.
+
+    :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline`.
+    :param address: a pair ``(host, port)`` or the path of a unix socket.
+    :param batcher_parameters: parameters of the :class:`MicroBatcher`.
+    :return: a ``socketserver.BaseServer`` whose ``batcher`` is the :class:`MicroBatcher`.
+    """
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.remove(address)
+        server = _UnixHTTPServer(address, _Handler)
+    else:
+        server = _HTTPServer(address, _Handler)
+    server.batcher = MicroBatcher(pipeline, **batcher_parameters)
+    return server
+
+
+def _close(server):
+    server.server_close()
+    if server.address_family == socket.AF_UNIX and os.path.exists(server.server_address):
+        os.remove(server.server_address)
+
+
+def serve(pipeline, address=('127.0.0.1', 8000), workers: int=1, **batcher_parameters):
+    """
+    Serves ``pipeline`` over HTTP (see :func:`make_server`) until interrupted.
+
+    With ``workers > 1``, the listening socket is created once and shared by ``workers`` forked processes,
+    each with its own :class:`MicroBatcher`. Forked workers share the fitted state of ``pipeline``
+    copy-on-write, so it is loaded in memory only once. Requires ``os.fork`` (e.g. Linux or macOS).
+
+    :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline`.
+    :param address: a pair ``(host, port)`` or the path of a unix socket.
+    :param workers: the number of worker processes.
+    :param batcher_parameters: parameters of the :class:`MicroBatcher`.
+    """
+    server = make_server(pipeline, address, **batcher_parameters)
+    if workers == 1:
+        try:
+            server.serve_forever()
+        finally:
+            server.batcher.close()
+            _close(server)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, lambda *args: os._exit(0))
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def terminate(*args):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, terminate)
+
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except (KeyboardInterrupt, SystemExit):
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            os.waitpid(pid, 0)
+    finally:
+        _close(server)
@@ -0,0 +1,328 @@
+import math
+
+
+def _hash(values):
+    """
+    Returns a 64-bit hash of each of ``values``.
+    """
+    import numpy
+    import pandas.util
+
+    return pandas.util.hash_array(numpy.asarray(values))
+
+
+def _bit_length(values):
+    """
+    Returns the number of bits required to represent each of ``values`` (an array of ``uint64``).
+    """
+    import numpy
+
+    values = values.copy()
+    lengths = numpy.zeros(len(values), dtype=numpy.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= numpy.uint64(1 << shift)
+        lengths[mask] += shift
+        values[mask] >>= numpy.uint64(shift)
+    return lengths + (values > 0)
+
+
+class TDigest:
+    """
+    A mergeable sketch of the distribution of numeric values that estimates quantiles in bounded memory
+    (a merging t-digest). Values are summarized in at most about ``compression`` centroids, and the
+    error of a quantile ``q`` is proportional to ``sqrt(q * (1 - q)) / compression``: it is smaller at the tails.
+
+    Use it as a fitted parameter, e.g. ``fitted_parameters = {'quantiles': TDigest}``.
+
+    :param compression: the trade-off between memory and accuracy.
+    """
+    def __init__(self, compression: int=100):
+        import numpy
+
+        self.compression = compression
+        self.means = numpy.array([], dtype=numpy.float64)
+        self.weights = numpy.array([], dtype=numpy.float64)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self):
+        """
+        The number of values summarized by the sketch.
+        """
+        return self.weights.sum()
+
+    def _compress(self, means, weights):
+        import numpy
+
+        order = numpy.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        middle = (numpy.cumsum(weights) - weights / 2) / total
+        # the k1 scale function; each centroid spans at most one unit of k
+        k = self.compression / (2 * math.pi) * numpy.arcsin(2 * middle - 1)
+        groups = numpy.floor(k - k.min()).astype(numpy.int64)
+        starts = numpy.flatnonzero(numpy.diff(groups, prepend=-1))
+
+        self.weights = numpy.add.reduceat(weights, starts)
+        self.means = numpy.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values):
+        """
+        Adds ``values`` to the sketch. ``NaN`` are ignored.
+
+        :param values: an array-like of numbers.
+        :return: the sketch.
+        """
+        import numpy
+
+        values = numpy.asarray(values, dtype=numpy.float64).ravel()
+        values = values[~numpy.isnan(values)]
+        if len(values):
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._compress(numpy.concatenate([self.means, values]),
+                           numpy.concatenate([self.weights, numpy.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        """
+        Adds the values summarized by ``other`` (e.g. computed on another partition) to the sketch.
+
+        :param other: a :class:`TDigest`.
+        :return: the sketch.
+        """
+        import numpy
+
+        if len(other.means):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(numpy.concatenate([self.means, other.means]),
+                           numpy.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        """
+        Estimates the quantile(s) ``q``.
+
+        :param q: a number or array-like of numbers in ``[0, 1]``.
+        :return: the estimated quantile(s); ``NaN`` when the sketch is empty.
+        """
+        import numpy
+
+        if not len(self.means):
+            return numpy.full(numpy.shape(q), numpy.nan) if numpy.ndim(q) else numpy.nan
+        total = self.weights.sum()
+        positions = numpy.concatenate([[0], numpy.cumsum(self.weights) - self.weights / 2, [total]])
+        values = numpy.concatenate([[self.min], self.means, [self.max]])
+        return numpy.interp(numpy.asarray(q) * total, positions, values)
+
+    def __repr__(self):
+        return '%s(compression=%s, count=%s)' % (self.__class__.__name__, self.compression, self.count)
+
+
+class HyperLogLog:
+    """
+    A mergeable sketch that estimates the number of distinct values in bounded memory (HyperLogLog).
+    It uses ``2 ** precision`` bytes and its relative standard error is ``1.04 / sqrt(2 ** precision)``
+    (e.g. 0.8% for the default precision).
+
+    Use it as a fitted parameter, e.g. ``fitted_parameters = {'cardinality': HyperLogLog}``.
+
+    :param precision: the number of bits used to index the registers, between 4 and 18.
+    """
+    def __init__(self, precision: int=14):
+        import numpy
+
+        assert 4 <= precision <= 18
+        self.precision = precision
+        self.registers = numpy.zeros(2 ** precision, dtype=numpy.uint8)
+
+    def update(self, values):
+        """
+        Adds ``values`` to the sketch.
+
+        :param values: an array-like of hashable values.
+        :return: the sketch.
+        """
+        import numpy
+
+        hashes = _hash(values)
+        if not len(hashes):
+            return self
+        remaining_bits = 64 - self.precision
+        indexes = (hashes >> numpy.uint64(remaining_bits)).astype(numpy.int64)
+        remaining = hashes & numpy.uint64((1 << remaining_bits) - 1)
+        # position of the leftmost 1 in the remaining bits
+        ranks = (remaining_bits - _bit_length(remaining) + 1).astype(numpy.uint8)
+        numpy.maximum.at(self.registers, indexes, ranks)
+        return self
+
+    def merge(self, other):
+        """
+        Adds the values summarized by ``other`` (e.g. computed on another partition) to the sketch.
+
+        :param other: a :class:`HyperLogLog` with the same precision.
+        :return: the sketch.
+        """
+        import numpy
+
+        if other.precision != self.precision:
+            raise ValueError('Only sketches with the same precision can be merged')
+        numpy.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        Estimates the number of distinct values added to the sketch.
+
+        :return: a ``float``.
+        """
+        import numpy
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m ** 2 / numpy.sum(2.0 ** -self.registers.astype(numpy.float64))
+        zeros = numpy.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return float(estimate)
+
+    def __repr__(self):
+        return '%s(precision=%s)' % (self.__class__.__name__, self.precision)
+
+
+class CountMinSketch:
+    """
+    A mergeable sketch that estimates the frequency of values in bounded memory (count-min).
+    Estimates never underestimate the true frequency, and overestimate it by at most ``e * N / width``
+    (``N`` being the number of values added) with probability ``1 - exp(-depth)``.
+
+    :param width: the number of counters per row.
+    :param depth: the number of rows (independent hash functions).
+    """
+    def __init__(self, width: int=2000, depth: int=5):
+        import numpy
+
+        self.width = width
+        self.depth = depth
+        self.table = numpy.zeros((depth, width), dtype=numpy.int64)
+
+    def _indexes(self, values):
+        import numpy
+
+        hashes = _hash(values)
+        low = (hashes & numpy.uint64(0xFFFFFFFF)).astype(numpy.int64)
+        high = (hashes >> numpy.uint64(32)).astype(numpy.int64) | 1
+        return [(low + row * high) % self.width for row in range(self.depth)]
+
+    def update(self, values):
+        """
+        Adds ``values`` to the sketch.
+
+        :param values: an array-like of hashable values.
+        :return: the sketch.
+        """
+        import numpy
+
+        for row, indexes in enumerate(self._indexes(values)):
+            numpy.add.at(self.table[row], indexes, 1)
+        return self
+
+    def merge(self, other):
+        """
+        Adds the values summarized by ``other`` (e.g. computed on another partition) to the sketch.
+
+        :param other: a :class:`CountMinSketch` with the same width and depth.
+        :return: the sketch.
+        """
+        if other.table.shape != self.table.shape:
+            raise ValueError('Only sketches with the same width and depth can be merged')
+        self.table += other.table
+        return self
+
+    def estimate(self, values):
+        """
+        Estimates the frequency of each of ``values``.
+
+        :param values: an array-like of hashable values.
+        :return: a ``numpy.ndarray`` with the estimated frequencies.
+        """
+        import numpy
+
+        return numpy.min([self.table[row][indexes] for row, indexes in enumerate(self._indexes(values))], axis=0)
+
+    def __repr__(self):
+        return '%s(width=%s, depth=%s)' % (self.__class__.__name__, self.width, self.depth)
+
+
+class HeavyHitters:
+    """
+    A mergeable sketch of the most frequent values in bounded memory (Misra-Gries summary).
+    It keeps at most ``capacity`` counters; any value with frequency above ``N / (capacity + 1)``
+    (``N`` being the number of values added) is kept, and each count underestimates the true frequency by
+    at most ``N / (capacity + 1)``.
+
+    Use it as a fitted parameter, e.g. to fit the most frequent category on data that does not fit in memory.
+
+    :param capacity: the maximum number of values tracked.
+    """
+    def __init__(self, capacity: int=100):
+        import numpy
+        import pandas
+
+        self.capacity = capacity
+        self.counts = pandas.Series([], dtype=numpy.int64)
+        self.n = 0
+
+    def _add(self, counts, n):
+        import numpy
+
+        counts = self.counts.add(counts, fill_value=0).astype(numpy.int64)
+        if len(counts) > self.capacity:
+            threshold = counts.nlargest(self.capacity + 1).iloc[-1]
+            counts = counts - threshold
+            counts = counts[counts > 0]
+        self.counts = counts
+        self.n += n
+
+    def update(self, values):
+        """
+        Adds ``values`` to the sketch. Missing values are ignored.
+
+        :param values: an array-like of hashable values.
+        :return: the sketch.
+        """
+        import numpy
+        import pandas
+
+        values = pandas.Series(numpy.asarray(values, dtype=object))
+        self._add(values.value_counts(dropna=True), len(values))
+        return self
+
+    def merge(self, other):
+        """
+        Adds the values summarized by ``other`` (e.g. computed on another partition) to the sketch.
+
+        :param other: a :class:`HeavyHitters`.
+        :return: the sketch.
+        """
+        self._add(other.counts, other.n)
+        return self
+
+    def most_common(self, n: int=None):
+        """
+        Returns the ``n`` most frequent values and their (under)estimated frequency.
+
+        :param n: the number of values (default: all tracked values).
+        :return: a list of pairs ``(value, count)``, from the most to the least frequent.
+        """
+        counts = self.counts.sort_values(ascending=False, kind='stable')
+        if n is not None:
+            counts = counts.iloc[:n]
+        return list(counts.items())
+
+    def __repr__(self):
+        return '%s(capacity=%s)' % (self.__class__.__name__, self.capacity)
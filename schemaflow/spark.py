@@ -0,0 +1,257 @@
+import sys
+import threading
+
+import schemaflow.pipe
+
+
+def _is_dataframe(value) -> bool:
+    """
+    Returns whether ``value`` is a ``pyspark.sql.DataFrame``, without importing ``pyspark``.
+    """
+    module = sys.modules.get('pyspark.sql')
+    return module is not None and isinstance(value, module.DataFrame)
+
+
+def _has_dataframes(data: dict) -> bool:
+    return 'pyspark.sql' in sys.modules and any(_is_dataframe(value) for value in data.values())
+
+
+def _readers(reads: list, writes: list, key: str, start: int) -> list:
+    """
+    Returns the indexes of the pipes (from ``start``) that read the current value of ``key``, i.e. up to the first
+    pipe that modifies it.
+
+    :param reads: the keys read by each pipe.
+    :param writes: the keys modified by each pipe.
+    """
+    readers = []
+    for index in range(start, len(reads)):
+        if key in reads[index]:
+            readers.append(index)
+        if key in writes[index]:
+            break
+    return readers
+
+
+class Persister:
+    """
+    Persists the ``pyspark.sql.DataFrame`` s of ``data`` that are read by more than one pipe of a sequence,
+    so that Spark computes their lineage once instead of once per reader, and unpersists them after their last reader.
+
+    A persister is pickled (and copied) without its DataFrames. Requires ``pyspark``.
+
+    :param storage_level: the name of the ``pyspark.StorageLevel`` of the persisted DataFrames.
+    """
+    def __init__(self, storage_level: str='MEMORY_AND_DISK'):
+        self.storage_level = storage_level
+        self._persisted = []  # pairs [DataFrame, index of its last reader]
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'storage_level': self.storage_level}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self._persisted)
+
+    def persist(self, data: dict, reads: list, writes: list, start: int):
+        """
+        Persists the DataFrames of ``data`` that are read by more than one pipe from the pipe ``start``.
+
+        :param data: the data passed to the pipe ``start``.
+        :param reads: the keys read by each pipe.
+        :param writes: the keys modified by each pipe.
+        :param start: the index of the next pipe.
+        """
+        import pyspark
+
+        for key, value in data.items():
+            if not _is_dataframe(value):
+                continue
+            readers = _readers(reads, writes, key, start)
+            if len(readers) < 2:
+                continue
+            with self._lock:
+                if any(dataframe is value for dataframe, _ in self._persisted):
+                    continue
+                if not value.is_cached:
+                    value.persist(getattr(pyspark.StorageLevel, self.storage_level))
+                    self._persisted.append([value, readers[-1]])
+
+    def unpersist(self, end: int=None):
+        """
+        Unpersists the DataFrames whose last reader is before the pipe ``end`` (all DataFrames when ``None``).
+        """
+        with self._lock:
+            released = [item for item in self._persisted if end is None or item[1] < end]
+            self._persisted = [item for item in self._persisted if not (end is None or item[1] < end)]
+        for dataframe, _ in released:
+            dataframe.unpersist()
+
+
+def _pandas_schema(spark_schema) -> dict:
+    """
+    Returns the schema (pairs ``(column, dtype)``) of the ``pandas.DataFrame`` s that ``mapInPandas`` passes for a
+    Spark DataFrame with schema ``spark_schema``.
+
+    Integers with nulls arrive as ``float64`` (nulls as ``NaN``) and booleans with nulls as ``object``
+    (nulls as ``None``), so nullable integer and boolean columns have these dtypes. Batches without nulls
+    have other dtypes and must be converted to this schema (see :func:`transform_partitions`).
+    """
+    import numpy
+    import pyspark.sql.types as spark_types
+
+    mapping = {
+        spark_types.ByteType: numpy.dtype(numpy.int8),
+        spark_types.ShortType: numpy.dtype(numpy.int16),
+        spark_types.IntegerType: numpy.dtype(numpy.int32),
+        spark_types.LongType: numpy.dtype(numpy.int64),
+        spark_types.FloatType: numpy.dtype(numpy.float32),
+        spark_types.DoubleType: numpy.dtype(numpy.float64),
+        spark_types.BooleanType: numpy.dtype(bool),
+        spark_types.StringType: numpy.dtype('O'),
+        spark_types.DateType: numpy.dtype('O'),
+        spark_types.TimestampType: numpy.dtype('datetime64[ns]'),
+    }
+    schema = {}
+    for field in spark_schema.fields:
+        if type(field.dataType) not in mapping:
+            raise TypeError('Column \'%s\' has the unsupported Spark type %s' % (field.name, field.dataType))
+        dtype = mapping[type(field.dataType)]
+        if field.nullable and dtype.kind in 'ib':
+            dtype = numpy.dtype(numpy.float64) if dtype.kind == 'i' else numpy.dtype('O')
+        schema[field.name] = dtype
+    return schema
+
+
+def _spark_type(base_type):
+    """
+    Returns the Spark type of a column whose (declared) type is ``base_type``, e.g. ``float`` or ``numpy.int32``.
+    """
+    import datetime
+    import numpy
+    import pyspark.sql.types as spark_types
+
+    # before comparing with ``object``, that equals any type without a numpy dtype
+    if base_type is datetime.datetime:
+        return spark_types.TimestampType()
+    elif base_type is datetime.date:
+        return spark_types.DateType()
+    elif base_type in (str, numpy.dtype('O')):
+        return spark_types.StringType()
+    try:
+        dtype = numpy.dtype(base_type)
+    except TypeError:
+        dtype = None
+    if dtype is not None:
+        if dtype.kind == 'b':
+            return spark_types.BooleanType()
+        elif dtype.kind == 'f':
+            return spark_types.FloatType() if dtype.itemsize <= 4 else spark_types.DoubleType()
+        elif dtype.kind in 'iu':
+            # unsigned integers need the next signed integer
+            size = dtype.itemsize * (2 if dtype.kind == 'u' else 1)
+            return {1: spark_types.ByteType(), 2: spark_types.ShortType(), 4: spark_types.IntegerType()}.get(
+                size, spark_types.LongType())
+        elif dtype.kind == 'U':
+            return spark_types.StringType()
+        elif dtype.kind == 'M':
+            return spark_types.TimestampType()
+    raise TypeError('The type %s has no Spark equivalent' % base_type)
+
+
+def _output_columns(pipeline, key: str, output_key: str, input_schema: dict) -> dict:
+    """
+    Returns the pairs ``(column, base type)`` of ``data[output_key]`` after transforming ``data[key]``,
+    a ``pandas.DataFrame`` with schema ``input_schema``, with ``pipeline``.
+    """
+    import schemaflow.types
+
+    schema = pipeline.transform_schema({key: schemaflow.types.PandasDataFrame(input_schema)})
+    if output_key not in schema:
+        raise KeyError('The pipeline does not output \'%s\'' % output_key)
+    output_type = schema[output_key]
+    if isinstance(output_type, schemaflow.types.PandasDataFrame):
+        return dict((column, column_type.base_type) for column, column_type in output_type.schema.items())
+    elif isinstance(output_type, schemaflow.types.Array) and \
+            not isinstance(output_type, schemaflow.types.SparseMatrix) and \
+            (output_type.shape is None or len(output_type.shape) == 1):
+        return {output_key: output_type._items_type.base_type}
+    raise TypeError('\'%s\' must be a PandasDataFrame or a 1-dimensional Array, but it is %s' %
+                    (output_key, output_type))
+
+
+def transform_partitions(pipeline, dataframe, key: str='x', output_key: str=None, keep=(), data: dict=None):
+    """
+    Transforms a ``pyspark.sql.DataFrame`` with a fitted ``pandas``-based ``pipeline``, in parallel over its
+    partitions (e.g. to score a large dataset with a pipeline fitted on a sample).
+
+    The pipeline (and ``data``) is broadcast once to the executors, and :meth:`~schemaflow.pipe.Pipe.transform` is
+    applied to each Arrow batch of rows (a ``pandas.DataFrame``) with ``mapInPandas``. The schema of the result is
+    derived from :meth:`~schemaflow.pipe.Pipe.transform_schema`, so no job is run to infer it; the declared
+    schema is also checked against the columns of ``dataframe`` before any job runs.
+
+    Nullable integer columns of ``dataframe`` are passed to the pipeline as ``float64`` and nullable boolean
+    columns as ``object`` (see the ``nullable`` of each ``pyspark.sql.types.StructField``), whether or not a batch
+    has nulls; declare them accordingly, or use non-nullable columns.
+
+    The classes of the pipes must be importable by the executors. Requires ``pyspark`` (>= 3.0), ``pandas`` and
+    ``pyarrow``.
+
+    :param pipeline: a fitted :class:`~schemaflow.pipe.Pipe` (e.g. a :class:`~schemaflow.pipeline.Pipeline`)
+        that requires a :class:`~schemaflow.types.PandasDataFrame` in ``key``.
+    :param dataframe: the ``pyspark.sql.DataFrame`` to transform.
+    :param key: the key of ``data`` with the rows of ``dataframe``.
+    :param output_key: the key of the transformed data (default: ``key``) with the result: a
+        :class:`~schemaflow.types.PandasDataFrame` or an 1-dimensional :class:`~schemaflow.types.Array`
+        (a column named ``output_key``), with one row per input row when ``keep`` is used.
+    :param keep: columns of ``dataframe`` added to the result (e.g. identifiers of the rows), with their Spark type.
+    :param data: other (constant) values passed to every transform, e.g. ``{'threshold': 0.5}``.
+    :return: the transformed ``pyspark.sql.DataFrame``.
+    """
+    import pyspark.sql.types as spark_types
+
+    if output_key is None:
+        output_key = key
+    data = dict(data or {})
+    input_schema = _pandas_schema(dataframe.schema)
+    columns = _output_columns(pipeline, key, output_key, input_schema)
+    keep = [column for column in keep if column not in columns]
+
+    # unchanged columns of ``dataframe`` (and kept columns) keep their Spark type, e.g. a nullable integer column
+    unchanged = set(column for column, base_type in columns.items() if input_schema.get(column) == base_type)
+    unchanged.update(keep)
+    columns.update((column, input_schema[column]) for column in keep)
+
+    fields = [dataframe.schema[column] if column in unchanged else
+              spark_types.StructField(column, _spark_type(base_type)) for column, base_type in columns.items()]
+    # Arrow does not cast numeric columns to the declared type (e.g. ``float64`` to ``float32``)
+    numeric = (spark_types.BooleanType, spark_types.NumericType)
+    dtypes = dict((column, base_type) for column, base_type in columns.items()
+                  if column not in unchanged and isinstance(_spark_type(base_type), numeric))
+    broadcast = dataframe.sparkSession.sparkContext.broadcast((pipeline, data))
+
+    def transform(batches):
+        import pandas
+
+        pipeline, data = broadcast.value
+        for batch in batches:
+            # e.g. a nullable integer column without nulls in this batch
+            batch = batch.astype(input_schema)
+            batch_data = data.copy()
+            batch_data[key] = batch
+            result = schemaflow.pipe._transform(pipeline, batch_data)[output_key]
+            if not isinstance(result, pandas.DataFrame):
+                result = pandas.DataFrame({output_key: result}, index=batch.index)
+            if keep:
+                if len(result) != len(batch):
+                    raise ValueError('The pipeline returned %d rows for %d rows; columns cannot be kept' %
+                                     (len(result), len(batch)))
+                result = result.reset_index(drop=True)
+                for column in keep:
+                    result[column] = batch[column].values
+            yield result[list(columns)].astype(dtypes)
+
+    return dataframe.mapInPandas(transform, spark_types.StructType(fields))
@@ -0,0 +1,200 @@
+import collections
+import copy
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+
+
+def _walk(pipe, path: str=''):
+    """
+    Yields the pairs ``(path, pipe)`` of ``pipe`` and of all its nested pipes (e.g. of a pipeline).
+    """
+    yield path, pipe
+    for name, child in getattr(pipe, 'pipes', {}).items():
+        yield from _walk(child, '%s/%s' % (path, name) if path else name)
+
+
+def _skeleton(pipe):
+    """
+    Returns a shallow copy of ``pipe`` (and of its nested pipes) without state.
+    """
+    skeleton = copy.copy(pipe)
+    skeleton.state = {}
+    if hasattr(pipe, 'pipes'):
+        skeleton.pipes = collections.OrderedDict((name, _skeleton(child)) for name, child in pipe.pipes.items())
+    return skeleton
+
+
+def _write(path: str, content: bytes):
+    """
+    Writes ``content`` to ``path`` atomically, so that readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+class Store:
+    """
+    A local content-addressed store of fitted :class:`~schemaflow.pipeline.Pipeline` s.
+
+    Each entry of the :attr:`~schemaflow.pipe.Pipe.state` of each pipe is pickled, split into chunks and stored by
+    the hash of its content; the pipeline without states (its skeleton) is stored the same way.
+    A version of a pipeline is a manifest (a JSON file) that references these chunks.
+    Chunks are shared between versions, so that storing a refitted pipeline only stores the state entries that
+    changed, and :meth:`push` transfers only the chunks that the destination does not have.
+
+    The layout in ``root`` is ``chunks/<hash[:2]>/<hash>`` and ``manifests/<name>.json``. Names of versions
+    are made of letters, digits, ``_``, ``-`` and ``.`` and cannot start with ``.``.
+
+    :param root: the directory of the store; created when it does not exist.
+    :param chunk_size: the maximum size (in bytes) of a chunk.
+    """
+    def __init__(self, root: str, chunk_size: int=2 ** 20):
+        self.root = root
+        self.chunk_size = chunk_size
+        os.makedirs(os.path.join(root, 'chunks'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'manifests'), exist_ok=True)
+
+    def _chunk_path(self, chunk: str):
+        return os.path.join(self.root, 'chunks', chunk[:2], chunk)
+
+    def _manifest_path(self, name: str):
+        if not isinstance(name, str) or not re.fullmatch(r'[\w\-][\w\-.]*', name):
+            raise ValueError('Invalid name of a version: \'%s\'' % name)
+        return os.path.join(self.root, 'manifests', '%s.json' % name)
+
+    def has_chunk(self, chunk: str) -> bool:
+        """
+        Returns whether the chunk with hash ``chunk`` is in the store.
+        """
+        return os.path.exists(self._chunk_path(chunk))
+
+    def read_chunk(self, chunk: str) -> bytes:
+        """
+        Returns the content of the chunk with hash ``chunk``.
+        """
+        with open(self._chunk_path(chunk), 'rb') as f:
+            return f.read()
+
+    def write_chunk(self, content: bytes) -> str:
+        """
+        Stores ``content`` as a chunk, unless it is already stored.
+
+        :return: the hash of the chunk.
+        """
+        chunk = hashlib.sha256(content).hexdigest()
+        if not self.has_chunk(chunk):
+            _write(self._chunk_path(chunk), content)
+        return chunk
+
+    def _write_object(self, value) -> list:
+        content = pickle.dumps(value, protocol=4)
+        return [self.write_chunk(content[start:start + self.chunk_size])
+                for start in range(0, max(len(content), 1), self.chunk_size)]
+
+    def _read_object(self, chunks: list):
+        return pickle.loads(b''.join(self.read_chunk(chunk) for chunk in chunks))
+
+    def put(self, name: str, pipeline) -> dict:
+        """
+        Stores ``pipeline`` as the version ``name``, replacing a previous version with the same name.
+
+        :param name: the name of the version, e.g. ``'model-2019-01-01'``.
+        :param pipeline: a fitted :class:`~schemaflow.pipeline.Pipeline` (or :class:`~schemaflow.pipe.Pipe`);
+            it is not modified.
+        :return: the manifest of the version.
+        """
+        self._manifest_path(name)
+        states = {}
+        for path, pipe in _walk(pipeline):
+            states[path] = dict((key, self._write_object(value)) for key, value in pipe.state.items())
+        skeleton = self._write_object(_skeleton(pipeline))
+
+        manifest = {'skeleton': skeleton, 'states': states, 'frozen': pipeline.frozen}
+        self.put_manifest(name, manifest)
+        return manifest
+
+    def get(self, name: str):
+        """
+        Returns the pipeline of the version ``name``.
+
+        :param name: the name of the version.
+        :return: the :class:`~schemaflow.pipeline.Pipeline`.
+        """
+        manifest = self.manifest(name)
+        pipeline = self._read_object(manifest['skeleton'])
+        for path, pipe in _walk(pipeline):
+            pipe.state = dict((key, self._read_object(chunks)) for key, chunks in manifest['states'][path].items())
+        if manifest['frozen']:
+            pipeline._freeze()
+        return pipeline
+
+    def manifest(self, name: str) -> dict:
+        """
+        Returns the manifest of the version ``name``.
+        """
+        with open(self._manifest_path(name)) as f:
+            return json.load(f)
+
+    def put_manifest(self, name: str, manifest: dict):
+        """
+        Stores the manifest of the version ``name``. Its chunks must already be in the store.
+        """
+        missing = self.missing(manifest)
+        if missing:
+            raise ValueError('The store is missing %d chunks of the manifest \'%s\'' % (len(missing), name))
+        _write(self._manifest_path(name), json.dumps(manifest, sort_keys=True).encode())
+
+    def versions(self) -> list:
+        """
+        Returns the names of the versions in the store.
+        """
+        return sorted(name[:-len('.json')] for name in os.listdir(os.path.join(self.root, 'manifests'))
+                      if name.endswith('.json'))
+
+    @staticmethod
+    def chunks(manifest: dict) -> set:
+        """
+        Returns the hashes of all chunks referenced by ``manifest``.
+        """
+        chunks = set(manifest['skeleton'])
+        for state in manifest['states'].values():
+            for entry in state.values():
+                chunks.update(entry)
+        return chunks
+
+    def missing(self, manifest: dict) -> list:
+        """
+        Returns the hashes of the chunks referenced by ``manifest`` that are not in the store.
+        """
+        return sorted(chunk for chunk in self.chunks(manifest) if not self.has_chunk(chunk))
+
+    def push(self, name: str, destination) -> list:
+        """
+        Copies the version ``name`` to the store ``destination`` (e.g. on a serving node), transferring only
+        the chunks that ``destination`` does not have. The manifest is written after its chunks, so that
+        ``destination`` never references missing chunks.
+
+        Other transports (e.g. over a network) can do the same with :meth:`missing`, :meth:`read_chunk`,
+        :meth:`write_chunk` and :meth:`put_manifest`.
+
+        :param name: the name of the version.
+        :param destination: a :class:`Store`.
+        :return: the hashes of the transferred chunks.
+        """
+        manifest = self.manifest(name)
+        missing = destination.missing(manifest)
+        for chunk in missing:
+            destination.write_chunk(self.read_chunk(chunk))
+        destination.put_manifest(name, manifest)
+        return missing
@@ -20,7 +20,7 @@ def _all_subclasses(cls):
 
 def infer_schema(data: dict):
     subclasses = list(subclass for subclass in _all_subclasses(Type)
-                      if subclass.requirements_fulfilled and not subclass.__name__.startswith('_'))
+                      if subclass.requirements_fulfilled() and not subclass.__name__.startswith('_'))
 
     schema = {}
     for key, value in data.items():
@@ -33,6 +33,130 @@ def infer_schema(data: dict):
     return schema
 
 
+def _n_rows(data: dict):
+    """
+    Returns the number of rows of ``data``, i.e. the length of its first value that is a
+    ``pandas`` object, a ``numpy`` array, a ``scipy`` sparse matrix or a list.
+    """
+    for value in data.values():
+        if type(value).__module__.split('.')[0] in ('pandas', 'numpy', 'scipy') and hasattr(value, 'shape'):
+            return value.shape[0]
+        elif isinstance(value, (list, tuple)):
+            return len(value)
+    return None
+
+
+def _take(value, indices):
+    """
+    Returns the rows ``indices`` (a sequence of integers) of ``value``, or ``value`` when it has no rows.
+    """
+    module = type(value).__module__.split('.')[0]
+    if module == 'pandas' and hasattr(value, 'iloc'):
+        return value.iloc[indices]
+    elif module == 'numpy' and getattr(value, 'ndim', 0) > 0:
+        return value[indices]
+    elif module == 'scipy' and hasattr(value, 'tocsr'):
+        return value.tocsr()[indices].asformat(value.format)
+    elif isinstance(value, (list, tuple)):
+        return type(value)(value[i] for i in indices)
+    return value
+
+
+def _concat(values: list):
+    """
+    Returns the concatenation of the rows of ``values`` (of the same type).
+    """
+    module = type(values[0]).__module__.split('.')[0]
+    if module == 'pandas':
+        import pandas
+        return pandas.concat(values)
+    elif module == 'numpy':
+        import numpy
+        return numpy.concatenate(values)
+    elif module == 'scipy':
+        import scipy.sparse
+        return scipy.sparse.vstack(values, format=values[0].format)
+    return type(values[0])(item for value in values for item in value)
+
+
+def _has_rows(value, n_rows: int):
+    if type(value).__module__.startswith('scipy') and hasattr(value, 'shape'):
+        return value.shape[0] == n_rows
+    return hasattr(value, '__len__') and not isinstance(value, (str, bytes, dict)) and len(value) == n_rows
+
+
+def _take_rows(data: dict, indices, key: str=None):
+    """
+    Returns a new data with the rows ``indices`` of every value of ``data`` with :func:`_n_rows` rows.
+
+    :param key: the key of ``data`` whose number of rows is used (default: the first value with rows).
+    """
+    n_rows = _n_rows(data if key is None else {key: data[key]})
+    result = {}
+    for key, value in data.items():
+        if _has_rows(value, n_rows):
+            result[key] = _take(value, indices)
+        else:
+            result[key] = value
+    return result
+
+
+def _is_spark(value):
+    return type(value).__module__.startswith('pyspark')
+
+
+def _sample(data: dict, size, by: str=None, random_state: int=0):
+    """
+    Returns a new data with a random sample of the rows of ``data``. The same rows are selected from every value
+    with :func:`_n_rows` rows; ``pyspark.sql.DataFrame`` values are sampled with ``sample`` (or ``sampleBy``).
+
+    :param size: the number of rows (``int``) or the fraction of rows (``float``) to sample.
+    :param by: the key of ``data`` or the column of a DataFrame whose values stratify the sample.
+    :param random_state: the seed of the sample.
+    """
+    if any(_is_spark(value) for value in data.values()):
+        result = {}
+        for key, value in data.items():
+            if _is_spark(value):
+                fraction = size if isinstance(size, float) else min(1.0, size / max(value.count(), 1))
+                if by is None:
+                    value = value.sample(False, fraction, random_state)
+                else:
+                    fractions = dict((row[0], fraction) for row in value.select(by).distinct().collect())
+                    value = value.sampleBy(by, fractions, random_state)
+            result[key] = value
+        return result
+
+    import numpy
+    import pandas
+
+    n_rows = _n_rows(data)
+    if n_rows is None:
+        return data
+    n = int(round(size * n_rows)) if isinstance(size, float) else size
+    if n >= n_rows:
+        return data
+
+    random = numpy.random.RandomState(random_state)
+    if by is None:
+        return _take_rows(data, numpy.sort(random.choice(n_rows, n, replace=False)))
+
+    if by in data:
+        strata = data[by]
+    else:
+        strata = next(value[by] for value in data.values() if hasattr(value, 'columns') and by in value.columns)
+    codes = pandas.factorize(numpy.asarray(strata))[0]
+    counts = numpy.bincount(codes + 1)[1:]
+    quotas = numpy.maximum(numpy.round(counts * n / n_rows), 1)
+
+    # a random order of the rows, grouped by stratum
+    order = random.permutation(n_rows)
+    order = order[numpy.argsort(codes[order], kind='stable')]
+    starts = numpy.concatenate([[0], numpy.cumsum(counts)[:-1]])
+    ranks = numpy.arange(n_rows) - starts[codes[order]]
+    return _take_rows(data, numpy.sort(order[ranks < quotas[codes[order]]]))
+
+
 def _get_type(instance_type):
     if not isinstance(instance_type, Type):
         instance_type = _LiteralType(instance_type)
@@ -169,7 +293,7 @@ class _DataFrame(Type):
                 expected_type = self.schema[column].base_type
                 if expected_type != column_type:
                     exception = _exceptions.WrongType(
-                        expected_type, column_type, 'column \'%s\'' % column)
+                        expected_type, column_type, ['column \'%s\'' % column])
                     if raise_:
                         raise exception
                     exceptions.append(exception)
@@ -196,9 +320,63 @@ class _DataFrame(Type):
 class PySparkDataFrame(_DataFrame):
     """
     Representation of a pyspark.sql.DataFrame. Requires ``pyspark``.
+
+    :param schema: dictionary of `(column_name, type)`.
+    :param constraints: dictionary of `(column_name, constraint)` (or of lists of constraints) with expectations on
+        the values of the columns (see :mod:`schemaflow.constraints`), checked by :meth:`check_values`.
     """
     requirements = {'pyspark'}
 
+    def __init__(self, schema: dict, constraints: dict=None):
+        super().__init__(schema)
+        self.constraints = {}
+        for column, constraint in (constraints or {}).items():
+            self.constraints[column] = list(constraint) if isinstance(constraint, (list, tuple)) else [constraint]
+
+    def check_values(self, instance, sample: float=None, raise_: bool=False, seed: int=0):
+        """
+        Checks that the values of ``instance`` satisfy the :attr:`constraints`. All constraints are compiled into a
+        single aggregation, so that the check runs one Spark job (one scan of the data) regardless of their number.
+
+        :param instance: a ``pyspark.sql.DataFrame``.
+        :param sample: when set, the fraction of rows checked (the counts of the exceptions are of the sample).
+        :param raise_: whether to raise the first exception instead of returning it.
+        :param seed: the seed of the sample.
+        :return: a list of :class:`~schemaflow.exceptions.WrongValue` (and of
+            :class:`~schemaflow.exceptions.WrongSchema` for constrained columns missing in ``instance``).
+        """
+        import pyspark.sql.functions as functions
+
+        exceptions = []
+        checks = []
+        for column, constraints in self.constraints.items():
+            if column not in instance.columns:
+                exception = _exceptions.WrongSchema(column, set(instance.columns))
+                if raise_:
+                    raise exception
+                exceptions.append(exception)
+            else:
+                checks.extend((column, constraint) for constraint in constraints)
+        if not checks:
+            return exceptions
+
+        if sample is not None:
+            instance = instance.sample(fraction=sample, seed=seed)
+        aggregations = [functions.count(functions.lit(1)).alias('rows')]
+        for i, (column, constraint) in enumerate(checks):
+            violation = constraint.spark_violation(instance[column])
+            aggregations.append(functions.sum(functions.when(violation, 1).otherwise(0)).alias('check_%d' % i))
+        counts = instance.agg(*aggregations).collect()[0]
+
+        for i, (column, constraint) in enumerate(checks):
+            n_invalid = counts['check_%d' % i] or 0
+            if n_invalid:
+                exception = _exceptions.WrongValue(constraint, n_invalid, counts['rows'], ['column \'%s\'' % column])
+                if raise_:
+                    raise exception
+                exceptions.append(exception)
+        return exceptions
+
     @classmethod
     def base_type(cls):
         import pyspark.sql
@@ -363,3 +541,60 @@ class Array(_Container):
     def base_type(cls):
         import numpy
         return numpy.ndarray
+
+
+class SparseMatrix(Array):
+    """
+    Representation of a 2-dimensional scipy sparse matrix or array (e.g. the output of
+    ``sklearn.preprocessing.OneHotEncoder``). Requires ``scipy``.
+
+    Checks only use the ``dtype``, ``shape`` and ``format`` of the matrix, so they never densify it.
+    To keep features sparse end to end, declare them with this type in every pipe that requires them,
+    combine them with ``scipy.sparse.hstack`` instead of ``toarray()``, and pass them to estimators
+    that accept sparse input.
+
+    :param items_type: the dtype of the stored values.
+    :param shape: the shape of the matrix, with ``None`` for dimensions of any size.
+    :param format: the sparse format (e.g. ``'csr'`` or ``'csc'``); ``None`` accepts any format.
+    """
+    requirements = {'scipy', 'numpy'}
+
+    def __init__(self, items_type: type, shape=None, format: str=None):
+        super().__init__(items_type, shape)
+        self.format = format
+
+    def __repr__(self):
+        return '%s(%s, %s, %s)' % (self.__class__.__name__, self._items_type.base_type, self.shape, self.format)
+
+    @classmethod
+    def infer(cls, instance):
+        assert isinstance(instance, cls.base_type())
+
+        return cls(instance.dtype, instance.shape, instance.format)
+
+    def _check_format(self, format: str, raise_: bool):
+        if self.format is not None and format != self.format:
+            exception = _exceptions.WrongType(self.format, format, ['(sparse format)'])
+            if raise_:
+                raise exception
+            return [exception]
+        return []
+
+    def _check_as_type(self, instance, raise_: bool):
+        exceptions = super()._check_as_type(instance, raise_)
+        if not exceptions:
+            exceptions += self._check_format(instance.format, raise_)
+        return exceptions
+
+    def _check_as_instance(self, instance: object, raise_: bool):
+        exceptions = super()._check_as_instance(instance, raise_)
+        if not exceptions:
+            exceptions += self._check_format(instance.format, raise_)
+        return exceptions
+
+    @classmethod
+    def base_type(cls):
+        import scipy.sparse
+        if hasattr(scipy.sparse, 'sparray'):
+            return scipy.sparse.spmatrix, scipy.sparse.sparray
+        return scipy.sparse.spmatrix
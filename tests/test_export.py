@@ -0,0 +1,101 @@
+import unittest
+import os
+import tempfile
+
+import numpy as np
+
+from schemaflow.export import export, load, read_header
+from schemaflow.pipeline import Pipeline
+from schemaflow.pipe import Pipe
+from schemaflow import types, exceptions
+
+
+class Model(Pipe):
+    transform_requires = {'x': types.Array(np.float64)}
+    transform_modifies = {'y': types.Array(np.float64)}
+
+    fitted_parameters = {'coefficients': np.ndarray, 'path': np.ndarray}
+
+    # the regularization path is only used to choose the coefficients
+    transform_state = {'coefficients'}
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['path'] = np.random.RandomState(0).normal(size=(100, 1000))
+        self['coefficients'] = np.linalg.lstsq(data['x'], data['y'], rcond=None)[0]
+
+    def transform(self, data: dict):
+        data['y'] = data['x'].dot(self['coefficients'])
+        return data
+
+
+class MissingPackage(Model):
+    requirements = {'a_package_that_does_not_exist'}
+
+
+class Probe:
+    """
+    Calls ``callback`` when it is pickled.
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+
+    def __reduce__(self):
+        self.callback()
+        return Probe, ()
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'model.artifact')
+        self.data = {'x': np.eye(3), 'y': np.arange(3.0)}
+
+    def test_export(self):
+        pipeline = Pipeline([('model', Model())])
+        pipeline.fit(self.data)
+
+        header = export(pipeline, self.path)
+        self.assertEqual(header['requirements'], ['numpy'])
+        self.assertTrue({'numpy', 'schemaflow', Model.__module__.split('.')[0]}.issubset(header['modules']))
+        self.assertEqual(header['versions']['numpy'], np.__version__)
+        self.assertEqual(read_header(self.path), header)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['model.artifact'])
+        # the path is not exported
+        self.assertLess(os.path.getsize(self.path), 10000)
+        self.assertIn('path', pipeline.pipes['model'].state)
+
+        loaded = load(self.path, check_versions=True)
+        self.assertTrue(loaded.frozen)
+        self.assertEqual(set(loaded.pipes['model'].state), {'coefficients'})
+        np.testing.assert_array_equal(loaded.transform({'x': np.eye(3)})['y'], [0, 1, 2])
+
+    def test_not_modified(self):
+        pipeline = Pipeline([('model', Model())])
+        pipeline.fit(self.data, warm_start=True)
+        model = pipeline.pipes['model']
+        fit_fingerprints = pipeline._fit_fingerprints
+        states = []
+
+        model.transform_state = {'coefficients', 'probe'}
+        model.state['probe'] = Probe(lambda: states.append(set(model.state)))
+
+        export(pipeline, self.path)
+        # e.g. a concurrent transform sees the whole state while the pipeline is exported
+        self.assertEqual(states, [{'coefficients', 'path', 'probe'}])
+        self.assertIs(pipeline._fit_fingerprints, fit_fingerprints)
+        self.assertEqual(set(model.state), {'coefficients', 'path', 'probe'})
+
+    def test_missing_requirement(self):
+        pipeline = Pipeline([('model', MissingPackage())])
+        pipeline.fit(self.data)
+        export(pipeline, self.path)
+
+        with self.assertRaises(exceptions.MissingRequirement) as e:
+            load(self.path)
+        self.assertIn('a_package_that_does_not_exist', str(e.exception))
+
+    def test_not_an_artifact(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'{}\n')
+        with self.assertRaises(ValueError):
+            load(self.path)
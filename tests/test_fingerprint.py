@@ -0,0 +1,23 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from schemaflow.fingerprint import fingerprint
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_wide_frame(self):
+        df = pd.DataFrame(np.zeros((2, 300)), columns=['c%d' % i for i in range(300)])
+        self.assertEqual(fingerprint(df), fingerprint(df.copy()))
+
+        # a column in the middle, which the repr of the columns and of the dtypes omits
+        self.assertNotEqual(fingerprint(df), fingerprint(df.rename(columns={'c150': 'other'})))
+        self.assertNotEqual(fingerprint(df), fingerprint(df.astype({'c150': np.float32})))
+
+    def test_series(self):
+        series = pd.Series([1.0, 2.0], name='a')
+        self.assertEqual(fingerprint(series), fingerprint(series.copy()))
+        self.assertNotEqual(fingerprint(series), fingerprint(series.rename('b')))
+        self.assertNotEqual(fingerprint(series), fingerprint(series.astype(np.float32)))
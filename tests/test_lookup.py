@@ -0,0 +1,64 @@
+import unittest
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from schemaflow.lookup import LookupTable
+
+
+class TestLookupTable(unittest.TestCase):
+
+    def _check(self, index):
+        table = LookupTable(['b', 'a', 'c'], index=index)
+
+        np.testing.assert_array_equal(table.map(pd.Series(['a', 'c', 'a'])), [1, 2, 1])
+        np.testing.assert_array_equal(table.map(['a', 'd'], default=-1), [1, -1])
+        np.testing.assert_array_equal(table.contains(['a', 'd']), [True, False])
+        with self.assertRaises(KeyError):
+            table.map(['d'])
+
+        table = LookupTable([3.0, 1.0, 2.0], ['c', 'a', 'b'], index=index)
+        np.testing.assert_array_equal(table.map([1.0, 5.0, 2.0], default='?'), ['a', '?', 'b'])
+
+    def test_hash(self):
+        self._check('hash')
+
+    def test_sorted(self):
+        self._check('sorted')
+
+    def test_mixed_types(self):
+        for index in ['hash', 'sorted']:
+            table = LookupTable(np.array([1, 'a'], dtype=object), index=index)
+            np.testing.assert_array_equal(table.map(np.array(['a', 1, 2.0], dtype=object), default=-1), [1, 0, -1])
+
+            table = LookupTable([1, 2], index=index)
+            np.testing.assert_array_equal(table.map(np.array([2, 'a'], dtype=object), default=-1), [1, -1])
+
+            with self.assertRaises(ValueError):
+                LookupTable(np.array([1, 'a', 1], dtype=object), index=index)
+
+    def test_none_default(self):
+        table = LookupTable(['a', 'b'], [1.0, 2.0])
+        self.assertEqual(table.map(['b', 'c'], default=None).tolist(), [2.0, None])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            LookupTable(['a', 'a'])
+        with self.assertRaises(ValueError):
+            LookupTable(['a'], [1, 2])
+        with self.assertRaises(ValueError):
+            LookupTable(['a'], index='tree')
+
+    def test_empty(self):
+        for index in ['hash', 'sorted']:
+            np.testing.assert_array_equal(LookupTable([], index=index).map([1, 2], default=0), [0, 0])
+
+    def test_pickle(self):
+        table = LookupTable(np.arange(1000))
+        table.map([1, 2])
+        self.assertIsNotNone(table._index)
+
+        loaded = pickle.loads(pickle.dumps(table))
+        self.assertIsNone(loaded._index)
+        np.testing.assert_array_equal(loaded.map([5, 7]), [5, 7])
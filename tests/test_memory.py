@@ -0,0 +1,151 @@
+import unittest
+import copy
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+
+from schemaflow.memory import Downcast, BufferPool
+from schemaflow.pipeline import Pipeline
+from schemaflow.pipe import Pipe
+from schemaflow import types
+
+
+class Mean(Pipe):
+    transform_requires = {'x': types.PandasDataFrame({'value': np.float32, 'small': np.int8})}
+    transform_modifies = {'mean': np.float32}
+
+    def transform(self, data: dict):
+        data['mean'] = data['x']['value'].mean()
+        return data
+
+
+class Baseline(Pipe):
+    transform_requires = {'x': types.Array(np.float64)}
+    transform_modifies = {'y': types.Array(np.float64, shape=(None,)),
+                          'flags': types.Array(np.bool_, shape=(2,))}
+
+    def transform(self, data: dict):
+        data['y'] = self.output_buffer('y', data['x'].shape)
+        np.multiply(data['x'], 2, out=data['y'])
+        data['flags'] = self.output_buffer('flags')
+        data['flags'][:] = True
+        return data
+
+
+class TestDowncast(unittest.TestCase):
+
+    def _frame(self, n=1000):
+        random = np.random.RandomState(0)
+        return pd.DataFrame({
+            'value': random.normal(size=n),
+            'small': random.randint(-100, 100, size=n),
+            'positive': random.randint(0, 60000, size=n).astype(np.uint64),
+            'large': random.randint(0, 2 ** 40, size=n),
+            'category': random.choice(['a', 'b', 'c'], size=n).astype(object),
+            'text': np.arange(n).astype(str).astype(object),
+        })
+
+    def test_fit_transform(self):
+        df = self._frame()
+        p = Downcast()
+        p.fit({'x': df})
+        result = p.transform({'x': df.copy()})['x']
+
+        self.assertEqual(dict(result.dtypes.astype(str)), {
+            'value': 'float32', 'small': 'int8', 'positive': 'uint16', 'large': 'int64',
+            'category': 'category', 'text': str(df['text'].dtype)})
+        converted = ['value', 'small', 'positive', 'category']
+        self.assertLess(result[converted].memory_usage(deep=True).sum(),
+                        df[converted].memory_usage(deep=True).sum() / 4)
+        np.testing.assert_allclose(result['value'], df['value'], rtol=1e-6)
+
+    def test_schema(self):
+        df = self._frame()
+        p = Downcast()
+        p.fit({'x': df})
+
+        input_schema = types.infer_schema({'x': df})
+        output_schema = types.infer_schema(p.transform({'x': df.copy()}))
+        self.assertEqual(p.check_transform_modifies(input_schema, output_schema), [])
+
+        # downstream pipes are checked against the downcast dtypes
+        pipeline = Pipeline([('downcast', p), ('mean', Mean())])
+        self.assertEqual(pipeline.check_transform(types.infer_schema({'x': df})), [])
+        self.assertEqual(len(Mean().check_transform(types.infer_schema({'x': df}))), 2)
+
+    def test_out_of_range(self):
+        p = Downcast()
+        p.fit({'x': pd.DataFrame({'small': [1, 2], 'category': ['a', 'a']})})
+
+        with self.assertRaises(ValueError):
+            p.transform({'x': pd.DataFrame({'small': [1, 1000], 'category': ['a', 'a']})})
+        with self.assertRaises(ValueError):
+            p.transform({'x': pd.DataFrame({'small': [1, 2], 'category': ['a', 'b']})})
+
+        result = p.transform({'x': pd.DataFrame({'small': [1, 2], 'category': ['a', None]})})
+        self.assertTrue(result['x']['category'].isnull()[1])
+
+
+class TestBufferPool(unittest.TestCase):
+
+    def test_reuse(self):
+        pipeline = Pipeline([Baseline()])
+
+        # without a pool, every call allocates
+        first = pipeline.transform({'x': np.ones(3)})['y']
+        self.assertIsNot(pipeline.transform({'x': np.ones(3)})['y'], first)
+
+        pool = pipeline.use_buffer_pool()
+        self.assertIs(pipeline.pipes['0'].buffer_pool, pool)
+
+        first = pipeline.transform({'x': np.ones(3)})['y']
+        second = pipeline.transform({'x': np.full(3, 2.0)})['y']
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(second, [4, 4, 4])
+        self.assertEqual(second.dtype, np.float64)
+
+        # a new shape is a new buffer
+        self.assertIsNot(pipeline.transform({'x': np.ones(4)})['y'], first)
+        self.assertEqual(len(pool), 3)
+
+        # buffers are per thread
+        results = []
+        thread = threading.Thread(target=lambda: results.append(pipeline.transform({'x': np.ones(3)})['y']))
+        thread.start()
+        thread.join()
+        self.assertIsNot(results[0], first)
+
+    def test_max_shapes(self):
+        pipeline = Pipeline([Baseline()])
+        pool = pipeline.use_buffer_pool(BufferPool(max_shapes=2))
+
+        first = pipeline.transform({'x': np.ones(1)})['y']
+        for size in range(2, 100):
+            pipeline.transform({'x': np.ones(size)})
+        # 2 shapes of 'y' and the shape of 'flags'
+        self.assertEqual(len(pool), 3)
+        self.assertIsNot(pipeline.transform({'x': np.ones(1)})['y'], first)
+
+        # the most recently used shapes are kept
+        first = pipeline.transform({'x': np.ones(1)})['y']
+        pipeline.transform({'x': np.ones(2)})
+        self.assertIs(pipeline.transform({'x': np.ones(1)})['y'], first)
+        self.assertEqual(pickle.loads(pickle.dumps(pool)).max_shapes, 2)
+
+    def test_copy(self):
+        pipeline = Pipeline([Baseline()])
+        pool = pipeline.use_buffer_pool()
+        pipeline.transform({'x': np.ones(3)})
+
+        for copied in [copy.deepcopy(pipeline), pickle.loads(pickle.dumps(pipeline))]:
+            self.assertEqual(len(copied.buffer_pool), 0)
+            self.assertIs(copied.pipes['0'].buffer_pool, copied.buffer_pool)
+        self.assertEqual(len(pool), 2)
+
+    def test_shape(self):
+        with self.assertRaises(ValueError):
+            Baseline().output_buffer('y')
+        with self.assertRaises(TypeError):
+            Mean().output_buffer('mean', (1,))
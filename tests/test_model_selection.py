@@ -0,0 +1,141 @@
+import unittest
+
+from schemaflow.pipeline import Pipeline
+from schemaflow.pipe import Pipe
+from schemaflow.model_selection import grid_search, cross_validate
+from schemaflow import types
+
+
+class Center(Pipe):
+    fit_requires = transform_requires = transform_modifies = {'x': types.List(float)}
+
+    fitted_parameters = {'mean': float}
+
+    fits = 0
+
+    def fit(self, data: dict, parameters: dict=None):
+        Center.fits += 1
+        self['mean'] = sum(data['x']) / len(data['x'])
+
+    def transform(self, data: dict):
+        data['x'] = [x_i - self['mean'] for x_i in data['x']]
+        return data
+
+
+class Shrink(Pipe):
+    fit_requires = {'x': types.List(float), 'y': types.List(float)}
+    transform_requires = {'x': types.List(float)}
+
+    fit_parameters = {'alpha': float, 'beta': float}
+
+    fitted_parameters = {'slope': float}
+
+    transform_modifies = {'y_pred': types.List(float)}
+
+    fits = 0
+
+    def fit(self, data: dict, parameters: dict=None):
+        Shrink.fits += 1
+        self['slope'] = parameters['alpha'] * parameters['beta']
+
+    def transform(self, data: dict):
+        data['y_pred'] = [self['slope'] * x_i for x_i in data['x']]
+        return data
+
+
+def error(data):
+    return sum(abs(y - y_pred) for y, y_pred in zip(data['y'], data['y_pred']))
+
+
+class TestGridSearch(unittest.TestCase):
+
+    def setUp(self):
+        Center.fits = 0
+        Shrink.fits = 0
+        self.pipeline = Pipeline([('center', Center()), ('model', Shrink())])
+        self.train = {'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}
+        self.test = {'x': [2.0, 4.0], 'y': [0.0, 2.0]}
+
+    def test_grid(self):
+        grid = {'model': {'alpha': [0.5, 1.0, 2.0], 'beta': [1.0, 2.0]}}
+        results = grid_search(self.pipeline, self.train, self.test, grid, error)
+
+        self.assertEqual(len(results), 6)
+        # the prefix is fitted once
+        self.assertEqual(Center.fits, 1)
+        self.assertEqual(Shrink.fits, 6)
+
+        best = min(results, key=lambda result: result[1])
+        self.assertEqual(best[1], 0.0)
+        self.assertEqual(best[0]['model']['alpha'] * best[0]['model']['beta'], 1.0)
+
+        # the fitted pipelines are usable and equivalent to fitting the pipeline with the parameters
+        parameters, score, fitted = results[0]
+        self.assertEqual(error(fitted.transform(dict(self.test))), score)
+        self.pipeline.fit(dict(self.train), parameters)
+        self.assertEqual(error(self.pipeline.transform(dict(self.test))), score)
+
+    def test_random(self):
+        grid = {'model': {'alpha': [0.5, 1.0, 2.0], 'beta': [1.0, 2.0]}}
+        results = grid_search(self.pipeline, self.train, self.test, grid, error, n_iter=3, random_state=1)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(set((r[0]['model']['alpha'], r[0]['model']['beta']) for r in results)), 3)
+        self.assertEqual(Shrink.fits, 3)
+
+    def test_process(self):
+        grid = {'model': {'alpha': [1.0, 2.0], 'beta': [1.0]}}
+        results = grid_search(self.pipeline, self.train, self.test, grid, error, executor='process')
+
+        self.assertEqual([r[1] for r in results], [0.0, 2.0])
+
+
+class TestCrossValidate(unittest.TestCase):
+
+    def setUp(self):
+        self.pipeline = Pipeline([('center', Center()), ('model', Shrink())])
+        self.data = {'x': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0], 'y': [1.0, 2.0, 3.0, 4.0, 5.0, 7.0], 'z': 1}
+        self.parameters = {'model': {'alpha': 1.0, 'beta': 1.0}}
+
+    def test_sequential(self):
+        results = cross_validate(self.pipeline, self.data, 3, error, self.parameters)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[0].keys()), {'score', 'fit_time', 'score_time'})
+        # fold 0: mean of [3, 4, 5, 6] is 4.5 => y_pred = [-3.5, -2.5]
+        self.assertEqual(results[0]['score'], 4.5 + 4.5)
+        self.assertNotIn('y_pred', self.data)
+
+    def test_parallel(self):
+        expected = cross_validate(self.pipeline, self.data, 3, error, self.parameters)
+        results = cross_validate(self.pipeline, self.data, 3, error, self.parameters, n_jobs=2)
+        self.assertEqual([r['score'] for r in results], [r['score'] for r in expected])
+
+    def test_threads(self):
+        import concurrent.futures
+
+        expected = cross_validate(self.pipeline, self.data, 3, error, self.parameters)
+        other_data = dict(self.data, y=[0.0] * 6)
+        other_expected = cross_validate(self.pipeline, other_data, 3, error, self.parameters)
+
+        # concurrent calls (here also using processes) do not share their data
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            results = executor.submit(cross_validate, self.pipeline, self.data, 3, error, self.parameters, 2)
+            other_results = executor.submit(cross_validate, self.pipeline, other_data, 3, error, self.parameters)
+            self.assertEqual([r['score'] for r in results.result()], [r['score'] for r in expected])
+            self.assertEqual([r['score'] for r in other_results.result()], [r['score'] for r in other_expected])
+
+    def test_no_rows(self):
+        with self.assertRaises(ValueError):
+            cross_validate(self.pipeline, {'z': 1}, 3, error, self.parameters)
+
+    def test_splits(self):
+        folds = [([3, 4, 5], [0, 1, 2]), ([0, 1, 2], [3, 4, 5])]
+        results = cross_validate(self.pipeline, self.data, folds, error, self.parameters)
+        self.assertEqual(len(results), 2)
+
+        import sklearn.model_selection
+        results = cross_validate(self.pipeline, self.data, sklearn.model_selection.KFold(2), error, self.parameters)
+        self.assertEqual([r['score'] for r in results], [r['score'] for r in
+                                                         cross_validate(self.pipeline, self.data, folds, error,
+                                                                        self.parameters)])
@@ -0,0 +1,115 @@
+import unittest
+
+from schemaflow.pipeline import Pipeline, Union
+from schemaflow.pipe import Pipe
+from schemaflow.optimize import eliminate_common_pipes
+from schemaflow import types
+
+
+class Scale(Pipe):
+    fit_requires = transform_requires = {'x': types.List(float)}
+
+    fitted_parameters = {'max': float}
+
+    transform_modifies = {'x_scaled': types.List(float)}
+
+    calls = 0
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['max'] = max(data['x'])
+
+    def transform(self, data: dict):
+        Scale.calls += 1
+        data['x_scaled'] = [x_i / self['max'] for x_i in data['x']]
+        return data
+
+
+class Model(Pipe):
+    transform_requires = {'x_scaled': types.List(float)}
+
+    def __init__(self, output, factor):
+        super().__init__()
+        self.transform_modifies = {output: types.List(float)}
+        self.output = output
+        self.factor = factor
+
+    def transform(self, data: dict):
+        data[self.output] = [x_i * self.factor for x_i in data['x_scaled']]
+        return data
+
+
+class Increment(Pipe):
+    transform_requires = transform_modifies = {'x': types.List(float)}
+
+    def transform(self, data: dict):
+        data['x'] = [x_i + 1 for x_i in data['x']]
+        return data
+
+
+class TestEliminateCommonPipes(unittest.TestCase):
+
+    def setUp(self):
+        Scale.calls = 0
+
+    def _ensemble(self):
+        train = {'x': [1.0, 2.0, 4.0]}
+        branches = []
+        for i in range(3):
+            branch = Pipeline([('scale', Scale()), ('model', Model('y_%d' % i, i))])
+            branch.fit(train.copy())
+            branches.append(('branch_%d' % i, branch))
+        Scale.calls = 0
+        return Union(branches, executor=None)
+
+    def test_union(self):
+        p = self._ensemble()
+        expected = p.transform({'x': [1.0, 2.0]})
+        self.assertEqual(Scale.calls, 3)
+        Scale.calls = 0
+
+        optimized = eliminate_common_pipes(p)
+        self.assertEqual(optimized.transform({'x': [1.0, 2.0]}), expected)
+        self.assertEqual(Scale.calls, 1)
+        self.assertEqual(optimized.transform_modifies, p.transform_modifies)
+
+    def test_different_state(self):
+        p = self._ensemble()
+        p.pipes['branch_1'].fit({'x': [1.0, 8.0]})
+        Scale.calls = 0
+        expected = p.transform({'x': [1.0, 2.0]})
+        Scale.calls = 0
+
+        optimized = eliminate_common_pipes(p)
+        result = optimized.transform({'x': [1.0, 2.0]})
+        self.assertEqual(Scale.calls, 2)
+        for key in ['y_0', 'y_1', 'y_2']:
+            self.assertEqual(result[key], expected[key])
+
+    def test_pipeline(self):
+        p = Pipeline([Scale(), Model('y_0', 1), Scale(), Model('y_1', 2)])
+        p.fit({'x': [1.0, 2.0, 4.0]})
+        expected = p.transform({'x': [1.0, 2.0]})
+        Scale.calls = 0
+
+        optimized = eliminate_common_pipes(p)
+        self.assertEqual(len(optimized.pipes), 3)
+        self.assertEqual(optimized.transform({'x': [1.0, 2.0]}), expected)
+        self.assertEqual(Scale.calls, 1)
+
+    def test_pipeline_modified_input(self):
+        # the input of the second Scale changes => it is not redundant
+        p = Pipeline([Scale(), Increment(), Scale()])
+        p.fit({'x': [1.0, 2.0, 4.0]})
+
+        optimized = eliminate_common_pipes(p)
+        self.assertEqual(len(optimized.pipes), 3)
+
+    def test_undeclared(self):
+        # pipes without declared keys may use any key => never merged
+        p = Pipeline([Pipe(), Pipe()])
+        self.assertEqual(len(eliminate_common_pipes(p).pipes), 2)
+
+        p = Pipeline([Scale(), Pipe(), Scale()])
+        p.fit({'x': [1.0, 2.0, 4.0]})
+        self.assertEqual(len(eliminate_common_pipes(p).pipes), 3)
+
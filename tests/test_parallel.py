@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from schemaflow.parallel import ColumnPipe
+from schemaflow import types
+
+
+class AddMean(ColumnPipe):
+    transform_requires = transform_modifies = {'x': types.PandasDataFrame(schema={})}
+
+    transform_columns = {'x'}
+
+    def transform_column(self, key: str, column):
+        return column + column.mean()
+
+
+class TestColumnPipe(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame(np.arange(60.0).reshape(3, 20), columns=['c%d' % i for i in range(20)])
+        self.expected = self.df + self.df.mean(axis=0)
+
+    def _check(self, executor):
+        p = AddMean()
+        p.executor = executor
+        p.n_jobs = 2
+
+        result = p.transform({'x': self.df.copy(), 'y': 1})
+        self.assertEqual(list(result['x'].columns), list(self.df.columns))
+        pd.testing.assert_frame_equal(result['x'], self.expected)
+        self.assertEqual(result['y'], 1)
+
+    def test_sequential(self):
+        self._check(None)
+
+    def test_thread(self):
+        self._check('thread')
+
+    def test_process(self):
+        self._check('process')
+
+    def test_wrong_executor(self):
+        p = AddMean()
+        p.executor = 'gpu'
+        with self.assertRaises(ValueError):
+            p.transform({'x': self.df.copy()})
+
+    def test_no_columns(self):
+        p = AddMean()
+        result = p.transform({'x': pd.DataFrame(index=[0, 1])})
+        self.assertEqual(len(result['x'].columns), 0)
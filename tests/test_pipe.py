@@ -149,3 +149,50 @@ class TestPipe(unittest.TestCase):
         with self.assertRaises(exceptions.WrongSchema) as e:
             p.transform_schema({'y': types.List(float)})
         self.assertIn('in transform', str(e.exception))
+
+    def test_fingerprint(self):
+        p1 = Pipe()
+        p2 = Pipe()
+        self.assertEqual(p1.fingerprint, p2.fingerprint)
+
+        p1['model'] = np.array([1.0, 2.0])
+        self.assertNotEqual(p1.fingerprint, p2.fingerprint)
+
+        p2['model'] = np.array([1.0, 2.0])
+        self.assertEqual(p1.fingerprint, p2.fingerprint)
+
+        # bookkeeping attributes are not part of the fingerprint
+        p1.use_buffer_pool()
+        p1._fit_fingerprints = {'0': 'abc'}
+        self.assertEqual(p1.fingerprint, p2.fingerprint)
+
+    def test_freeze(self):
+        import pickle
+        import copy
+
+        p = Pipe()
+        p['model'] = np.array([1.0, 2.0])
+        p['mapping'] = {'a': [1]}
+        p['mean'] = np.mean(p['model'])
+
+        frozen = p.freeze()
+        self.assertTrue(frozen.frozen)
+        self.assertFalse(p.frozen)
+        self.assertEqual(frozen.fingerprint, p.fingerprint)
+
+        with self.assertRaises(exceptions.FrozenError):
+            frozen['model'] = 1
+        with self.assertRaises(exceptions.FrozenError):
+            frozen.fit({}, {'alpha': 1.0})
+        with self.assertRaises(exceptions.FrozenError):
+            frozen.state['mapping']['b'] = 2
+        with self.assertRaises(ValueError):
+            frozen['model'][0] = 3.0
+
+        # the original is not affected
+        p['model'][0] = 3.0
+        self.assertEqual(frozen['model'][0], 1.0)
+
+        for copied in [pickle.loads(pickle.dumps(frozen)), copy.deepcopy(frozen)]:
+            self.assertTrue(copied.frozen)
+            np.testing.assert_array_equal(copied['model'], [1.0, 2.0])
@@ -1,8 +1,13 @@
+import asyncio
 import unittest
 import logging
 import collections
+import copy
+import pickle
+import threading
+import time
 
-from schemaflow.pipeline import Pipeline
+from schemaflow.pipeline import Pipeline, _independent_stages
 from schemaflow.pipe import Pipe
 from schemaflow import types
 from schemaflow import exceptions
@@ -281,3 +286,339 @@ class TestPipelineLogging(unittest.TestCase):
         self.assertEqual(self._handler.messages['error'][1],
                          "Wrong type in argument 'x' of transform in 1:\nRequired type: List(float)\nPassed type:   List(int)")
         self.assertEqual(len(self._handler.messages['info']), 4)
+
+
+def _overlap(intervals):
+    """
+    Returns whether all ``intervals`` (pairs ``(start, end)``) share a point in time.
+    """
+    return max(start for start, _ in intervals) < min(end for _, end in intervals)
+
+
+class SleepPipe(Pipe):
+    transform_requires = {'x': types.List(float)}
+    transform_modifies = {'x': types.List(float)}
+
+    def __init__(self):
+        super().__init__()
+        self.intervals = []
+
+    def transform(self, data: dict):
+        start = time.perf_counter()
+        time.sleep(0.05)
+        data['x'] = [x_i + 1 for x_i in data['x']]
+        self.intervals.append((start, time.perf_counter()))
+        return data
+
+
+class FailPipe(Pipe):
+    def transform(self, data: dict):
+        raise ValueError('failed')
+
+
+class InterruptPipe(Pipe):
+    def transform(self, data: dict):
+        raise KeyboardInterrupt()
+
+
+def _interrupted_batches():
+    yield {'x': [0.0]}
+    raise KeyboardInterrupt()
+
+
+class TestTransformStream(unittest.TestCase):
+
+    def test_order(self):
+        p = Pipeline([Pipe1(), SleepPipe(), SleepPipe()])
+
+        batches = [{'x': [str(i)]} for i in range(10)]
+        results = list(p.transform_stream(batches))
+        self.assertEqual([result['x'] for result in results], [[i + 2.0] for i in range(10)])
+
+    def test_overlap(self):
+        pipes = [SleepPipe() for _ in range(4)]
+        p = Pipeline(pipes)
+
+        list(p.transform_stream({'x': [0.0]} for _ in range(8)))
+        # the first pipe transforms the second batch while the second pipe transforms the first batch
+        self.assertTrue(_overlap([pipes[0].intervals[1], pipes[1].intervals[0]]))
+
+    def test_exception(self):
+        p = Pipeline([SleepPipe(), FailPipe()])
+
+        with self.assertRaises(ValueError):
+            list(p.transform_stream([{'x': [0.0]}, {'x': [1.0]}]))
+
+    def test_base_exception(self):
+        for p, batches in [(Pipeline([SleepPipe(), InterruptPipe()]), [{'x': [0.0]}]),
+                           (Pipeline([SleepPipe()]), _interrupted_batches())]:
+            raised = []
+
+            def consume():
+                try:
+                    list(p.transform_stream(batches))
+                except KeyboardInterrupt as e:
+                    raised.append(e)
+            # the stream ends instead of waiting forever for the interrupted stage
+            thread = threading.Thread(target=consume, daemon=True)
+            thread.start()
+            thread.join(5)
+            self.assertEqual(len(raised), 1)
+
+    def test_early_stop(self):
+        p = Pipeline([SleepPipe()])
+
+        stream = p.transform_stream({'x': [0.0]} for _ in range(100))
+        self.assertEqual(next(stream)['x'], [1.0])
+        stream.close()
+
+
+async def _feature_store(reader, writer):
+    """
+    A local stand-in for a feature store: answers each line with its length after 0.1s.
+    """
+    line = await reader.readline()
+    await asyncio.sleep(0.1)
+    writer.write(b'%d\n' % len(line.strip()))
+    await writer.drain()
+    writer.close()
+
+
+class FeatureStorePipe(Pipe):
+    port = None
+
+    def __init__(self, input_key, output_key):
+        super().__init__()
+        self.transform_requires = {input_key: str}
+        self.transform_modifies = {output_key: int}
+        self.input_key = input_key
+        self.output_key = output_key
+        self.intervals = []
+
+    async def transform(self, data: dict):
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(data[self.input_key].encode() + b'\n')
+        data[self.output_key] = int(await reader.readline())
+        writer.close()
+        self.intervals.append((start, time.perf_counter()))
+        return data
+
+
+class AsyncPipe(Pipe1):
+    async def transform(self, data: dict):
+        await asyncio.sleep(0.01)
+        return super().transform(data)
+
+
+class SumPipe(Pipe):
+    transform_requires = {'a_length': int, 'b_length': int}
+    transform_modifies = {'length': int}
+
+    def transform(self, data: dict):
+        data['length'] = data['a_length'] + data['b_length']
+        return data
+
+
+class TestAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(_feature_store, '127.0.0.1', 0))
+        FeatureStorePipe.port = self.server.sockets[0].getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def test_atransform(self):
+        a, b = FeatureStorePipe('a', 'a_length'), FeatureStorePipe('b', 'b_length')
+        p = Pipeline([a, b, SumPipe()])
+
+        result = self.loop.run_until_complete(p.atransform({'a': 'abc', 'b': 'de'}))
+        # the two requests to the feature store are concurrent
+        self.assertTrue(_overlap(a.intervals + b.intervals))
+        self.assertEqual(result, {'a': 'abc', 'b': 'de', 'a_length': 3, 'b_length': 2, 'length': 5})
+
+    def test_sync_pipes(self):
+        p = Pipeline([Pipe1(), Pipe2()])
+        p.fit({'x': ['1', '2', '3']}, {'1': {'unused': 1.0}})
+
+        result = self.loop.run_until_complete(p.atransform({'x': ['1', '2', '3']}))
+        self.assertEqual(result['x'], [-1.2247448713915887, 0.0, 1.2247448713915887])
+
+    def test_sync_transform(self):
+        p = Pipeline([AsyncPipe(), Pipe2()])
+        p.fit({'x': ['1', '2', '3']}, {'1': {'unused': 1.0}})
+
+        result = p.transform({'x': ['1', '2', '3']})
+        self.assertEqual(result['x'], [-1.2247448713915887, 0.0, 1.2247448713915887])
+
+    def test_sync_transform_in_loop(self):
+        p = Pipeline([AsyncPipe(), Pipe2()])
+        p.fit({'x': ['1', '2', '3']}, {'1': {'unused': 1.0}})
+
+        # e.g. in Jupyter or an async web handler
+        async def handler():
+            return p.transform({'x': ['1', '2', '3']})
+        result = self.loop.run_until_complete(handler())
+        self.assertEqual(result['x'], [-1.2247448713915887, 0.0, 1.2247448713915887])
+
+    def test_stages(self):
+        p = Pipeline([FeatureStorePipe('a', 'a_length'), FeatureStorePipe('b', 'b_length'), SumPipe(), Pipe1()])
+        stages = _independent_stages(p.pipes)
+        self.assertEqual([[name for name, _ in stage] for stage in stages], [['0', '1'], ['2', '3']])
+
+        # pipes without declared keys may use any key
+        p = Pipeline([FeatureStorePipe('a', 'a_length'), Pipe(), FeatureStorePipe('b', 'b_length')])
+        stages = _independent_stages(p.pipes)
+        self.assertEqual([[name for name, _ in stage] for stage in stages], [['0'], ['1'], ['2']])
+
+
+class Mean(Pipe):
+    fit_requires = {'x': types.List(float)}
+    transform_requires = {'x': types.List(float)}
+    transform_modifies = {'x': types.List(float)}
+    fitted_parameters = {'mean': float}
+
+    fits = 0
+
+    def fit(self, data: dict, parameters: dict=None):
+        Mean.fits += 1
+        self['mean'] = sum(data['x']) / len(data['x'])
+
+    def transform(self, data: dict):
+        data['x'] = [x_i - self['mean'] for x_i in data['x']]
+        return data
+
+
+class Slope(Pipe):
+    fit_requires = {'x': types.List(float), 'y': types.List(float)}
+    transform_requires = {'x': types.List(float)}
+    transform_modifies = {'y_pred': types.List(float)}
+    fitted_parameters = {'slope': float}
+
+    warm_fits = 0
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['slope'] = sum(x * y for x, y in zip(data['x'], data['y'])) / sum(x * x for x in data['x'])
+
+    def warm_fit(self, data: dict, parameters: dict=None, previous=None):
+        Slope.warm_fits += 1
+        self.fit(data, parameters)
+
+    def transform(self, data: dict):
+        data['y_pred'] = [self['slope'] * x_i for x_i in data['x']]
+        return data
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        Mean.fits = 0
+        Slope.warm_fits = 0
+
+    def test_previous(self):
+        previous = Pipeline([('mean', Mean()), ('slope', Slope())])
+        previous.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, warm_start=True)
+        self.assertEqual(Mean.fits, 1)
+
+        # only `y` changed => `mean` keeps its state and `slope` is warm-fitted
+        p = Pipeline([('mean', Mean()), ('slope', Slope())])
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [-2.0, 0.0, 2.0]}, previous=previous)
+        self.assertEqual(Mean.fits, 1)
+        self.assertEqual(Slope.warm_fits, 1)
+        self.assertEqual(p.pipes['mean']['mean'], 2.0)
+        self.assertEqual(p.pipes['slope']['slope'], 2.0)
+        self.assertEqual(previous.pipes['slope']['slope'], 1.0)
+
+        # `x` changed => both are fitted
+        p2 = Pipeline([('mean', Mean()), ('slope', Slope())])
+        p2.fit({'x': [1.0, 2.0, 6.0], 'y': [-2.0, 0.0, 2.0]}, previous=p)
+        self.assertEqual(Mean.fits, 2)
+        self.assertEqual(Slope.warm_fits, 2)
+
+    def test_nested(self):
+        previous = Pipeline([('inner', Pipeline([('mean', Mean())])), ('slope', Slope())])
+        previous.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, warm_start=True)
+
+        p = Pipeline([('inner', Pipeline([('mean', Mean())])), ('slope', Slope())])
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, previous=previous)
+        self.assertEqual(Mean.fits, 1)
+        self.assertEqual(Slope.warm_fits, 0)
+        self.assertEqual(p.transform({'x': [3.0]})['y_pred'], [1.0])
+
+    def test_union(self):
+        from schemaflow.pipeline import Union
+
+        def pipeline():
+            return Pipeline([('union', Union([('mean', Mean())], executor=None)), ('slope', Slope())])
+        previous = pipeline()
+        previous.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, warm_start=True)
+
+        # the fitted branches of the union are reused
+        p = pipeline()
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, previous=previous)
+        self.assertEqual(Mean.fits, 1)
+        self.assertEqual(p.transform({'x': [3.0]})['y_pred'], [1.0])
+
+    def test_configuration(self):
+        previous = Pipeline([('mean', Mean()), ('slope', Slope())])
+        previous.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, warm_start=True)
+
+        # same inputs, but a different configuration => fitted
+        p = Pipeline([('mean', Mean()), ('slope', Slope())])
+        p.pipes['mean'].ddof = 1
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, previous=previous)
+        self.assertEqual(Mean.fits, 2)
+
+    def test_cold_fit(self):
+        # without `previous` or `warm_start`, the inputs are not fingerprinted
+        p = Pipeline([('mean', Mean()), ('slope', Slope())])
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]})
+        self.assertEqual(p._fit_fingerprints, {})
+
+        p2 = Pipeline([('mean', Mean()), ('slope', Slope())])
+        p2.fit({'x': [1.0, 2.0, 3.0], 'y': [-1.0, 0.0, 1.0]}, previous=p)
+        self.assertEqual(Mean.fits, 2)
+
+
+class TestFreeze(unittest.TestCase):
+
+    def test_freeze(self):
+        p = Pipeline([('mean', Mean()), ('slope', Slope())])
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [2.0, 4.0, 6.0]})
+        frozen = p.freeze()
+
+        self.assertTrue(frozen.frozen)
+        self.assertTrue(all(pipe.frozen for pipe in frozen.pipes.values()))
+        self.assertFalse(p.pipes['mean'].frozen)
+        self.assertEqual(frozen.fingerprint, p.fingerprint)
+
+        with self.assertRaises(exceptions.FrozenError):
+            frozen.fit({'x': [1.0], 'y': [1.0]})
+        with self.assertRaises(exceptions.FrozenError):
+            frozen.pipes['mean'].fit({'x': [1.0]})
+        with self.assertRaises(exceptions.FrozenError):
+            frozen.pipes['other'] = Mean()
+        with self.assertRaises(exceptions.FrozenError):
+            frozen.pipes.move_to_end('mean')
+
+        # the pipes are still an OrderedDict
+        self.assertIsInstance(frozen.pipes, collections.OrderedDict)
+        self.assertEqual(list(Pipeline(frozen.pipes).pipes), ['mean', 'slope'])
+        for copied in [pickle.loads(pickle.dumps(frozen)), copy.deepcopy(frozen)]:
+            self.assertEqual(list(copied.pipes), ['mean', 'slope'])
+            with self.assertRaises(exceptions.FrozenError):
+                copied.pipes['other'] = Mean()
+
+        # concurrent transforms of the frozen pipeline
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda i: frozen.transform({'x': [float(i)]})['y_pred'], range(20)))
+        self.assertEqual(results, [p.transform({'x': [float(i)]})['y_pred'] for i in range(20)])
+
+        # a refit does not affect the frozen copy
+        p.fit({'x': [1.0, 2.0, 3.0], 'y': [1.0, 1.0, 1.0]})
+        self.assertNotEqual(frozen.fingerprint, p.fingerprint)
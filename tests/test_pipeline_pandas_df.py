@@ -67,3 +67,252 @@ class TestPipeline(unittest.TestCase):
 
         self.assertEqual(schema['x'], types.PandasDataFrame({'b': np.float64,
                                                              'a * b': np.float64}))
+
+
+class Product(Pipe):
+    transform_requires = {
+        'x': types.PandasDataFrame(schema={'a': np.float64, 'b': np.float64}),
+    }
+
+    transform_modifies = {
+        'y': types.Array(np.float64),
+        'x': ops.Drop(),
+    }
+
+    row_independent = True
+
+    rows = 0
+
+    def transform(self, data: dict):
+        Product.rows += len(data['x'])
+        data['y'] = (data['x']['a'] * data['x']['b']).values
+        del data['x']
+        return data
+
+
+class TestIncrementalTransform(unittest.TestCase):
+
+    def setUp(self):
+        Product.rows = 0
+
+    def test_incremental(self):
+        p = Pipeline([Product()])
+        store = {}
+
+        day_1 = pd.DataFrame({'a': [1.0, 2.0, 3.0], 'b': [1.0, 1.0, 1.0]}, index=[10, 11, 12])
+        result = p.incremental_transform({'x': day_1, 'z': 1}, store, 'x')
+        np.testing.assert_array_equal(result['y'], [1.0, 2.0, 3.0])
+        self.assertEqual(result['z'], 1)
+        self.assertEqual(Product.rows, 3)
+
+        # row 11 changed, row 13 appended, row 10 removed
+        day_2 = pd.DataFrame({'a': [20.0, 3.0, 4.0], 'b': [1.0, 1.0, 1.0]}, index=[11, 12, 13])
+        result = p.incremental_transform({'x': day_2, 'z': 1}, store, 'x')
+        np.testing.assert_array_equal(result['y'], [20.0, 3.0, 4.0])
+        self.assertNotIn('x', result)
+        self.assertEqual(Product.rows, 3 + 2)
+
+        # nothing changed
+        result = p.incremental_transform({'x': day_2, 'z': 1}, store, 'x')
+        np.testing.assert_array_equal(result['y'], [20.0, 3.0, 4.0])
+        self.assertEqual(Product.rows, 3 + 2)
+
+        # a different non-row input invalidates the store
+        result = p.incremental_transform({'x': day_2, 'z': 2}, store, 'x')
+        np.testing.assert_array_equal(result['y'], [20.0, 3.0, 4.0])
+        self.assertEqual(Product.rows, 3 + 2 + 3)
+
+    def test_other_lengths(self):
+        p = Pipeline([Product()])
+        store = {}
+        df = pd.DataFrame({'a': [1.0, 2.0, 3.0, 4.0], 'b': [1.0, 1.0, 1.0, 1.0]})
+        p.incremental_transform({'labels': ['a', 'b'], 'x': df.iloc[:3]}, store, 'x')
+
+        # rows are counted from `x`, not from the first value with rows
+        result = p.incremental_transform({'labels': ['a', 'b'], 'x': df}, store, 'x')
+        np.testing.assert_array_equal(result['y'], [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(result['labels'], ['a', 'b'])
+        self.assertEqual(Product.rows, 3 + 1)
+
+    def test_all_rows_cached(self):
+        p = Pipeline([Product()])
+        store = {}
+        data = {'x': pd.DataFrame({'a': [1.0, 2.0], 'b': [1.0, 1.0]}), 'ids': ['a', 'b'], 'z': 1}
+
+        expected = p.incremental_transform(data, store, 'x')
+        result = p.incremental_transform(data, store, 'x')
+        self.assertEqual(Product.rows, 2)
+        # the output has the same keys whether rows are transformed or taken from the store
+        self.assertEqual(set(result), set(expected))
+        self.assertEqual(result['ids'], ['a', 'b'])
+        self.assertNotIn('x', result)
+
+    def test_keep_input(self):
+        p = Pipeline([Pipe1()])
+        Pipe1.row_independent = True
+        try:
+            store = {}
+            df = pd.DataFrame({'a': [1.0, 2.0], 'b': [2.0, 2.0]})
+            p.incremental_transform({'x': df.copy()}, store, 'x')
+
+            df = pd.DataFrame({'a': [1.0, 2.0, 3.0], 'b': [2.0, 2.0, 2.0]})
+            result = p.incremental_transform({'x': df.copy()}, store, 'x')
+            self.assertEqual(list(result['x']['a * b']), [2.0, 4.0, 6.0])
+            self.assertEqual(list(result['x'].index), [0, 1, 2])
+        finally:
+            Pipe1.row_independent = False
+
+    def test_not_row_independent(self):
+        p = Pipeline([Pipe2()])
+        store = {}
+        result = p.incremental_transform({'x': pd.DataFrame({'a': [2.0], 'b': [2.0]})}, store, 'x')
+        self.assertEqual(list(result['x'].columns), ['b'])
+        self.assertEqual(store, {})
+
+
+class Categories(Pipe):
+    fit_requires = transform_requires = {'x': types.PandasDataFrame(schema={})}
+
+    fitted_parameters = {'categories': list, 'rows': int}
+
+    transform_modifies = {'n': int}
+
+    fit_sample = 100
+
+    fit_sample_by = 'c'
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['categories'] = sorted(data['x']['c'].unique())
+        self['rows'] = len(data['x'])
+        self['y_rows'] = len(data['y'])
+
+    def transform(self, data: dict):
+        data['n'] = len(data['x'])
+        return data
+
+
+class TestFitSample(unittest.TestCase):
+
+    def test_stratified(self):
+        # 'b' is rare: a stratified sample keeps it
+        df = pd.DataFrame({'c': ['a'] * 9990 + ['b'] * 10, 'v': np.arange(10000.0)})
+        p = Pipeline([Categories()])
+
+        p.fit({'x': df, 'y': np.arange(10000.0)})
+        self.assertEqual(p.pipes['0']['categories'], ['a', 'b'])
+        self.assertEqual(p.pipes['0']['rows'], 101)
+        self.assertEqual(p.pipes['0']['y_rows'], 101)
+        # the transform receives all rows
+        self.assertEqual(p.transform({'x': df})['n'], 10000)
+
+    def test_random(self):
+        df = pd.DataFrame({'c': ['a'] * 9990 + ['b'] * 10})
+        p = Pipeline([Categories()])
+        p.pipes['0'].fit_sample = 0.5
+        p.pipes['0'].fit_sample_by = None
+
+        p.fit({'x': df, 'y': list(range(10000))})
+        self.assertEqual(p.pipes['0']['rows'], 5000)
+        self.assertEqual(p.pipes['0']['y_rows'], 5000)
+
+    def test_other_fits(self):
+        from schemaflow.pipeline import Union
+        from schemaflow.model_selection import grid_search
+
+        df = pd.DataFrame({'c': ['a'] * 9990 + ['b'] * 10})
+        data = {'x': df, 'y': list(range(10000))}
+
+        p = Pipeline([('categories', Categories())])
+        p.fit(data)
+        rows = p.pipes['categories']['rows']
+        self.assertLess(rows, 200)
+
+        # branches of a Union and pipes fitted in a grid search are also fitted on the sample
+        p = Union([('categories', Categories())], executor=None)
+        p.fit(data)
+        self.assertEqual(p.pipes['categories']['rows'], rows)
+
+        results = grid_search(Pipeline([('categories', Categories())]), data, data, {}, lambda result: 0)
+        self.assertEqual(results[0][2].pipes['categories']['rows'], rows)
+
+    def test_array(self):
+        data = {'x': np.arange(10.0), 'y': np.arange(10.0), 'z': 1}
+        result = types._sample(data, 3)
+        np.testing.assert_array_equal(result['x'], result['y'])
+        self.assertEqual(len(result['x']), 3)
+        self.assertEqual(result['z'], 1)
+        self.assertIs(types._sample(data, 20), data)
+
+
+class Scale(Pipe):
+    transform_requires = {'y': types.Array(np.float64)}
+    transform_modifies = {'y': types.Array(np.float64)}
+
+    fitted_parameters = {'scale': float}
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['scale'] = 1 / data['y'].max()
+
+    def transform(self, data: dict):
+        data['y'] = data['y'] * self['scale']
+        return data
+
+    def transform_row(self, record: dict):
+        record['y'] = record['y'] * self['scale']
+        return record
+
+
+class Offset(Pipe):
+    transform_requires = {'y': types.Array(np.float64)}
+    transform_modifies = {'y_offset': types.Array(np.float64)}
+
+    calls = 0
+
+    def transform(self, data: dict):
+        Offset.calls += 1
+        data['y_offset'] = data['y'] + 1
+        return data
+
+
+class TestTransformRow(unittest.TestCase):
+
+    def test_compile(self):
+        p = Pipeline([Pipe1(), Product(), ('scale', Scale()), Offset()])
+        p.pipes['scale']['scale'] = 0.5
+
+        df = pd.DataFrame({'a': [2.0, 3.0], 'b': [2.0, 4.0]})
+        expected = p.transform({'x': df.copy()})
+
+        transform_row = p.compile_row()
+        for i in range(len(df)):
+            Offset.calls = 0
+            result = transform_row({'x': {'a': df['a'][i], 'b': df['b'][i]}, 'id': i})
+
+            self.assertEqual(Offset.calls, 1)
+            self.assertEqual(set(result), {'y', 'y_offset', 'id'})
+            self.assertEqual(result['y'], expected['y'][i])
+            self.assertEqual(result['y_offset'], expected['y_offset'][i])
+            self.assertEqual(result['id'], i)
+
+        self.assertEqual(p.transform_row({'x': {'a': 1.0, 'b': 4.0}})['y_offset'], 3.0)
+
+    def test_nested(self):
+        compiled = []
+
+        class CompiledPipeline(Pipeline):
+            def compile_row(self):
+                compiled.append(self)
+                return super().compile_row()
+
+        nested = CompiledPipeline([('scale', Scale()), Offset()])
+        nested.pipes['scale']['scale'] = 0.5
+        transform_row = Pipeline([Pipe1(), Product(), ('nested', nested)]).compile_row()
+        self.assertEqual(compiled, [nested])
+
+        for i in range(3):
+            self.assertEqual(transform_row({'x': {'a': 2.0, 'b': float(i)}})['y_offset'], i + 1)
+        self.assertEqual(compiled, [nested])
+
+    def test_batch_fallback(self):
+        result = Pipe1().transform_row({'x': {'a': 2.0, 'b': 3.0}})
+        self.assertEqual(result, {'x': {'a': 2.0, 'b': 3.0, 'a * b': 6.0}})
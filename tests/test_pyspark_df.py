@@ -6,6 +6,8 @@ import pyspark
 from pyspark.sql.types import Row
 
 from schemaflow.types import PySparkDataFrame, infer_schema
+from schemaflow.constraints import NotNull, Range, IsIn
+from schemaflow import exceptions
 
 
 class PySparkTestCase(unittest.TestCase):
@@ -92,3 +94,44 @@ class TestPySparkDataFrame(PySparkTestCase):
 
         schema = infer_schema({'a': instance})
         self.assertEqual(schema, {'a': PySparkDataFrame(schema={'a': float, 'b': np.dtype('O')})})
+
+    def test_sample(self):
+        from schemaflow.types import _sample
+
+        instance = self.sqlContext.createDataFrame(data=[Row(a=float(i), b='s' if i % 2 else 't')
+                                                         for i in range(1000)])
+        result = _sample({'x': instance, 'z': 1}, 0.1)
+        self.assertLess(result['x'].count(), 200)
+        self.assertEqual(result['z'], 1)
+
+        result = _sample({'x': instance}, 100, by='b')
+        self.assertEqual(set(row.b for row in result['x'].select('b').distinct().collect()), {'s', 't'})
+
+    def test_check_values(self):
+        instance_type = PySparkDataFrame(schema={'a': float, 'b': np.dtype('O')}, constraints={
+            'a': [NotNull(), Range(0, 10)],
+            'b': IsIn({'s', 't'}),
+        })
+        instance = self.sqlContext.createDataFrame(data=[Row(a=1.0, b='s'), Row(a=20.0, b='t'), Row(a=None, b='u')])
+
+        self.sc.setJobGroup('check_values', 'check_values')
+        errors = instance_type.check_values(instance)
+        # all constraints are checked in a single job
+        self.assertEqual(len(self.sc.statusTracker().getJobIdsForGroup('check_values')), 1)
+
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(error, exceptions.WrongValue) for error in errors))
+        self.assertEqual([(error.constraint, error.n_invalid, error.n_rows) for error in errors],
+                         [(NotNull(), 1, 3), (Range(0, 10), 1, 3), (IsIn({'s', 't'}), 1, 3)])
+
+        with self.assertRaises(exceptions.WrongValue):
+            instance_type.check_values(instance, raise_=True)
+
+        instance = self.sqlContext.createDataFrame(data=[Row(a=float(i % 10), b='s') for i in range(1000)])
+        self.assertEqual(instance_type.check_values(instance, sample=0.1), [])
+
+        # missing column
+        instance = self.sqlContext.createDataFrame(data=[Row(a=1.0)])
+        errors = instance_type.check_values(instance)
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], exceptions.WrongSchema)
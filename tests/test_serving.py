@@ -0,0 +1,293 @@
+import unittest
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from schemaflow.serving import MicroBatcher, TransformCache, Registry, make_server
+from schemaflow.pipeline import Pipeline
+from schemaflow.pipe import Pipe
+from schemaflow import types, exceptions
+
+
+class Product(Pipe):
+    transform_requires = {'x': types.PandasDataFrame(schema={'a': np.float64, 'b': np.float64})}
+    transform_modifies = {'y': types.Array(np.float64)}
+
+    batches = []
+
+    def transform(self, data: dict):
+        Product.batches.append(len(data['x']))
+        data['y'] = (data['x']['a'] * data['x']['b']).values
+        return data
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        Product.batches = []
+
+    def test_batch(self):
+        with MicroBatcher(Pipeline([Product()]), max_batch_size=8, max_latency=0.5) as batcher:
+            futures = [batcher.submit({'x': {'a': float(i), 'b': 2.0}, 'id': i}) for i in range(20)]
+            results = [future.result() for future in futures]
+
+        self.assertEqual([result['y'] for result in results], [2.0 * i for i in range(20)])
+        self.assertEqual([result['id'] for result in results], list(range(20)))
+        # up to 8 records per batch (how many arrive together depends on the timing)
+        self.assertTrue(all(batch <= 8 for batch in Product.batches))
+        self.assertEqual(sum(Product.batches), 20)
+
+    def test_error(self):
+        with MicroBatcher(Pipeline([Product()])) as batcher:
+            with self.assertRaises(exceptions.WrongSchema):
+                batcher.transform({'x': {'a': 1.0}})
+            # the batcher keeps serving after a failed batch
+            self.assertEqual(batcher.transform({'x': {'a': 1.0, 'b': 3.0}})['y'], 3.0)
+
+    def test_error_in_batch(self):
+        with MicroBatcher(Pipeline([Product()]), max_batch_size=3, max_latency=0.5) as batcher:
+            futures = [batcher.submit({'x': {'a': a, 'b': 2.0}}) for a in [1.0, 'a', 3.0]]
+
+            self.assertEqual(futures[0].result()['y'], 2.0)
+            with self.assertRaises(ValueError):
+                futures[1].result()
+            self.assertEqual(futures[2].result()['y'], 6.0)
+        # the valid records were transformed on their own
+        self.assertEqual(Product.batches, [1, 1])
+
+
+class TestServer(unittest.TestCase):
+
+    def _post(self, connection, body):
+        connection.request('POST', '/', json.dumps(body), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode())
+
+    def _serve(self, address):
+        server = make_server(Pipeline([Product()]), address, max_latency=0.001)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.batcher.close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_http(self):
+        server = self._serve(('127.0.0.1', 0))
+        connection = http.client.HTTPConnection(*server.server_address)
+
+        self.assertEqual(self._post(connection, {'x': {'a': 2.0, 'b': 3.0}}),
+                         (200, {'x': {'a': 2.0, 'b': 3.0}, 'y': 6.0}))
+        status, body = self._post(connection, {'x': {'a': 2.0}})
+        self.assertEqual(status, 400)
+        self.assertIn('Missing arguments', body['error'])
+        connection.close()
+
+    def test_unix_socket(self):
+        path = os.path.join(tempfile.mkdtemp(), 'schemaflow.sock')
+        self._serve(path)
+
+        connection = http.client.HTTPConnection('localhost')
+        connection.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.sock.connect(path)
+        self.assertEqual(self._post(connection, {'x': {'a': 2.0, 'b': 3.0}})[1]['y'], 6.0)
+        connection.close()
+
+
+class Scale(Pipe):
+    transform_requires = {'x': types.PandasDataFrame(schema={'a': np.float64}), 'factor': float}
+    transform_modifies = {'x': types.PandasDataFrame(schema={'a': np.float64}), 'y': types.Array(np.float64)}
+
+    row_independent = True
+
+    rows = 0
+
+    def transform(self, data: dict):
+        Scale.rows += len(data['x'])
+        data['x'] = data['x'] * data['factor']
+        data['y'] = data['x']['a'].values + 1
+        return data
+
+
+class Pairs(Pipe):
+    transform_requires = {'x': types.Array(np.float64)}
+    transform_modifies = {'y': types.Array(np.float64, shape=(None, 2))}
+
+    row_independent = True
+
+    def transform(self, data: dict):
+        data['y'] = self.output_buffer('y', (len(data['x']), 2))
+        data['y'][:, 0] = data['x']
+        data['y'][:, 1] = data['x'] * 2
+        return data
+
+
+class Power(Pipe):
+    transform_requires = {'x': types.Array(np.float64), 'k': float}
+    transform_modifies = {'y': types.Array(np.float64), 'kk': float}
+
+    row_independent = True
+
+    def transform(self, data: dict):
+        data['y'] = data['x'] * data['k']
+        data['kk'] = data['k'] * data['k']
+        return data
+
+
+class TestTransformCache(unittest.TestCase):
+
+    def setUp(self):
+        Scale.rows = 0
+        Product.batches = []
+
+    def _data(self, values, factor=2.0):
+        return {'x': pd.DataFrame({'a': values}, index=[10 + i for i in range(len(values))]), 'factor': factor}
+
+    def _check(self, result, values, factor=2.0):
+        rows = Scale.rows
+        expected = Pipeline([Scale()]).transform(self._data(values, factor))
+        Scale.rows = rows
+        pd.testing.assert_frame_equal(result['x'], expected['x'])
+        np.testing.assert_array_equal(result['y'], expected['y'])
+        self.assertEqual(result['factor'], factor)
+
+    def test_transform(self):
+        cache = TransformCache(Pipeline([Scale()]))
+
+        self._check(cache.transform(self._data([1.0, 2.0, 1.0])), [1.0, 2.0, 1.0])
+        self.assertEqual(Scale.rows, 3)
+
+        Scale.rows = 0
+        self._check(cache.transform(self._data([2.0, 3.0, 1.0])), [2.0, 3.0, 1.0])
+        self.assertEqual(Scale.rows, 1)
+
+        # all hits
+        self._check(cache.transform(self._data([3.0, 1.0])), [3.0, 1.0])
+        self.assertEqual(Scale.rows, 1)
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+        # values without rows are part of the key
+        self._check(cache.transform(self._data([3.0], 3.0)), [3.0], 3.0)
+        self.assertEqual(Scale.rows, 2)
+
+    def test_eviction(self):
+        cache = TransformCache(Pipeline([Scale()]), maxsize=2)
+        cache.transform(self._data([1.0, 2.0, 3.0]))
+        self.assertEqual(len(cache), 2)
+        cache.transform(self._data([1.0]))
+        self.assertEqual(Scale.rows, 4)
+
+        cache = TransformCache(Pipeline([Scale()]), ttl=0.01)
+        cache.transform(self._data([1.0]))
+        time.sleep(0.02)
+        cache.transform(self._data([1.0]))
+        self.assertEqual(Scale.rows, 6)
+
+    def test_buffer_pool(self):
+        pipeline = Pipeline([Pairs()])
+        pipeline.use_buffer_pool()
+        cache = TransformCache(pipeline)
+
+        cache.transform({'x': np.array([1.0])})
+        # re-uses the buffer of the first transform
+        cache.transform({'x': np.array([2.0])})
+        np.testing.assert_array_equal(cache.transform({'x': np.array([1.0, 2.0])})['y'], [[1.0, 2.0], [2.0, 4.0]])
+
+    def test_contexts(self):
+        cache = TransformCache(Pipeline([Power()]))
+        for _ in range(2):
+            # all rows are cached in the second iteration
+            for k in [1.0, 2.0]:
+                result = cache.transform({'x': np.array([1.0, 2.0]), 'k': k})
+                np.testing.assert_array_equal(result['y'], [k, 2 * k])
+                self.assertEqual(result['kk'], k * k)
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+    def test_not_row_independent(self):
+        cache = TransformCache(Pipeline([Product()]))
+        cache.transform({'x': pd.DataFrame({'a': [1.0], 'b': [1.0]})})
+        cache.transform({'x': pd.DataFrame({'a': [1.0], 'b': [1.0]})})
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(Product.batches, [1, 1])
+
+    def test_batcher(self):
+        pipeline = Pipeline([Scale()])
+        with MicroBatcher(pipeline, cache=TransformCache(pipeline)) as batcher:
+            for _ in range(3):
+                self.assertEqual(batcher.transform({'x': {'a': 1.0}, 'factor': 2.0})['y'], 3.0)
+        self.assertEqual(Scale.rows, 1)
+
+
+class Center(Pipe):
+    transform_requires = {'x': types.PandasDataFrame(schema={'a': np.float64})}
+    transform_modifies = {'x': types.PandasDataFrame(schema={'a': np.float64})}
+
+    fitted_parameters = {'mean': float}
+
+    calls = 0
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['mean'] = data['x']['a'].mean()
+
+    def transform(self, data: dict):
+        Center.calls += 1
+        data['x']['a'] -= self['mean']
+        return data
+
+
+class Linear(Pipe):
+    transform_requires = {'x': types.PandasDataFrame(schema={'a': np.float64})}
+    transform_modifies = {'y': types.Array(np.float64)}
+
+    def __init__(self, slope):
+        super().__init__()
+        self.slope = slope
+
+    def transform(self, data: dict):
+        data['y'] = data['x']['a'].values * self.slope
+        return data
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_shared_prefix(self):
+        models = {}
+        for name, slope in [('a', 1.0), ('b', 2.0), ('c', 2.0)]:
+            models[name] = Pipeline([('center', Center()), ('linear', Linear(slope))])
+            models[name].fit({'x': pd.DataFrame({'a': [1.0, 2.0, 3.0]})})
+
+        registry = Registry()
+        for name, model in models.items():
+            registry.register(name, model)
+        self.assertEqual(len(registry), 3)
+        # one center and two different linear pipes
+        self.assertEqual(registry.n_pipes, 3)
+        self.assertIs(registry.models['a'].pipes['center'], registry.models['b'].pipes['center'])
+        self.assertTrue(registry.models['a'].pipes['center'].frozen)
+
+        Center.calls = 0
+        results = registry.transform({'x': pd.DataFrame({'a': [5.0, 6.0]})})
+        self.assertEqual(Center.calls, 1)
+        self.assertEqual(list(results), ['a', 'b', 'c'])
+        for name, model in models.items():
+            expected = model.transform({'x': pd.DataFrame({'a': [5.0, 6.0]})})
+            np.testing.assert_array_equal(results[name]['y'], expected['y'])
+        self.assertIsNot(results['b'], results['c'])
+
+        data = {'x': pd.DataFrame({'a': [5.0]})}
+        results = registry.transform(data, ['c'])
+        np.testing.assert_array_equal(results['c']['y'], [6.0])
+        self.assertEqual(list(data), ['x'])
+        with self.assertRaises(KeyError):
+            registry.transform({'x': pd.DataFrame({'a': [5.0]})}, ['d'])
+
+        registry.unregister('a')
+        self.assertEqual(registry.n_pipes, 2)
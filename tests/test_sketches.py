@@ -0,0 +1,106 @@
+import unittest
+import pickle
+
+import numpy as np
+
+from schemaflow.sketches import TDigest, HyperLogLog, CountMinSketch, HeavyHitters
+from schemaflow.pipe import Pipe
+from schemaflow import types
+
+
+class Quantiles(Pipe):
+    fit_requires = transform_requires = {'x': types.Array(np.float64)}
+
+    fitted_parameters = {'quantiles': TDigest}
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['quantiles'] = TDigest()
+        for chunk in np.array_split(data['x'], 10):
+            self['quantiles'].update(chunk)
+
+
+class TestTDigest(unittest.TestCase):
+
+    def test_quantile(self):
+        values = np.random.RandomState(0).normal(size=100000)
+        digest = TDigest().update(values)
+
+        self.assertLess(len(digest.means), 200)
+        self.assertEqual(digest.count, 100000)
+        for q in [0.001, 0.01, 0.25, 0.5, 0.75, 0.99, 0.999]:
+            # the error is bounded in rank
+            self.assertAlmostEqual(np.mean(values <= digest.quantile(q)), q, delta=0.005)
+        self.assertEqual(digest.quantile(0), values.min())
+        self.assertEqual(digest.quantile(1), values.max())
+
+    def test_merge(self):
+        values = np.random.RandomState(0).uniform(size=100000)
+        digests = [TDigest().update(chunk) for chunk in np.array_split(values, 10)]
+        digest = digests[0]
+        for other in digests[1:]:
+            digest.merge(other)
+
+        self.assertEqual(digest.count, 100000)
+        np.testing.assert_allclose(digest.quantile([0.1, 0.5, 0.9]), [0.1, 0.5, 0.9], atol=0.01)
+
+    def test_empty(self):
+        self.assertTrue(np.isnan(TDigest().update([np.nan]).quantile(0.5)))
+
+    def test_pipe(self):
+        p = Quantiles()
+        p.fit({'x': np.arange(1001.0)})
+        self.assertAlmostEqual(p['quantiles'].quantile(0.5), 500, delta=5)
+        self.assertEqual(p.check_requirements, [])
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_count(self):
+        sketch = HyperLogLog().update(np.arange(100000) % 50000)
+        self.assertAlmostEqual(sketch.count(), 50000, delta=50000 * 0.03)
+
+        sketch = HyperLogLog().update(['a', 'b', 'a', 'c'])
+        self.assertAlmostEqual(sketch.count(), 3, delta=0.1)
+
+    def test_merge(self):
+        sketch_1 = HyperLogLog().update(np.arange(0, 60000))
+        sketch_2 = HyperLogLog().update(np.arange(40000, 100000))
+        self.assertAlmostEqual(sketch_1.merge(sketch_2).count(), 100000, delta=100000 * 0.03)
+
+        with self.assertRaises(ValueError):
+            sketch_1.merge(HyperLogLog(10))
+
+    def test_compact(self):
+        self.assertLess(len(pickle.dumps(HyperLogLog().update(np.arange(100000)))), 2 ** 14 + 1000)
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def test_estimate(self):
+        values = np.concatenate([np.full(1000, 7), np.arange(10000)])
+        sketch = CountMinSketch()
+        for chunk in np.array_split(values, 3):
+            sketch.merge(CountMinSketch().update(chunk))
+
+        estimates = sketch.estimate([7, 8, -1])
+        self.assertGreaterEqual(estimates[0], 1001)
+        self.assertLessEqual(estimates[0], 1001 + np.e * len(values) / 2000)
+        self.assertGreaterEqual(estimates[1], 1)
+
+
+class TestHeavyHitters(unittest.TestCase):
+
+    def test_most_common(self):
+        values = np.concatenate([np.full(3000, 'a'), np.full(2000, 'b'), np.arange(5000).astype(str)])
+        np.random.RandomState(0).shuffle(values)
+
+        sketch = HeavyHitters(10)
+        for chunk in np.array_split(values, 7):
+            sketch.merge(HeavyHitters(10).update(chunk))
+
+        (first, first_count), (second, second_count) = sketch.most_common(2)
+        self.assertEqual((first, second), ('a', 'b'))
+        self.assertGreaterEqual(first_count, 3000 - len(values) / 11)
+        self.assertLessEqual(first_count, 3000)
+        self.assertLessEqual(len(sketch.counts), 10)
+        self.assertEqual(sketch.n, 10000)
@@ -0,0 +1,198 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyspark
+from pyspark.sql.types import Row, StructType, StructField, DoubleType, FloatType, LongType, BooleanType
+
+from schemaflow.pipe import Pipe
+from schemaflow.pipeline import Pipeline
+from schemaflow import types, ops, exceptions
+from schemaflow.spark import _readers, transform_partitions
+
+
+class PySparkTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.spark = pyspark.sql.SparkSession.builder.master('local[*]').appName("testing").getOrCreate()
+
+    @classmethod
+    def tearDownClass(cls):
+        # also clears the session, so that the next test case does not reuse its stopped context
+        cls.spark.stop()
+
+
+class Count(Pipe):
+    """
+    Counts the rows of ``x`` (a Spark action) and records whether ``x`` was persisted at that time.
+    """
+    fit_requires = {'x': types.PySparkDataFrame({'a': float})}
+    fitted_parameters = {'count': int, 'cached': bool}
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['count'] = data['x'].count()
+        self['cached'] = data['x'].is_cached
+
+
+class Double(Pipe):
+    transform_requires = {'x': types.PySparkDataFrame({'a': float})}
+    transform_modifies = {'x': ops.ModifyDataFrame({'a': ops.Set(float)})}
+
+    def transform(self, data: dict):
+        data['x'] = data['x'].withColumn('a', data['x']['a'] * 2)
+        return data
+
+
+class Copy(Pipe):
+    transform_requires = {'x': types.PySparkDataFrame({'a': float})}
+    transform_modifies = {'y': types.PySparkDataFrame({'a': float})}
+
+    def transform(self, data: dict):
+        data['y'] = data['x'].select('a')
+        return data
+
+
+class TestReaders(unittest.TestCase):
+
+    def test_readers(self):
+        reads = [{'x'}, {'x'}, {'x', 'y'}, {'x'}]
+        writes = [set(), set(), {'x'}, set()]
+        self.assertEqual(_readers(reads, writes, 'x', 0), [0, 1, 2])
+        self.assertEqual(_readers(reads, writes, 'x', 3), [3])
+        self.assertEqual(_readers(reads, writes, 'y', 0), [2])
+
+
+class TestPersist(PySparkTestCase):
+
+    def setUp(self):
+        self.df = self.spark.createDataFrame(data=[Row(a=1.0), Row(a=2.0)])
+
+    def test_fit(self):
+        # persisted by default
+        pipeline = Pipeline([('count_1', Count()), ('double', Double()), ('count_2', Count())])
+        pipeline.fit({'x': self.df})
+
+        # read by `count_1` and `double`
+        self.assertTrue(pipeline.pipes['count_1']['cached'])
+        # only read by `count_2`
+        self.assertFalse(pipeline.pipes['count_2']['cached'])
+        self.assertEqual(pipeline.pipes['count_2']['count'], 2)
+        # unpersisted after its last reader
+        self.assertFalse(self.df.is_cached)
+
+    def test_disabled(self):
+        pipeline = Pipeline([('count_1', Count()), ('double', Double())])
+        pipeline.persist_level = None
+        pipeline.fit({'x': self.df})
+        self.assertFalse(pipeline.pipes['count_1']['cached'])
+
+    def test_transform_default(self):
+        # DataFrames are not persisted by transform by default
+        pipeline = Pipeline([('copy', Copy()), ('double', Double())])
+        pipeline.transform({'x': self.df})
+        self.assertFalse(self.df.is_cached)
+
+    def test_transform(self):
+        pipeline = Pipeline([('copy', Copy()), ('double', Double())])
+        pipeline.persist_transform = True
+        result = pipeline.transform({'x': self.df})
+
+        # read by `copy` and `double`: persisted until the results are evaluated
+        self.assertTrue(self.df.is_cached)
+        self.assertEqual(sorted(row.a for row in result['y'].collect()), [1.0, 2.0])
+        self.assertEqual(sorted(row.a for row in result['x'].collect()), [2.0, 4.0])
+
+        pipeline.unpersist()
+        self.assertFalse(self.df.is_cached)
+
+    def test_user_persisted(self):
+        self.df.persist()
+        pipeline = Pipeline([('copy', Copy()), ('double', Double())])
+        pipeline.persist_transform = True
+        pipeline.transform({'x': self.df})
+        pipeline.unpersist()
+        # DataFrames persisted by the caller are left untouched
+        self.assertTrue(self.df.is_cached)
+        self.df.unpersist()
+
+
+class AddRatio(Pipe):
+    transform_requires = {'x': types.PandasDataFrame({'a': float, 'b': int})}
+    transform_modifies = {'x': ops.ModifyDataFrame({'ratio': ops.Set(np.float32)})}
+
+    def transform(self, data: dict):
+        data['x'] = data['x'].assign(ratio=data['x']['a'] / data['x']['b'])
+        return data
+
+
+class Predict(Pipe):
+    transform_requires = {'x': types.PandasDataFrame({'ratio': np.float32})}
+    transform_modifies = {'y': types.Array(np.float64), 'x': ops.Drop()}
+
+    def transform(self, data: dict):
+        data['y'] = data['x']['ratio'].values * data['scale']
+        del data['x']
+        return data
+
+
+class FillNulls(Pipe):
+    transform_requires = {'x': types.PandasDataFrame({'b': np.float64, 'flag': object})}
+    transform_modifies = {'x': ops.ModifyDataFrame({'b_filled': ops.Set(np.float64),
+                                                    'flag_filled': ops.Set(np.bool_)})}
+
+    def transform(self, data: dict):
+        data['x'] = data['x'].assign(b_filled=data['x']['b'].fillna(0.0),
+                                     flag_filled=data['x']['flag'].fillna(False).astype(bool))
+        return data
+
+
+class TestTransformPartitions(PySparkTestCase):
+
+    def setUp(self):
+        # nullable integer columns are passed as floats (see test_nulls)
+        schema = StructType([StructField('id', LongType(), False), StructField('a', DoubleType()),
+                             StructField('b', LongType(), False)])
+        self.df = self.spark.createDataFrame(data=[(i, float(i), 2) for i in range(10)], schema=schema)
+
+    def test_dataframe(self):
+        result = transform_partitions(Pipeline([AddRatio()]), self.df.repartition(3))
+
+        self.assertEqual(result.schema, StructType([
+            StructField('id', LongType(), False), StructField('a', DoubleType()),
+            StructField('b', LongType(), False), StructField('ratio', FloatType())]))
+        rows = sorted(result.collect(), key=lambda row: row.id)
+        self.assertEqual([row.ratio for row in rows], [i / 2 for i in range(10)])
+
+    def test_array(self):
+        pipeline = Pipeline([AddRatio(), Predict()])
+        result = transform_partitions(pipeline, self.df, output_key='y', keep=['id'], data={'scale': 10.0})
+
+        self.assertEqual(result.schema, StructType([
+            StructField('y', DoubleType()), StructField('id', LongType(), False)]))
+        rows = sorted(result.collect(), key=lambda row: row.id)
+        self.assertEqual([row.y for row in rows], [i * 5.0 for i in range(10)])
+
+    def test_nulls(self):
+        schema = StructType([StructField('id', LongType(), False), StructField('b', LongType()),
+                             StructField('flag', BooleanType())])
+        # one partition has nulls and the other does not
+        df = self.spark.createDataFrame(
+            data=[(0, None, None), (1, 1, True), (2, 2, False), (3, 3, True)], schema=schema).repartition(2, 'id')
+
+        result = transform_partitions(Pipeline([FillNulls()]), df)
+        self.assertEqual(result.schema, StructType([
+            StructField('id', LongType(), False), StructField('b', LongType()), StructField('flag', BooleanType()),
+            StructField('b_filled', DoubleType()), StructField('flag_filled', BooleanType())]))
+        rows = sorted(result.collect(), key=lambda row: row.id)
+        self.assertEqual([(row.b, row.flag, row.b_filled, row.flag_filled) for row in rows],
+                         [(None, None, 0.0, False), (1, True, 1.0, True), (2, False, 2.0, False), (3, True, 3.0, True)])
+
+        # the declared schema of the pipeline must allow nulls
+        with self.assertRaises(exceptions.WrongType):
+            transform_partitions(Pipeline([AddRatio()]), df.withColumn('a', df['b'] * 1.0))
+
+    def test_schema_checked(self):
+        df = self.spark.createDataFrame(data=[Row(a=1.0)])
+        with self.assertRaises(exceptions.WrongSchema):
+            transform_partitions(Pipeline([AddRatio()]), df)
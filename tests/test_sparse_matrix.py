@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import scipy.sparse
+
+from schemaflow.types import SparseMatrix, Array, infer_schema, _take_rows
+from schemaflow import exceptions
+
+
+class TestSparseMatrix(unittest.TestCase):
+
+    def test_instance_check(self):
+        instance = scipy.sparse.random(1000, 100000, density=0.0001, format='csr', random_state=0)
+
+        self.assertEqual(SparseMatrix(float, shape=(None, None)).check_schema(instance), [])
+        self.assertEqual(SparseMatrix(float, shape=(None, 100000), format='csr').check_schema(instance), [])
+
+        # wrong shape
+        self.assertEqual(len(SparseMatrix(float, shape=(None, 10)).check_schema(instance)), 1)
+
+        # wrong format
+        with self.assertRaises(exceptions.WrongType) as e:
+            SparseMatrix(float, format='csc').check_schema(instance, True)
+        self.assertIn('sparse format', str(e.exception))
+
+        # wrong dtype
+        self.assertEqual(len(SparseMatrix(np.int64).check_schema(instance)), 1)
+
+        # dense arrays are not sparse matrices and vice-versa
+        self.assertEqual(len(SparseMatrix(float).check_schema(instance.toarray())), 1)
+        self.assertEqual(len(Array(float).check_schema(instance)), 1)
+
+        # sparse arrays
+        self.assertEqual(SparseMatrix(float, format='csr').check_schema(scipy.sparse.csr_array(instance)), [])
+
+    def test_type_check(self):
+        matrix_type = SparseMatrix(float, shape=(None, 10), format='csr')
+        self.assertEqual(matrix_type.check_schema(SparseMatrix(float, shape=(5, 10), format='csr')), [])
+        self.assertEqual(len(matrix_type.check_schema(SparseMatrix(float, shape=(5, 10), format='coo'))), 1)
+        self.assertEqual(len(matrix_type.check_schema(Array(float, shape=(5, 10)))), 1)
+
+    def test_infer(self):
+        instance = scipy.sparse.eye(3, format='csc')
+        schema = infer_schema({'a': instance, 'b': np.array([1.0, 2.0, 3.0])})
+        self.assertEqual(schema, {'a': SparseMatrix(np.float64, (3, 3), 'csc'), 'b': Array(np.float64, (3,))})
+
+    def test_take_rows(self):
+        data = {'x': scipy.sparse.eye(4, format='coo'), 'y': np.arange(4)}
+        result = _take_rows(data, [1, 3])
+        self.assertEqual(result['x'].format, 'coo')
+        np.testing.assert_array_equal(result['x'].toarray(), np.eye(4)[[1, 3]])
+        np.testing.assert_array_equal(result['y'], [1, 3])
@@ -0,0 +1,115 @@
+import unittest
+import tempfile
+
+import numpy as np
+
+from schemaflow.store import Store
+from schemaflow.pipeline import Pipeline
+from schemaflow.pipe import Pipe
+from schemaflow import types
+
+
+class Center(Pipe):
+    transform_requires = {'x': types.Array(np.float64)}
+    transform_modifies = {'x': types.Array(np.float64)}
+
+    fitted_parameters = {'mean': np.ndarray}
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['mean'] = data['x'].mean(axis=0)
+
+    def transform(self, data: dict):
+        data['x'] = data['x'] - self['mean']
+        return data
+
+
+class Model(Pipe):
+    transform_requires = {'x': types.Array(np.float64)}
+    transform_modifies = {'y': types.Array(np.float64)}
+
+    fitted_parameters = {'coefficients': np.ndarray}
+
+    def fit(self, data: dict, parameters: dict=None):
+        self['coefficients'] = np.linalg.lstsq(data['x'], data['y'], rcond=None)[0]
+
+    def transform(self, data: dict):
+        data['y'] = data['x'].dot(self['coefficients'])
+        return data
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.x = random.normal(size=(1000, 200))
+        self.y = random.normal(size=1000)
+
+    def _fit(self, y):
+        pipeline = Pipeline([('center', Center()), ('nested', Pipeline([('model', Model())]))])
+        pipeline.fit({'x': self.x, 'y': y})
+        return pipeline
+
+    def test_put_get(self):
+        store = Store(tempfile.mkdtemp(), chunk_size=1000)
+        pipeline = self._fit(self.y)
+        store.put('v1', pipeline)
+
+        loaded = store.get('v1')
+        np.testing.assert_array_equal(loaded.transform({'x': self.x[:5]})['y'],
+                                      pipeline.transform({'x': self.x[:5]})['y'])
+        self.assertEqual(loaded.fingerprint, pipeline.fingerprint)
+        self.assertEqual(store.versions(), ['v1'])
+
+        store.put('frozen', pipeline.freeze())
+        self.assertTrue(store.get('frozen').frozen)
+        self.assertTrue(store.get('frozen').pipes['nested'].pipes['model'].frozen)
+
+    def test_put_does_not_modify(self):
+        pipeline = self._fit(self.y)
+        model = pipeline.pipes['nested'].pipes['model']
+        coefficients = model['coefficients']
+        test = self
+
+        class CheckedStore(Store):
+            def _write_object(self, value):
+                # e.g. a concurrent transform sees the states while the pipeline is stored
+                test.assertIs(model['coefficients'], coefficients)
+                return super()._write_object(value)
+
+        CheckedStore(tempfile.mkdtemp()).put('v1', pipeline)
+        self.assertIs(model['coefficients'], coefficients)
+
+    def test_names(self):
+        store = Store(tempfile.mkdtemp())
+        for name in ['../x', 'a/b', '.hidden', '']:
+            with self.assertRaises(ValueError):
+                store.put(name, self._fit(self.y))
+        with self.assertRaises(ValueError):
+            store.get('../x')
+        store.put('model-2019.01_01', self._fit(self.y))
+        self.assertEqual(store.versions(), ['model-2019.01_01'])
+
+    def test_push(self):
+        source = Store(tempfile.mkdtemp(), chunk_size=1000)
+        destination = Store(tempfile.mkdtemp(), chunk_size=1000)
+
+        manifest = source.put('v1', self._fit(self.y))
+        self.assertEqual(len(source.push('v1', destination)), len(Store.chunks(manifest)))
+        self.assertEqual(destination.missing(manifest), [])
+
+        # only the model changes: its chunks are the only ones transferred
+        manifest_2 = source.put('v2', self._fit(self.y * 2))
+        transferred = source.push('v2', destination)
+        model_chunks = set(manifest_2['states']['nested/model']['coefficients'])
+        self.assertEqual(set(transferred), model_chunks - set(manifest['states']['nested/model']['coefficients']))
+        self.assertLess(len(transferred), len(Store.chunks(manifest_2)) / 2)
+
+        np.testing.assert_array_equal(destination.get('v2').transform({'x': self.x[:5]})['y'],
+                                      source.get('v2').transform({'x': self.x[:5]})['y'])
+        self.assertEqual(source.push('v2', destination), [])
+
+    def test_missing_chunks(self):
+        source = Store(tempfile.mkdtemp())
+        manifest = source.put('v1', self._fit(self.y))
+        with self.assertRaises(ValueError):
+            Store(tempfile.mkdtemp()).put_manifest('v1', manifest)
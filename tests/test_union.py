@@ -0,0 +1,127 @@
+import unittest
+import time
+
+from schemaflow.pipeline import Pipeline, Union
+from schemaflow.pipe import Pipe
+from schemaflow import types, ops
+from schemaflow import exceptions
+
+
+def _record(name):
+    """
+    Records the interval ``(start, end)`` of the decorated method in ``INTERVALS[name]``.
+    """
+    def decorator(method):
+        def wrapper(self, *args):
+            start = time.perf_counter()
+            result = method(self, *args)
+            INTERVALS.setdefault(name, []).append((start, time.perf_counter()))
+            return result
+        return wrapper
+    return decorator
+
+
+INTERVALS = {}
+
+
+def _overlap(intervals):
+    return max(start for start, _ in intervals) < min(end for _, end in intervals)
+
+
+class Mean(Pipe):
+    fit_requires = transform_requires = {'x': types.List(float)}
+
+    fitted_parameters = {'mean': float}
+
+    transform_modifies = {'x_mean': float}
+
+    @_record('fit')
+    def fit(self, data: dict, parameters: dict=None):
+        time.sleep(0.1)
+        self['mean'] = sum(data['x']) / len(data['x'])
+
+    @_record('transform')
+    def transform(self, data: dict):
+        time.sleep(0.1)
+        data['x_mean'] = self['mean']
+        return data
+
+
+class Max(Pipe):
+    fit_requires = transform_requires = {'x': types.List(float)}
+
+    fit_parameters = {'offset': float}
+
+    fitted_parameters = {'max': float}
+
+    transform_modifies = {'x_max': float, 'x': ops.Drop()}
+
+    @_record('fit')
+    def fit(self, data: dict, parameters: dict=None):
+        time.sleep(0.1)
+        self['max'] = max(data['x']) + parameters['offset']
+
+    @_record('transform')
+    def transform(self, data: dict):
+        time.sleep(0.1)
+        data['x_max'] = self['max']
+        del data['x']
+        return data
+
+
+class OtherMean(Mean):
+    transform_modifies = {'x_mean': int}
+
+
+class TestUnion(unittest.TestCase):
+
+    def test_fit_transform(self):
+        p = Union([('mean', Mean()), ('max', Max())])
+
+        INTERVALS.clear()
+        p.fit({'x': [1.0, 2.0, 3.0]}, {'max': {'offset': 1.0}})
+        result = p.transform({'x': [1.0, 2.0, 3.0], 'y': 1})
+        # fit and transform of the branches are concurrent
+        self.assertEqual(len(INTERVALS['fit']), 2)
+        self.assertTrue(_overlap(INTERVALS['fit']))
+        self.assertEqual(len(INTERVALS['transform']), 2)
+        self.assertTrue(_overlap(INTERVALS['transform']))
+
+        self.assertEqual(result, {'x_mean': 2.0, 'x_max': 4.0, 'y': 1})
+
+    def test_process(self):
+        p = Union([('mean', Mean()), ('max', Max())], executor='process')
+
+        p.fit({'x': [1.0, 2.0, 3.0]}, {'max': {'offset': 1.0}})
+        self.assertEqual(p.pipes['mean']['mean'], 2.0)
+        self.assertEqual(p.transform({'x': [1.0]}), {'x_mean': 2.0, 'x_max': 4.0})
+
+    def test_schema(self):
+        p = Union([('mean', Mean()), ('max', Max())])
+
+        self.assertEqual(p.transform_requires, {'x': types.List(float)})
+        self.assertEqual(p.fit_requires, {'x': types.List(float)})
+        self.assertEqual(p.fitted_parameters, {'mean': {'mean': float}, 'max': {'max': float}})
+        self.assertEqual(p.transform_schema({'x': types.List(float), 'y': int}),
+                         {'x_mean': float, 'x_max': float, 'y': int})
+
+        self.assertEqual(p.check_fit({'x': [1.0]}, {'max': {'offset': 1.0}}), [])
+        self.assertEqual(len(p.check_fit({'x': [1.0]})), 1)
+
+        with self.assertRaises(exceptions.WrongType) as e:
+            p.check_transform({'x': ['1']}, True)
+        self.assertIn('of branch \'mean\' of Union', str(e.exception))
+
+    def test_collision(self):
+        # same declared modification is allowed
+        Union([Mean(), Mean()])
+
+        with self.assertRaises(ValueError):
+            Union([Mean(), OtherMean()])
+
+    def test_in_pipeline(self):
+        p = Pipeline([('union', Union([('mean', Mean()), ('max', Max())]))])
+
+        p.fit({'x': [1.0, 2.0, 3.0]}, {'union': {'max': {'offset': 0.0}}})
+        self.assertEqual(p.transform({'x': [1.0]}), {'x_mean': 2.0, 'x_max': 3.0})
+        self.assertEqual(p.transform_modifies, {'x_mean': float, 'x_max': float, 'x': Max.transform_modifies['x']})